@@ -0,0 +1,194 @@
+"""Benchmark jednotlivých kroků preflightu nad syntetickou dodávkou.
+
+Každý krok se měří zvlášť (medián z `--repeat` běhů) nad stejnou dodávkou:
+příprava pracovního prostoru, sken projektů, čtení WAV, text PDF, dávkování,
+extrakce (lokální náhrada OpenRouter API), validace a zápis CSV. Cache jsou
+vypnuté, měří se studený běh. Výsledek se uloží jako JSON a porovná se
+s uloženou baseline.
+
+    python benchmarks/bench_stages.py --projects 50 --output bench.json
+    python benchmarks/bench_stages.py --update-baseline
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+from corpus import generate_corpus  # noqa: E402
+from vinyl_preflight.core.executor import IO_BOUND  # noqa: E402
+from vinyl_preflight.core.extraction import extract_locally, iter_documents, process_all_pdf_batches  # noqa: E402
+from vinyl_preflight.core.pipeline import create_pdf_batches, estimate_pdf_tokens  # noqa: E402
+from vinyl_preflight.core.validator import (detect_consolidated_mode, validate_consolidated_project,  # noqa: E402
+                                            validate_individual_project)
+from vinyl_preflight.io.output import append_csv_rows, write_csv_header  # noqa: E402
+from vinyl_preflight.llm.client import OpenRouterLLMClient  # noqa: E402
+from vinyl_preflight.llm.fake_server import FakeOpenRouterServer, fixed_latency  # noqa: E402
+from vinyl_preflight_app import CSV_HEADERS, PreflightProcessor  # noqa: E402
+
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+STAGES = ("workspace", "scan", "wav_probe", "pdf_text", "batching", "extraction", "validation", "csv")
+# regrese = pomalejší než baseline o víc než tento poměr a zároveň o víc než MIN_REGRESSION_SECONDS
+REGRESSION_RATIO = 1.25
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def _noop(*args) -> None:
+    pass
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    runs: List[float] = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - started)
+    return {"seconds": statistics.median(runs), "runs": runs, "result": result}
+
+
+def _validate_all(projects: Dict, pdf_results: Dict[str, Dict], wav_durations: Dict[str, Optional[float]]) -> List[Dict]:
+    rows: List[Dict] = []
+    for name, files in projects.items():
+        project_wavs = {w.as_posix(): wav_durations.get(w.as_posix()) for w in files['wavs']}
+        pdf_result = next((pdf_results.get(p.as_posix()) for p in files['pdfs']), None)
+        if detect_consolidated_mode(list(project_wavs)):
+            rows.extend(validate_consolidated_project(name, pdf_result, project_wavs))
+        else:
+            rows.extend(validate_individual_project(name, pdf_result, project_wavs))
+    return rows
+
+
+def run_benchmarks(source: Path, repeat: int = 3, archive_mode: str = "virtual",
+                   llm_latency: float = 0.05) -> Dict[str, Any]:
+    processor = PreflightProcessor("benchmark", _noop, _noop, archive_mode=archive_mode, use_cache=False)
+    stages: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="preflight_bench_") as tmpdir:
+        tmp = Path(tmpdir)
+
+        def workspace():
+            scratch = Path(tempfile.mkdtemp(dir=tmp))
+            return processor._prepare_workspace(source, scratch)
+        stages["workspace"] = _timed(workspace, repeat)
+        roots = stages["workspace"]["result"]
+
+        stages["scan"] = _timed(lambda: processor._scan_workspace(roots), repeat)
+        projects = stages["scan"]["result"]
+        all_pdfs = [p for files in projects.values() for p in files['pdfs']]
+
+        stages["wav_probe"] = _timed(lambda: processor._get_all_wav_durations(projects), repeat)
+        wav_durations = stages["wav_probe"]["result"]
+
+        stages["pdf_text"] = _timed(lambda: list(iter_documents(all_pdfs, kind=IO_BOUND)), repeat)
+        documents = stages["pdf_text"]["result"]
+
+        stages["batching"] = _timed(lambda: create_pdf_batches(projects, estimate_pdf_tokens(all_pdfs)), repeat)
+        batches = stages["batching"]["result"]
+
+        # lokální parser je vypnutý, ať se měří celá cesta přes API (retry, streaming, dávky)
+        with FakeOpenRouterServer(latency=fixed_latency(llm_latency), seed=0) as server, \
+                OpenRouterLLMClient(server.api_url, {}, "fake-model") as client:
+            stages["extraction"] = _timed(lambda: process_all_pdf_batches(
+                batches, _noop, _noop, llm_client=client, local_parse_threshold=None), repeat)
+        pdf_results = stages["extraction"]["result"]
+        for document in documents:
+            # dokumenty, které fake API nevrátilo, doplní lokální parser (validace potřebuje skladby)
+            if document["identifier"] not in pdf_results:
+                local = extract_locally(document, 0.0)
+                if local is not None:
+                    pdf_results[document["identifier"]] = local
+
+        stages["validation"] = _timed(lambda: _validate_all(projects, pdf_results, wav_durations), repeat)
+        rows = stages["validation"]["result"]
+
+        csv_path = tmp / "report.csv"
+
+        def csv():
+            write_csv_header(csv_path, CSV_HEADERS)
+            append_csv_rows(csv_path, rows, CSV_HEADERS)
+        stages["csv"] = _timed(csv, repeat)
+
+        counts = {"projects": len(projects), "pdfs": len(all_pdfs),
+                  "wavs": sum(len(files['wavs']) for files in projects.values()),
+                  "batches": len(batches), "validation_rows": len(rows),
+                  "validation_ok": sum(1 for row in rows if row.get("status") == "OK")}
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "repeat": repeat,
+                 "archive_mode": archive_mode, "llm_latency": llm_latency,
+                 "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "counts": counts,
+        "stages": {name: {"seconds": round(stages[name]["seconds"], 6),
+                          "runs": [round(r, 6) for r in stages[name]["runs"]]} for name in STAGES},
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], ratio: float = REGRESSION_RATIO,
+            min_seconds: float = MIN_REGRESSION_SECONDS) -> List[Dict[str, Any]]:
+    """Porovnání s baseline po krocích; `regression` = výrazně pomalejší než baseline."""
+    rows = []
+    for name in STAGES:
+        current = results["stages"].get(name, {}).get("seconds")
+        base = baseline.get("stages", {}).get(name, {}).get("seconds")
+        if current is None or base is None:
+            continue
+        rows.append({"stage": name, "baseline": base, "current": current,
+                     "ratio": current / base if base else None,
+                     "regression": current > base * ratio and current - base > min_seconds})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark kroků preflightu")
+    parser.add_argument("--source", type=Path, help="existující dodávka (jinak se vygeneruje)")
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--archive-share", type=float, default=0.25)
+    parser.add_argument("--artwork-pages", type=int, default=0)
+    parser.add_argument("--archive-mode", choices=("virtual", "extract"), default="virtual")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="zpoždění fake API v sekundách")
+    parser.add_argument("--output", type=Path, default=BENCH_DIR / "results.json")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="preflight_corpus_") as corpus_dir:
+        source = args.source
+        if source is None:
+            source = Path(corpus_dir) / "delivery"
+            generate_corpus(source, projects=args.projects, archive_share=args.archive_share,
+                            artwork_pages=args.artwork_pages)
+        results = run_benchmarks(source, args.repeat, args.archive_mode, args.llm_latency)
+    results["meta"]["corpus"] = {"source": str(args.source) if args.source else "generated",
+                                 "projects": args.projects, "archive_share": args.archive_share,
+                                 "artwork_pages": args.artwork_pages}
+
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    for name in STAGES:
+        print(f"{name:<12} {results['stages'][name]['seconds'] * 1000:10.1f} ms")
+    print(f"Výsledky: {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline aktualizována: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print("Baseline neexistuje, spusťte s --update-baseline.")
+        return 0
+    regressions = 0
+    for row in compare(results, json.loads(args.baseline.read_text(encoding="utf-8"))):
+        regressions += row["regression"]
+        mark = "REGRESE" if row["regression"] else "ok"
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        print(f"{row['stage']:<12} {row['baseline'] * 1000:10.1f} → {row['current'] * 1000:10.1f} ms  {ratio:>7}  {mark}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Generátor syntetických dodávek pro benchmarky.
+
+Vytvoří `projects` projektů ve stejném tvaru jako skutečné dodávky: složka
+(nebo ZIP/RAR archiv) s tracklistem v PDF a WAV soubory buď po stranách
+("Side A.wav"), nebo po skladbách ("01 - Title.wav"). Délky v PDF odpovídají
+délkám WAV, takže validace vychází OK.
+
+WAV ve složkách mají realistickou velikost (44,1 kHz / 24 bit / stereo), ale
+jsou řídké (hlavička + truncate), na disku zaberou pár KB. WAV v archivech se
+musí skutečně zapsat, proto mají úsporný formát (8 kHz / 8 bit / mono) - délka
+v hlavičce zůstává stejná.
+
+    python benchmarks/corpus.py /tmp/corpus --projects 200 --archive-share 0.3
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import json
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import zipfile
+
+import fitz  # PyMuPDF
+
+SIDES = "ABCD"
+WORDS = ("Midnight", "River", "Echo", "Silver", "Dance", "Horizon", "Velvet", "Static", "Golden", "Signal",
+         "Paper", "Moon", "Orbit", "Rain", "Neon", "Garden", "Shadow", "Fire", "Glass", "Wave")
+# (vzorkovací frekvence, bajty na vzorek, kanály)
+FOLDER_WAV_FORMAT = (44100, 3, 2)
+ARCHIVE_WAV_FORMAT = (8000, 1, 1)
+_WRITE_CHUNK = 1024 * 1024
+# skener projektů volné soubory v kořeni (kromě archivů) ignoruje
+MANIFEST_NAME = "corpus_manifest.json"
+
+
+def wav_header(data_size: int, samplerate: int, sample_bytes: int, channels: int) -> bytes:
+    block_align = sample_bytes * channels
+    return (b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, samplerate, samplerate * block_align,
+                                    block_align, sample_bytes * 8)
+            + b"data" + struct.pack("<I", data_size))
+
+
+def _data_size(seconds: int, wav_format) -> int:
+    samplerate, sample_bytes, channels = wav_format
+    return seconds * samplerate * sample_bytes * channels
+
+
+def write_sparse_wav(path: Path, seconds: int, wav_format=FOLDER_WAV_FORMAT) -> None:
+    size = _data_size(seconds, wav_format)
+    with open(path, "wb") as f:
+        f.write(wav_header(size, *wav_format))
+        f.truncate(44 + size)
+
+
+def _write_wav_member(archive: zipfile.ZipFile, name: str, seconds: int, wav_format=ARCHIVE_WAV_FORMAT) -> None:
+    size = _data_size(seconds, wav_format)
+    with archive.open(name, "w", force_zip64=True) as f:
+        f.write(wav_header(size, *wav_format))
+        zeros = bytes(_WRITE_CHUNK)
+        for start in range(0, size, _WRITE_CHUNK):
+            f.write(zeros[:min(_WRITE_CHUNK, size - start)])
+
+
+def make_tracklist(rng: random.Random, sides: int, tracks_per_side: int) -> List[Dict]:
+    tracks = []
+    for side in SIDES[:sides]:
+        for number in range(1, tracks_per_side + 1):
+            title = " ".join(rng.sample(WORDS, 2))
+            tracks.append({"side": side, "track_number": number, "title": title,
+                           "duration_seconds": rng.randint(150, 330)})
+    return tracks
+
+
+def tracklist_pdf(project: str, tracks: List[Dict], artwork_pages: int = 0) -> bytes:
+    """PDF s tracklistem (jedna stránka) a volitelně stránkami "artworku" bez tracklistu."""
+    doc = fitz.open()
+    for i in range(artwork_pages):
+        doc.new_page().insert_text((72, 72), f"{project}\nArtwork proof {i + 1}\nPrint ready - CMYK", fontsize=10)
+    lines = [project, "Tracklist", ""]
+    for side in sorted({t["side"] for t in tracks}):
+        side_tracks = [t for t in tracks if t["side"] == side]
+        lines.append(f"Side {side}")
+        for t in side_tracks:
+            m, s = divmod(t["duration_seconds"], 60)
+            lines.append(f"{t['side']}{t['track_number']}  {t['title']}  {m}:{s:02d}")
+        total = sum(t["duration_seconds"] for t in side_tracks)
+        lines.append(f"Total Side {side}: {total // 60}:{total % 60:02d}")
+        lines.append("")
+    page = doc.new_page()
+    page.insert_text((72, 72), "\n".join(lines), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _wav_files(tracks: List[Dict], consolidated: bool) -> Dict[str, int]:
+    """Jméno WAV (relativně k projektu) → délka v sekundách."""
+    if consolidated:
+        files: Dict[str, int] = {}
+        for t in tracks:
+            name = f"Audio/Side {t['side']}.wav"
+            files[name] = files.get(name, 0) + t["duration_seconds"]
+        return files
+    return {f"Audio/{n:02d} - {t['title']}.wav": t["duration_seconds"] for n, t in enumerate(tracks, start=1)}
+
+
+def _write_folder_project(root: Path, name: str, pdf: bytes, wavs: Dict[str, int]) -> None:
+    project_dir = root / name
+    (project_dir / "Docs").mkdir(parents=True, exist_ok=True)
+    (project_dir / "Docs" / f"{name} tracklist.pdf").write_bytes(pdf)
+    for rel, seconds in wavs.items():
+        path = project_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_sparse_wav(path, seconds)
+
+
+def _write_zip_project(root: Path, name: str, pdf: bytes, wavs: Dict[str, int]) -> Path:
+    # vnořená struktura jako u skutečných dodávek: <projekt>/<Docs|Audio>/...
+    path = root / f"{name}.zip"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr(f"{name}/Docs/{name} tracklist.pdf", pdf)
+        archive.writestr(f"{name}/Docs/readme.txt", "Delivery notes")
+        for rel, seconds in wavs.items():
+            _write_wav_member(archive, f"{name}/{rel}", seconds)
+    return path
+
+
+def _zip_to_rar(zip_path: Path) -> Optional[Path]:
+    """Přebalí ZIP do RAR přes příkaz `rar` (rarfile RAR zapisovat neumí); bez něj zůstane ZIP."""
+    rar = shutil.which("rar")
+    if rar is None:
+        return None
+    staging = zip_path.with_suffix("")
+    with zipfile.ZipFile(zip_path) as archive:
+        archive.extractall(staging)
+    rar_path = zip_path.with_suffix(".rar")
+    subprocess.run([rar, "a", "-m0", "-r", "-idq", str(rar_path), "."], cwd=staging, check=True)
+    shutil.rmtree(staging)
+    zip_path.unlink()
+    return rar_path
+
+
+def generate_corpus(root: Path, projects: int = 20, archive_share: float = 0.25, rar_share: float = 0.0,
+                    consolidated_share: float = 0.5, sides: int = 2, tracks_per_side: int = 5,
+                    artwork_pages: int = 0, seed: int = 0) -> Dict:
+    """Vygeneruje dodávku do `root` a vrátí manifest (co kde je, pro kontrolu výsledků)."""
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = {"projects": {}, "settings": {"projects": projects, "archive_share": archive_share,
+                                             "rar_share": rar_share, "consolidated_share": consolidated_share,
+                                             "sides": sides, "tracks_per_side": tracks_per_side,
+                                             "artwork_pages": artwork_pages, "seed": seed}}
+    rar_missing = False
+    for i in range(projects):
+        name = f"Project {i + 1:04d} {rng.choice(WORDS)}"
+        tracks = make_tracklist(rng, sides, tracks_per_side)
+        consolidated = rng.random() < consolidated_share
+        wavs = _wav_files(tracks, consolidated)
+        pdf = tracklist_pdf(name, tracks, artwork_pages)
+        container = "folder"
+        if rng.random() < archive_share:
+            path = _write_zip_project(root, name, pdf, wavs)
+            container = "zip"
+            if rng.random() < rar_share:
+                if _zip_to_rar(path) is not None:
+                    container = "rar"
+                else:
+                    rar_missing = True
+        else:
+            _write_folder_project(root, name, pdf, wavs)
+        manifest["projects"][name] = {"container": container, "consolidated": consolidated,
+                                      "tracks": len(tracks), "wavs": len(wavs)}
+    if rar_missing:
+        print("Příkaz 'rar' nebyl nalezen, RAR projekty zůstaly jako ZIP.", file=sys.stderr)
+    (root / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Syntetická dodávka pro benchmarky")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--archive-share", type=float, default=0.25, help="podíl projektů v archivech")
+    parser.add_argument("--rar-share", type=float, default=0.0, help="podíl archivů jako RAR (vyžaduje 'rar')")
+    parser.add_argument("--consolidated-share", type=float, default=0.5, help="podíl projektů s WAV po stranách")
+    parser.add_argument("--sides", type=int, default=2)
+    parser.add_argument("--tracks-per-side", type=int, default=5)
+    parser.add_argument("--artwork-pages", type=int, default=0, help="stránky bez tracklistu v každém PDF")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    manifest = generate_corpus(args.root, args.projects, args.archive_share, args.rar_share,
+                               args.consolidated_share, args.sides, args.tracks_per_side, args.artwork_pages,
+                               args.seed)
+    print(f"Vygenerováno {len(manifest['projects'])} projektů do {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,42 @@
 def run(payload: dict):
-    # adapter: payload může obsahovat path nebo config; volá pipeline krok po kroku
-    from vinyl_preflight.core.pipeline import ingest, extract, validate, report
-    p = ingest(payload.get('source', 'in-memory'))
-    r = extract(p)
-    r2 = validate(r)
-    rep = report(r2)
-    return {'status': 'done', 'report': rep}
+    """Zpracuje složky projektů (`source` nebo `sources`) přes PipelineExecutor: ingest → extract → validate → report.
 
+    Vrací {'status', 'report'}; u více zdrojů je 'report' seznam ve vstupním pořadí.
+    Chyby kroků jsou v 'errors' a status je pak 'error'.
+    """
+    from vinyl_preflight.core.pipeline import extract, ingest, report, validate
+    from vinyl_preflight.core.pipeline_executor import PipelineExecutor, Stage
+
+    sources = payload.get('sources') or [payload.get('source', 'in-memory')]
+    llm_client = payload.get('llm_client')
+
+    # položky nesou vstupní index, pracovní vlákna je dokončují v libovolném pořadí
+    def ingest_stage(item):
+        index, source = item
+        yield index, ingest(source)
+
+    def extract_stage(item):
+        index, project = item
+        yield index, project, extract(project, llm_client)
+
+    def validate_stage(item):
+        index, project, result = item
+        yield index, project, validate(project, result)
+
+    def report_stage(item):
+        index, project, rows = item
+        yield index, report(project, rows)
+
+    executor = PipelineExecutor([
+        Stage('ingest', ingest_stage),
+        Stage('extract', extract_stage, workers=payload.get('extract_workers', 4)),
+        Stage('validate', validate_stage, workers=payload.get('validate_workers', 2)),
+        Stage('report', report_stage),
+    ])
+    reports = [rep for _, rep in sorted(executor.run(enumerate(sources)), key=lambda pair: pair[0])]
+
+    result = {'status': 'error' if executor.errors else 'done',
+              'report': (reports[0] if reports else None) if len(sources) == 1 else reports}
+    if executor.errors:
+        result['errors'] = [f"{stage}: {exc}" for stage, _, exc in executor.errors]
+    return result
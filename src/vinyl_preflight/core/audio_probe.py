@@ -0,0 +1,153 @@
+"""Čisté Python čtení hlaviček audio souborů (WAV/BWF, RF64/BW64, AIFF/AIFC, FLAC).
+
+Délka se počítá jen z metadat v hlavičce - čte se pár KB a velké chunky se
+přeskakují seekem. Vše, co parser nezná, vrací None a volající použije
+fallback přes libsndfile.
+"""
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+import struct
+
+# WAVE formát tagy, u kterých platí frames = data_size / block_align
+_LINEAR_WAVE_TAGS = {0x0001, 0x0003, 0x0006, 0x0007, 0xFFFE}
+_UINT32_MAX = 0xFFFFFFFF
+# ochrana proti nekonečnému procházení poškozených souborů
+_MAX_CHUNKS = 1024
+
+Facts = Dict[str, Any]
+
+
+def _skip(stream: BinaryIO, n: int) -> None:
+    if stream.seekable():
+        stream.seek(n, 1)
+    else:
+        stream.read(n)
+
+
+def _tell(stream: BinaryIO, fallback: int) -> int:
+    try:
+        return stream.tell()
+    except (OSError, AttributeError):
+        return fallback
+
+
+def _facts(fmt: str, frames: int, samplerate: float, channels: int, **extra: Any) -> Optional[Facts]:
+    if not samplerate or frames < 0:
+        return None
+    facts = {'duration': frames / samplerate, 'frames': frames, 'samplerate': samplerate,
+             'channels': channels, 'format': fmt}
+    facts.update(extra)
+    return facts
+
+
+def _probe_riff(stream: BinaryIO, header: bytes, file_size: Optional[int]) -> Optional[Facts]:
+    container = header[:4].decode('ascii')  # RIFF / RF64 / BW64
+    ds64_data_size: Optional[int] = None
+    tag = channels = sample_rate = block_align = bits = 0
+    has_bext = False
+    pos = 12
+    for _ in range(_MAX_CHUNKS):
+        chunk = stream.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+        pos += 8
+        if chunk_id == b'ds64':
+            body = stream.read(size)
+            if len(body) < 24:
+                return None
+            _riff_size, ds64_data_size, _sample_count = struct.unpack('<QQQ', body[:24])
+        elif chunk_id == b'fmt ':
+            body = stream.read(size)
+            if len(body) < 16:
+                return None
+            tag, channels, sample_rate, _byte_rate, block_align, bits = struct.unpack('<HHIIHH', body[:16])
+        elif chunk_id == b'data':
+            if tag not in _LINEAR_WAVE_TAGS or not block_align:
+                return None
+            data_offset = _tell(stream, pos)
+            data_size = size
+            if container != 'RIFF' and size == _UINT32_MAX and ds64_data_size is not None:
+                data_size = ds64_data_size
+            if file_size is not None:
+                remaining = file_size - data_offset
+                if container == 'RIFF' and (size in (0, _UINT32_MAX) or remaining >= 1 << 32):
+                    # klasický RIFF nad 4 GB: 32bit velikost přetekla, data jsou do konce souboru
+                    data_size = remaining
+                elif remaining < data_size:
+                    # useknutý soubor - počítáme s tím, co skutečně existuje
+                    data_size = remaining
+            fmt = container if container != 'RIFF' else ('BWF' if has_bext else 'WAV')
+            return _facts(fmt, data_size // block_align, sample_rate, channels, bits_per_sample=bits)
+        else:
+            if chunk_id == b'bext':
+                has_bext = True
+            _skip(stream, size)
+        if size & 1:
+            _skip(stream, 1)
+        pos += size + (size & 1)
+    return None
+
+
+def _extended_to_float(b: bytes) -> float:
+    """IEEE 754 80bit extended (AIFF sample rate) → float."""
+    exponent, mantissa = struct.unpack('>HQ', b)
+    sign = -1 if exponent & 0x8000 else 1
+    exponent &= 0x7FFF
+    if exponent == 0 and mantissa == 0:
+        return 0.0
+    return sign * mantissa * 2.0 ** (exponent - 16383 - 63)
+
+
+def _probe_aiff(stream: BinaryIO, header: bytes) -> Optional[Facts]:
+    fmt = header[8:12].decode('ascii')  # AIFF / AIFC
+    for _ in range(_MAX_CHUNKS):
+        chunk = stream.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, size = chunk[:4], struct.unpack('>I', chunk[4:])[0]
+        if chunk_id == b'COMM':
+            body = stream.read(size)
+            if len(body) < 18:
+                return None
+            channels, frames, bits = struct.unpack('>HIH', body[:8])
+            return _facts(fmt, frames, _extended_to_float(body[8:18]), channels, bits_per_sample=bits)
+        _skip(stream, size + (size & 1))
+    return None
+
+
+def _probe_flac(stream: BinaryIO, header: bytes) -> Optional[Facts]:
+    block_header = header[4:8]
+    if block_header[0] & 0x7F != 0:  # první blok musí být STREAMINFO
+        return None
+    info = header[8:12] + stream.read(30)
+    if len(info) < 34:
+        return None
+    packed = int.from_bytes(info[10:18], 'big')
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits = ((packed >> 36) & 0x1F) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    if not total_samples:
+        return None  # délka není v hlavičce uvedena
+    return _facts('FLAC', total_samples, sample_rate, channels, bits_per_sample=bits)
+
+
+def probe_header(stream: BinaryIO, file_size: Optional[int] = None) -> Optional[Facts]:
+    """Zjistí délku a formát z hlavičky streamu; None = formát nerozpoznán."""
+    header = stream.read(12)
+    if len(header) < 12:
+        return None
+    magic = header[:4]
+    if magic in (b'RIFF', b'RF64', b'BW64') and header[8:12] == b'WAVE':
+        return _probe_riff(stream, header, file_size)
+    if magic == b'FORM' and header[8:12] in (b'AIFF', b'AIFC'):
+        return _probe_aiff(stream, header)
+    if magic == b'fLaC':
+        return _probe_flac(stream, header)
+    return None
+
+
+def probe_file(path: Path) -> Optional[Facts]:
+    with open(path, 'rb') as f:
+        return probe_header(f, path.stat().st_size)
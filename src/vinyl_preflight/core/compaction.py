@@ -0,0 +1,92 @@
+"""Zhuštění textu PDF před odesláním do LLM.
+
+Vstupní tokeny jsou hlavní náklad i latence extrakce. Z textu stránek se
+slévají mezery, vynechávají se záhlaví/zápatí opakovaná na většině stránek
+a zůstávají jen řádky v okolí časových údajů (m:ss, mm:ss, h:mm:ss) a
+nadpisy stran. Dokument bez časových údajů se jen slije, nic se z něj
+nezahazuje - o tracklistu pak musí rozhodnout model.
+"""
+from collections import Counter
+from typing import List, Sequence
+import logging
+import re
+import threading
+
+from vinyl_preflight.core.tracklist_parser import TIME_TOKEN
+from vinyl_preflight.utils.text import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# kolik řádků před a za řádkem s časem se ponechá (název skladby bývá na vedlejším řádku)
+CONTEXT_LINES = 2
+# záhlaví/zápatí hledáme jen mezi prvními a posledními řádky stránky
+EDGE_LINES = 3
+
+_WHITESPACE = re.compile(r'[\s\u00a0\u2000-\u200b]+')
+_SIDE_HINT = re.compile(r'\b(?:side|seite|strana|face)\s*[A-H]\b|\b[A-H]\s*[-_ ]?\s*side\b', re.IGNORECASE)
+
+
+def _clean_lines(page: str) -> List[str]:
+    lines = (_WHITESPACE.sub(' ', line).strip() for line in page.splitlines())
+    return [line for line in lines if line]
+
+
+def _repeated_edges(pages: Sequence[List[str]]) -> set:
+    """Řádky z okrajů stránek, které se opakují na většině stránek (a nejsou to časy)."""
+    if len(pages) < 2:
+        return set()
+    counts: Counter = Counter()
+    for lines in pages:
+        counts.update(set(lines[:EDGE_LINES] + lines[-EDGE_LINES:]))
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {line for line, n in counts.items() if n >= threshold and not TIME_TOKEN.search(line)}
+
+
+def compact_pages(pages: Sequence[str], context_lines: int = CONTEXT_LINES) -> str:
+    """Vrátí zhuštěný text dokumentu (stránky oddělené prázdným řádkem)."""
+    cleaned = [_clean_lines(page) for page in pages]
+    repeated = _repeated_edges(cleaned)
+    has_times = any(TIME_TOKEN.search(line) for lines in cleaned for line in lines)
+
+    out_pages = []
+    for lines in cleaned:
+        lines = [line for line in lines if line not in repeated]
+        if has_times:
+            keep = set()
+            for i, line in enumerate(lines):
+                if TIME_TOKEN.search(line):
+                    keep.update(range(max(0, i - context_lines), min(len(lines), i + context_lines + 1)))
+                elif _SIDE_HINT.search(line):
+                    keep.add(i)
+            lines = [line for i, line in enumerate(lines) if i in keep]
+        if lines:
+            out_pages.append("\n".join(lines))
+    return "\n\n".join(out_pages)
+
+
+class CompactionReport:
+    """Souhrn úspory tokenů za běh (sdílený více vlákny)."""
+
+    def __init__(self):
+        self.documents = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._lock = threading.Lock()
+
+    def add(self, before: str, after: str) -> None:
+        with self._lock:
+            self.documents += 1
+            self.tokens_before += estimate_tokens(before)
+            self.tokens_after += estimate_tokens(after)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def summary(self) -> str:
+        if not self.tokens_before:
+            return "Zhuštění textu: žádné dokumenty"
+        percent = 100.0 * self.tokens_saved / self.tokens_before
+        return (f"Zhuštění textu: {self.documents} PDF, ~{self.tokens_before} → ~{self.tokens_after} tokenů "
+                f"(ušetřeno ~{self.tokens_saved}, {percent:.0f} %)")
+
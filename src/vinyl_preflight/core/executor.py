@@ -0,0 +1,191 @@
+"""Sdílený executor pro hromadné úlohy nad soubory.
+
+I/O úlohy (čtení hlaviček, stat, hashování) běží ve vláknech - start je
+okamžitý a nic se nepickluje. Procesy se používají jen pro CPU náročnou
+práci (parsování PDF apod.). Úlohy se odesílají po dávkách a chyba jedné
+položky nikdy neshodí ani neopakuje ostatní.
+"""
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import functools
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+IO_BOUND = "io"
+CPU_BOUND = "cpu"
+
+DEFAULT_CHUNKSIZE = 16
+
+# (položka, výsledek, výjimka) - právě jedno z výsledek/výjimka dává smysl
+TaskResult = Tuple[Any, Any, Optional[BaseException]]
+
+
+def default_workers(kind: str) -> int:
+    cpus = os.cpu_count() or 1
+    if kind == CPU_BOUND:
+        return cpus
+    # I/O čekání neblokuje GIL, na síťových discích se vyplatí víc souběžných čtení
+    return min(32, cpus * 4)
+
+
+def _run_chunk(fn: Callable[[Any], Any], chunk: List[Any]) -> List[Tuple[Any, Optional[BaseException]]]:
+    out: List[Tuple[Any, Optional[BaseException]]] = []
+    for item in chunk:
+        try:
+            out.append((fn(item), None))
+        except Exception as e:
+            out.append((None, e))
+    return out
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _make_executor(kind: str, max_workers: int) -> Executor:
+    if kind == CPU_BOUND:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preflight-io")
+
+
+class _FallbackPool:
+    """Executor, který po rozpadu procesového poolu (spadlý worker, selhaný spawn) přejde na vlákna.
+
+    Rozpad se může projevit už při `submit` i až ve výsledku rozpracované
+    úlohy; v obou případech se úloha odešle znovu do poolu vláken.
+    """
+
+    def __init__(self, kind: str, workers: int):
+        self.workers = workers
+        self._executor = _make_executor(kind, workers)
+        self.broken = False
+        # nedokončené úlohy procesového poolu (budoucnost -> fn, argumenty), viz rescue
+        self._process_tasks: Dict[Future, Tuple[Callable[..., Any], Tuple[Any, ...]]] = {}
+        self._tracks_tasks = kind == CPU_BOUND
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        try:
+            future = self._executor.submit(fn, *args)
+        except BrokenProcessPool as e:
+            self.fall_back(e)
+            return self._executor.submit(fn, *args)
+        if self._tracks_tasks and not self.broken:
+            self._process_tasks[future] = (fn, args)
+            future.add_done_callback(lambda f: self._process_tasks.pop(f, None))
+        return future
+
+    def fall_back(self, error: BaseException) -> None:
+        if self.broken:
+            return
+        logger.warning("Procesový pool selhal (%s), zbývající úlohy poběží ve vláknech", error)
+        self.broken = True
+        # úlohy se neruší (cancel): zrušené by wait() nikdy nevrátil jako hotové
+        self._executor.shutdown(wait=False)
+        self._executor = _make_executor(IO_BOUND, self.workers)
+
+    def rescue(self, in_flight: Dict[Future, Any]) -> None:
+        """Po rozpadu poolu odešle jeho nedokončené úlohy z `in_flight` znovu do vláken.
+
+        Rozbitý pool má své úlohy ukončit chybou BrokenProcessPool, ale úloha
+        odeslaná souběžně s rozpadem v něm může zůstat navždy nedokončená
+        (závod v ProcessPoolExecutor), takže se na ně nečeká.
+        """
+        if not self.broken:
+            return
+        for future, (fn, args) in list(self._process_tasks.items()):
+            if future in in_flight and not future.done():
+                in_flight[self._executor.submit(fn, *args)] = in_flight.pop(future)
+        self._process_tasks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._executor.shutdown(wait=True)
+
+
+def run_tasks(fn: Callable[[Any], Any], items: Iterable[Any], kind: str = IO_BOUND,
+              max_workers: Optional[int] = None, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[TaskResult]:
+    """Spustí `fn` nad všemi položkami a průběžně vrací (položka, výsledek, výjimka).
+
+    Pořadí výsledků odpovídá dokončení dávek, ne vstupu. Pro CPU_BOUND musí
+    být `fn` i položky picklovatelné. Pokud se procesový pool rozpadne
+    (např. spawn selže nebo worker spadne), nedokončené dávky se dopočítají
+    ve vláknech.
+    """
+    items = list(items)
+    if not items:
+        return
+    workers = max(1, min(max_workers or default_workers(kind), len(items)))
+    # menší dávky, když je položek málo - ať se zaměstnají všechny workery
+    size = max(1, min(chunksize, -(-len(items) // workers)))
+    pending = _chunks(items, size)
+    call = functools.partial(_run_chunk, fn)
+
+    with _FallbackPool(kind, workers) as pool:
+        in_flight = {pool.submit(call, chunk): chunk for chunk in pending}
+        while in_flight:
+            pool.rescue(in_flight)
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = in_flight.pop(future)
+                try:
+                    results = future.result()
+                except BrokenProcessPool as e:
+                    pool.fall_back(e)
+                    in_flight[pool.submit(call, chunk)] = chunk
+                    continue
+                except Exception as e:
+                    # chyba mimo fn (např. pickling) - týká se jen této dávky
+                    results = [(None, e)] * len(chunk)
+                for item, (value, error) in zip(chunk, results):
+                    yield item, value, error
+
+
+def run_bounded(fn: Callable[[Any], Any], items: Iterable[Any], weight: Callable[[Any], int], max_weight: int,
+                kind: str = CPU_BOUND, max_workers: Optional[int] = None,
+                max_in_flight: Optional[int] = None) -> Iterator[TaskResult]:
+    """Jako run_tasks, ale po jedné položce a s rozpočtem na rozpracovanou práci.
+
+    Nová položka se odešle, jen když součet vah rozpracovaných položek
+    (např. velikost otevřených PDF v bajtech) nepřekročí `max_weight` a počet
+    rozpracovaných položek nepřekročí `max_in_flight`. Položka těžší než celý
+    rozpočet se zpracuje, až když nic jiného neběží. Výsledky se vrací
+    průběžně, jak se dokončují.
+    """
+    queue = deque(items)
+    if not queue:
+        return
+    workers = max(1, min(max_workers or default_workers(kind), len(queue)))
+    limit = max_in_flight or workers * 2
+    in_flight = {}
+    used = 0
+    with _FallbackPool(kind, workers) as pool:
+        while queue or in_flight:
+            while queue and len(in_flight) < limit:
+                w = weight(queue[0])
+                if in_flight and used + w > max_weight:
+                    break
+                item = queue.popleft()
+                in_flight[pool.submit(fn, item)] = (item, w)
+                used += w
+            pool.rescue(in_flight)
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item, w = in_flight.pop(future)
+                try:
+                    value = future.result()
+                except BrokenProcessPool as e:
+                    pool.fall_back(e)
+                    in_flight[pool.submit(fn, item)] = (item, w)
+                    continue
+                except Exception as e:
+                    used -= w
+                    yield item, None, e
+                    continue
+                used -= w
+                yield item, value, None
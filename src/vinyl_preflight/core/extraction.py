@@ -1,56 +1,508 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 import concurrent.futures
+import functools
+import json
 import logging
 
-from vinyl_preflight.core.pdf_utils import extract_text_from_pdf
+import fitz
+
+from vinyl_preflight.core.compaction import CompactionReport, compact_pages
+from vinyl_preflight.core.executor import CPU_BOUND, IO_BOUND, run_bounded, run_tasks
+from vinyl_preflight.core.llm_cache import LlmResultCache
+from vinyl_preflight.core.pdf_utils import PdfTextCache, extract_pages_from_pdf, parse_pdf, source_digest
+from vinyl_preflight.core.tracklist_parser import parse_tracklist
+from vinyl_preflight.llm.client import LLMClient
+from vinyl_preflight.llm.streaming import ResultsStreamParser
 
 logger = logging.getLogger(__name__)
 
 MAX_PARALLEL_API_REQUESTS = 10
+# zvýšit při každé změně promptu nebo formátu výsledků - zneplatní LlmResultCache
+PROMPT_VERSION = "2"
+# souhrnná velikost PDF, která smí být současně otevřená v PDF poolu
+MAX_OPEN_PDF_BYTES = 256 * 1024 * 1024
+MAX_PDF_WORKERS: Optional[int] = None  # None = počet CPU
+# dokumenty, které lokální parser přečte s alespoň touto důvěrou, se do LLM neposílají
+LOCAL_PARSE_MIN_CONFIDENCE = 0.9
+# kolikrát se znovu pošle samotný dokument s useknutou/nevalidní odpovědí nebo vynechaný modelem
+MAX_DOCUMENT_RETRIES = 2
+
+
+def _precheck(pdf_path: Path) -> Optional[Dict[str, str]]:
+    if not pdf_path.exists():
+        logger.error(f"PDF file does not exist: {pdf_path}")
+        return {"identifier": pdf_path.as_posix(), "content": "CHYBA: Soubor neexistuje."}
+    if pdf_path.stat().st_size == 0:
+        logger.error(f"PDF file is empty: {pdf_path.name}")
+        return {"identifier": pdf_path.as_posix(), "content": "CHYBA: Prázdný soubor."}
+    return None
+
+
+def _document(pdf_path: Path, pages: List[str], compact: bool = True,
+              report: Optional[CompactionReport] = None) -> Dict[str, str]:
+    text = "\n".join(pages)
+    if compact:
+        compacted = compact_pages(pages)
+        if report is not None:
+            report.add(text, compacted)
+        text = compacted
+    if not text.strip():
+        text = f"VAROVÁNÍ: PDF soubor '{pdf_path.name}' neobsahuje žádný extrahovatelný text."
+    return {"identifier": pdf_path.as_posix(), "content": text}
+
+
+def _error_document(pdf_path: Path, e: BaseException) -> Dict[str, str]:
+    if isinstance(e, fitz.FileDataError):
+        logger.error(f"Corrupted PDF file: {pdf_path.name}, {e}")
+        return {"identifier": pdf_path.as_posix(), "content": f"CHYBA: Poškozený PDF soubor. {e}"}
+    if isinstance(e, OSError):
+        logger.error(f"Cannot access PDF file: {pdf_path.name}, {e}")
+        return {"identifier": pdf_path.as_posix(), "content": f"CHYBA: Nelze přistoupit k souboru. {e}"}
+    logger.error(f"Unexpected error reading PDF: {pdf_path.name}, {e}")
+    return {"identifier": pdf_path.as_posix(), "content": f"CHYBA: Neočekávaná chyba. {e}"}
+
+
+def load_document(pdf_path: Path, text_cache: Optional[PdfTextCache] = None, compact: bool = True,
+                  report: Optional[CompactionReport] = None) -> Dict[str, str]:
+    """Připraví jeden dokument pro LLM ({"identifier", "content"}) v aktuálním vlákně."""
+    try:
+        return _precheck(pdf_path) or _document(pdf_path, extract_pages_from_pdf(pdf_path, text_cache),
+                                                compact, report)
+    except Exception as e:
+        return _error_document(pdf_path, e)
 
 
-def process_single_extraction_batch(batch: List[Path]) -> Optional[List[Dict]]:
-    documents_to_process: List[Dict[str, str]] = []
-    for pdf_path in batch:
+def _lookup_cached(text_cache: PdfTextCache, digests: Mapping[str, str], pdf_path: Path) -> Tuple[str, Optional[List[str]]]:
+    digest = digests.get(pdf_path.as_posix()) or source_digest(pdf_path)
+    hit = text_cache.get(digest)
+    return digest, hit['pages'] if hit is not None else None
+
+
+def _pdf_size(pdf_path: Path) -> int:
+    try:
+        return pdf_path.stat().st_size
+    except OSError:
+        return 0
+
+
+def iter_documents(pdf_paths: Iterable[Path], text_cache: Optional[PdfTextCache] = None,
+                   max_workers: Optional[int] = MAX_PDF_WORKERS, max_open_bytes: int = MAX_OPEN_PDF_BYTES,
+                   kind: str = CPU_BOUND, compact: bool = True, report: Optional[CompactionReport] = None,
+                   digests: Optional[Mapping[str, str]] = None) -> Iterator[Dict[str, str]]:
+    """Průběžně vrací dokumenty pro LLM, jak se dokončuje extrakce textu.
+
+    Zásahy v PdfTextCache se vyřídí ve vláknech (jen hash + dotaz), zbytek se
+    parsuje PyMuPDF v samostatném procesovém poolu. Souhrnná velikost
+    rozpracovaných PDF je omezena `max_open_bytes`. Při `compact` se text
+    zhustí (viz core.compaction), úsporu tokenů sčítá `report`. Hashe
+    z `digests` (viz pdf_utils.source_digests) se znovu nepočítají.
+    """
+    candidates: List[Path] = []
+    for pdf_path in pdf_paths:
         try:
-            if not pdf_path.exists():
-                logger.error(f"PDF file does not exist: {pdf_path}")
-                documents_to_process.append({"identifier": pdf_path.as_posix(), "content": "CHYBA: Soubor neexistuje."})
-                continue
-            if pdf_path.stat().st_size == 0:
-                logger.error(f"PDF file is empty: {pdf_path.name}")
-                documents_to_process.append({"identifier": pdf_path.as_posix(), "content": "CHYBA: Prázdný soubor."})
+            pre = _precheck(pdf_path)
+        except Exception as e:
+            pre = _error_document(pdf_path, e)
+        if pre is not None:
+            yield pre
+        else:
+            candidates.append(pdf_path)
+
+    to_parse = candidates
+    # hashe PDF, které se budou parsovat - pod nimi se text uloží do cache
+    miss_digests: Dict[str, str] = {}
+    if text_cache is not None:
+        to_parse = []
+        for pdf_path, found, error in run_tasks(functools.partial(_lookup_cached, text_cache, digests or {}),
+                                                candidates, kind=IO_BOUND):
+            if error is not None:
+                yield _error_document(pdf_path, error)
                 continue
-            text = extract_text_from_pdf(pdf_path)
-            if not text.strip():
-                text = f"VAROVÁNÍ: PDF soubor '{pdf_path.name}' neobsahuje žádný extrahovatelný text."
-            documents_to_process.append({"identifier": pdf_path.as_posix(), "content": text})
+            digest, pages = found
+            if pages is not None:
+                yield _document(pdf_path, pages, compact, report)
+            else:
+                miss_digests[pdf_path.as_posix()] = digest
+                to_parse.append(pdf_path)
+
+    for pdf_path, parsed, error in run_bounded(parse_pdf, to_parse, weight=_pdf_size, max_weight=max_open_bytes,
+                                               kind=kind, max_workers=max_workers):
+        if error is not None:
+            yield _error_document(pdf_path, error)
+            continue
+        pages, page_count = parsed
+        digest = miss_digests.get(pdf_path.as_posix())
+        if text_cache is not None and digest is not None:
+            text_cache.put(digest, pages, page_count)
+        yield _document(pdf_path, pages, compact, report)
+
+
+def build_extraction_prompt(documents: List[Dict[str, str]]) -> str:
+    return f"""
+Jsi expert na hudební mastering. Tvým úkolem je precizně extrahovat informace o skladbách z několika dokumentů.
+Analyzuj KAŽDÝ dokument v poli a vrať VÝHRADNĚ JEDEN JSON objekt s klíčem "results". Hodnota klíče "results" bude pole, kde každý prvek reprezentuje jeden zpracovaný dokument.
+
+Struktura pro každý prvek v poli "results":
+- "source_identifier": Unikátní identifikátor dokumentu.
+- "status": 'success' nebo 'error'.
+- "data": Pokud 'success', zde bude pole skladeb. Každá skladba musí obsahovat "side", "track_number", "title", "duration_seconds".
+- "error_message": Popis chyby, pokud status je 'error'.
+
+Zde jsou dokumenty ke zpracování:
+---
+{json.dumps(documents, ensure_ascii=False)}
+---
+"""
+
+
+def parse_extraction_response(response_json: Dict) -> List[Dict]:
+    content_str = response_json["choices"][0]["message"]["content"]
+    return json.loads(content_str).get("results", [])
+
+
+def _error_results(documents: List[Dict[str, str]], e: BaseException) -> List[Dict]:
+    return [{"source_identifier": d["identifier"], "status": "error", "data": [], "error_message": str(e)} for d in documents]
+
+
+# odpovědi, které může způsobit obsah dávky (špatný požadavek, příliš dlouhý kontext)
+_CONTENT_HTTP_STATUS = frozenset({400, 413})
+
+
+def _is_content_error(error: BaseException) -> bool:
+    """True, pokud chyba souvisí s obsahem dávky a menší dávka ji může odstranit.
+
+    Useknutý nebo nevalidní JSON a 400/413 ano; 429/5xx a síťové chyby ne -
+    ty klient už opakoval a dělení dávky by zátěž providera jen znásobilo.
+    """
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in _CONTENT_HTTP_STATUS
+    # JSONDecodeError je ValueError, chybná obálka odpovědi KeyError/IndexError/TypeError
+    return isinstance(error, (ValueError, KeyError, IndexError, TypeError))
+
+
+def _missing_result(document: Dict[str, str]) -> Dict:
+    return {"source_identifier": document["identifier"], "status": "error", "data": [],
+            "error_message": "Model nevrátil výsledek pro tento dokument."}
+
+
+def _log_request(request_logger, llm_client: LLMClient, documents: List[Dict[str, str]], prompt: str) -> None:
+    if request_logger:
+        request_logger.log_llm_request({
+            "model": getattr(llm_client, "model", None),
+            "documents_count": len(documents),
+            "documents": [{"identifier": d["identifier"], "content_length": len(d["content"])} for d in documents],
+            "prompt_length": len(prompt),
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.0,
+        })
+
+
+def _stream_batch(documents: List[Dict[str, str]], llm_client: LLMClient, request_logger=None,
+                  on_result: Optional[Callable[[Dict], None]] = None) -> Tuple[Optional[List[Dict]], Optional[BaseException], Set[str]]:
+    """Streamovaný požadavek: výsledky dokumentů se předávají `on_result`, jakmile je jejich JSON kompletní.
+
+    Vrací (výsledky, výjimka, identifikátory už předané on_result). Jakmile
+    přijdou výsledky všech dokumentů, stream se zavře bez čekání na konec
+    generování.
+    """
+    prompt = build_extraction_prompt(documents)
+    _log_request(request_logger, llm_client, documents, prompt)
+    expected = {d["identifier"] for d in documents}
+    parser = ResultsStreamParser()
+    results: List[Dict] = []
+    emitted: Set[str] = set()
+    chunks = llm_client.stream(prompt)
+    try:
+        for chunk in chunks:
+            for element in parser.feed(chunk):
+                results.append(element)
+                identifier = element.get("source_identifier")
+                if identifier in expected and identifier not in emitted:
+                    emitted.add(identifier)
+                    if on_result:
+                        on_result(element)
+            if emitted >= expected:
+                break
+        if not results:
+            # odpověď bez rozpoznatelného pole results (např. jiná obálka) - celé parsování
+            results = json.loads(parser.text).get("results", [])
+    except Exception as e:
+        if not results:
+            logger.error(f"Chyba streamu pro dávku ({len(documents)} dokumentů): {e}")
+            return None, e, emitted
+        # částečná odpověď: chybějící dokumenty se dožádají jednotlivě
+        logger.warning(f"Stream přerušen po {len(results)}/{len(documents)} výsledcích: {e}")
+    finally:
+        chunks.close()
+    if request_logger:
+        request_logger.log_llm_response({
+            "raw_response": parser.text,
+            "parsed_results": results,
+            "results_count": len(results),
+            "streamed": True,
+        })
+    return results, None, emitted
+
+
+def _stream_batches(document_batches: List[List[Dict[str, str]]], llm_client: LLMClient, request_logger=None,
+                    on_result: Optional[Callable[[Dict], None]] = None):
+    if len(document_batches) == 1:
+        return [_stream_batch(document_batches[0], llm_client, request_logger, on_result)]
+    workers = min(len(document_batches), llm_client.max_concurrency)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-stream") as executor:
+        return list(executor.map(lambda documents: _stream_batch(documents, llm_client, request_logger, on_result),
+                                 document_batches))
+
+
+def _request_batches(document_batches: List[List[Dict[str, str]]], llm_client: LLMClient,
+                     request_logger=None) -> List[Tuple[Optional[List[Dict]], Optional[BaseException]]]:
+    """Jedno kolo požadavků: pro každou dávku (rozparsované výsledky, výjimka)."""
+    prompts = [build_extraction_prompt(documents) for documents in document_batches]
+    for documents, prompt in zip(document_batches, prompts):
+        _log_request(request_logger, llm_client, documents, prompt)
+
+    outcomes: List[Tuple[Optional[List[Dict]], Optional[BaseException]]] = []
+    for documents, (response_json, error) in zip(document_batches, llm_client.call_many(prompts)):
+        try:
+            if error is not None:
+                raise error
+            parsed_results = parse_extraction_response(response_json)
+            if request_logger:
+                request_logger.log_llm_response({
+                    "raw_response": response_json,
+                    "parsed_results": parsed_results,
+                    "results_count": len(parsed_results)
+                })
+            outcomes.append((parsed_results, None))
         except Exception as e:
-            logger.error(f"Unexpected error reading PDF: {pdf_path.name}, {e}")
-            documents_to_process.append({"identifier": pdf_path.as_posix(), "content": f"CHYBA: Neočekávaná chyba. {e}"})
+            logger.error(f"Chyba API volání pro dávku ({len(documents)} dokumentů): {e}")
+            outcomes.append((None, e))
+    return outcomes
+
+
+def extract_document_batches(document_batches: List[List[Dict[str, str]]], llm_client: Optional[LLMClient] = None,
+                             request_logger=None, on_result: Optional[Callable[[Dict], None]] = None) -> List[List[Dict]]:
+    """Pošle dávky dokumentů do LLM přes `llm_client.call_many` (souběžně, v rámci limitu klienta).
+
+    Vrací výsledky po dávkách ve vstupním pořadí. Dávka, jejíž odpověď
+    selhala kvůli obsahu (useknutý JSON, 400/413), se rozpůlí a obě poloviny
+    se zkusí znovu (rekurzivně až po jednotlivé dokumenty); při přetížení
+    nebo síťové chybě dostane chybu celá dávka bez dalších požadavků;
+    dokumenty, které model ve výsledcích vynechal, se pošlou znovu každý
+    zvlášť. Samotný dokument s chybou obsahu nebo vynechaný se zkusí ještě
+    nejvýš `MAX_DOCUMENT_RETRIES`krát, než dostane chybový výsledek.
+    Úspěšně vrácené dokumenty se znovu neposílají.
+
+    S `on_result` a klientem, který umí streamovat, se odpovědi streamují
+    a `on_result` dostává konečný výsledek každého dokumentu hned, jak je
+    znám (volá se z vláken API).
+    """
+    return _extract_batches(document_batches, [0] * len(document_batches), llm_client, request_logger, on_result)
+
+
+def _extract_batches(document_batches: List[List[Dict[str, str]]], retries: List[int], llm_client: Optional[LLMClient],
+                     request_logger=None, on_result: Optional[Callable[[Dict], None]] = None) -> List[List[Dict]]:
+    """Jedno kolo `extract_document_batches`; `retries[i]` = kolikrát už se dávka i (jeden dokument) opakovala."""
+    if llm_client is None:
+        # bez klienta (testy, offline režim) vracíme kompatibilní prázdné výsledky
+        batch_results = [[{"source_identifier": d["identifier"], "status": "success", "data": []} for d in documents]
+                         for documents in document_batches]
+        if on_result:
+            for result in (r for results in batch_results for r in results):
+                on_result(result)
+        return batch_results
+
+    if on_result and llm_client.supports_streaming:
+        outcomes = _stream_batches(document_batches, llm_client, request_logger, on_result)
+    else:
+        outcomes = [(parsed, error, set()) for parsed, error in _request_batches(document_batches, llm_client, request_logger)]
+
+    def notify(results: List[Dict], emitted: Set[str]) -> None:
+        if on_result:
+            for result in results:
+                if result["source_identifier"] not in emitted:
+                    on_result(result)
+
+    batch_results: List[List[Dict]] = [[] for _ in document_batches]
+    retry_batches: List[List[Dict[str, str]]] = []
+    retry_owner: List[int] = []
+    retry_counts: List[int] = []
+
+    def retry(owner: int, documents: List[Dict[str, str]], count: int = 0) -> None:
+        retry_batches.append(documents)
+        retry_owner.append(owner)
+        retry_counts.append(count)
+
+    for i, (documents, (parsed_results, error, emitted)) in enumerate(zip(document_batches, outcomes)):
+        if error is not None:
+            if not _is_content_error(error):
+                batch_results[i] = _error_results(documents, error)
+                notify(batch_results[i], emitted)
+            elif len(documents) > 1:
+                middle = len(documents) // 2
+                logger.info(f"Dělím selhanou dávku {len(documents)} dokumentů na {middle} + {len(documents) - middle}")
+                retry(i, documents[:middle])
+                retry(i, documents[middle:])
+            elif retries[i] < MAX_DOCUMENT_RETRIES:
+                logger.warning(f"Odpověď pro {documents[0]['identifier']} selhala ({error}), "
+                               f"pokus {retries[i] + 1}/{MAX_DOCUMENT_RETRIES}")
+                retry(i, documents, retries[i] + 1)
+            else:
+                batch_results[i] = _error_results(documents, error)
+                notify(batch_results[i], emitted)
+            continue
+
+        expected = {d["identifier"] for d in documents}
+        answered = [r for r in parsed_results if r.get("source_identifier") in expected]
+        batch_results[i] = answered
+        notify(answered, emitted)
+        returned = {r["source_identifier"] for r in answered}
+        missing = [d for d in documents if d["identifier"] not in returned]
+        if not missing:
+            continue
+        if len(documents) > 1:
+            logger.warning(f"Model vynechal {len(missing)}/{len(documents)} dokumentů, posílám je znovu jednotlivě")
+            for document in missing:
+                retry(i, [document])
+        elif retries[i] < MAX_DOCUMENT_RETRIES:
+            logger.warning(f"Model vynechal {documents[0]['identifier']}, pokus {retries[i] + 1}/{MAX_DOCUMENT_RETRIES}")
+            retry(i, documents, retries[i] + 1)
+        else:
+            missing_results = [_missing_result(d) for d in missing]
+            batch_results[i].extend(missing_results)
+            notify(missing_results, emitted)
+
+    if retry_batches:
+        retried = _extract_batches(retry_batches, retry_counts, llm_client, request_logger, on_result)
+        for owner, results in zip(retry_owner, retried):
+            batch_results[owner].extend(results)
+    return batch_results
+
+
+def extract_documents(documents: List[Dict[str, str]], llm_client: Optional[LLMClient] = None,
+                      request_logger=None, on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """Pošle dokumenty jedné dávky do LLM a vrátí výsledky (list result dictů)."""
+    return extract_document_batches([documents], llm_client, request_logger, on_result)[0]
+
+
+def extract_locally(document: Dict[str, str], min_confidence: float = LOCAL_PARSE_MIN_CONFIDENCE) -> Optional[Dict]:
+    """Zkusí dokument přečíst deterministickým parserem; None = poslat do LLM."""
+    content = document["content"]
+    if content.startswith(("CHYBA:", "VAROVÁNÍ:")):
+        return None
+    tracks, confidence = parse_tracklist(content)
+    if confidence < min_confidence:
+        return None
+    logger.debug(f"Lokálně přečteno ({confidence:.2f}): {document['identifier']}")
+    return {"source_identifier": document["identifier"], "status": "success", "data": tracks,
+            "extracted_by": "local", "confidence": confidence}
+
+
+def process_single_extraction_batch(batch: List[Path], text_cache: Optional[PdfTextCache] = None,
+                                    llm_client: Optional[LLMClient] = None, request_logger=None,
+                                    result_cache: Optional[LlmResultCache] = None) -> Optional[List[Dict]]:
+    documents_to_process = [load_document(pdf_path, text_cache) for pdf_path in batch]
     if not documents_to_process:
         return None
-    # Ponecháváme návratovou strukturu kompatibilní s monolitem: list(result dicts)
-    # Samotné LLM volání zůstává v monolitu pro nynější krok přesunu.
-    return [{"source_identifier": d["identifier"], "status": "success", "data": []} for d in documents_to_process]
+    cached = result_cache.lookup(documents_to_process) if result_cache is not None else {}
+    misses = [d for d in documents_to_process if d["identifier"] not in cached]
+    results = list(cached.values())
+    if misses:
+        fresh = extract_documents(misses, llm_client, request_logger)
+        if result_cache is not None and llm_client is not None:
+            result_cache.store(misses, fresh)
+        results.extend(fresh)
+    return results
 
 
-def process_all_pdf_batches(batches: List[List[Path]], status_callback, progress_callback) -> dict:
+def process_all_pdf_batches(batches: List[List[Path]], status_callback, progress_callback,
+                            text_cache: Optional[PdfTextCache] = None, llm_client: Optional[LLMClient] = None,
+                            request_logger=None, pdf_workers: Optional[int] = MAX_PDF_WORKERS,
+                            max_open_pdf_bytes: int = MAX_OPEN_PDF_BYTES,
+                            local_parse_threshold: Optional[float] = LOCAL_PARSE_MIN_CONFIDENCE,
+                            result_cache: Optional[LlmResultCache] = None,
+                            on_result: Optional[Callable[[Dict], None]] = None, compact: bool = True,
+                            digests: Optional[Mapping[str, str]] = None) -> dict:
+    """Dvoustupňová extrakce: PDF pool (text) → API pool (LLM).
+
+    Dávka se odešle do LLM, jakmile jsou hotové texty všech jejích PDF,
+    nečeká se na zbytek dávek. Dokumenty, které s dostatečnou důvěrou
+    přečte lokální parser, se do LLM neposílají (`local_parse_threshold=None`
+    lokální parser vypne). Dokumenty, jejichž výsledek je v `result_cache`,
+    se také vyřídí lokálně; do API dávek jdou jen zbylé dokumenty.
+    `on_result` dostává výsledek každého dokumentu, jakmile je hotový
+    (u streamujícího klienta ještě před koncem odpovědi celé dávky).
+    `compact` zapíná zhuštění textu před odesláním (úspora se hlásí na konci).
+    `digests` jsou hashe PDF spočítané už při tvorbě dávek.
+    """
     all_results: Dict[str, Dict] = {}
     total_batches = len(batches)
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PARALLEL_API_REQUESTS) as executor:
-        future_to_batch = {executor.submit(process_single_extraction_batch, batch): i for i, batch in enumerate(batches)}
-        for i, future in enumerate(concurrent.futures.as_completed(future_to_batch)):
-            status_callback(f"4/5 Zpracovávám PDF dávku {i+1}/{total_batches}...")
-            progress_callback(i + 1, total_batches)
+    batch_of: Dict[str, int] = {}
+    position: Dict[str, int] = {}
+    for i, batch in enumerate(batches):
+        for j, pdf_path in enumerate(batch):
+            batch_of[pdf_path.as_posix()] = i
+            position[pdf_path.as_posix()] = j
+    ready: Dict[int, List[Dict[str, str]]] = {i: [] for i in range(total_batches)}
+    resolved: Dict[int, int] = {i: 0 for i in range(total_batches)}
+    all_pdfs = [pdf_path for batch in batches for pdf_path in batch]
+    done_batches = 0
+    compaction = CompactionReport()
+
+    # souběh API určuje klient (sdílený limit), bez klienta výchozí hodnota
+    api_workers = getattr(llm_client, "max_concurrency", None) or MAX_PARALLEL_API_REQUESTS
+    with concurrent.futures.ThreadPoolExecutor(max_workers=api_workers) as executor:
+        future_to_documents = {}
+        for n, document in enumerate(iter_documents(all_pdfs, text_cache, pdf_workers, max_open_pdf_bytes,
+                                                      compact=compact, report=compaction, digests=digests),
+                                        start=1):
+            if n % 10 == 0 or n == len(all_pdfs):
+                status_callback(f"4/5 Načteno {n}/{len(all_pdfs)} PDF...")
+            i = batch_of[document["identifier"]]
+            local = extract_locally(document, local_parse_threshold) if local_parse_threshold is not None else None
+            if local is None and result_cache is not None:
+                local = result_cache.lookup([document]).get(document["identifier"])
+            if local is not None:
+                all_results[local["source_identifier"]] = local
+                if on_result:
+                    on_result(local)
+                resolved[i] += 1
+            else:
+                ready[i].append(document)
+            if len(ready[i]) + resolved[i] < len(batches[i]):
+                continue
+            if ready[i]:
+                documents = sorted(ready[i], key=lambda d: position[d["identifier"]])
+                future_to_documents[executor.submit(extract_documents, documents, llm_client, request_logger,
+                                                    on_result)] = documents
+            else:
+                # celá dávka vyřízena bez LLM
+                done_batches += 1
+                progress_callback(done_batches, total_batches)
+
+        local_count = sum(resolved.values())
+        if local_count:
+            logger.info(f"Bez LLM vyřízeno {local_count}/{len(all_pdfs)} PDF (lokální parser, cache)")
+        if compact and compaction.documents:
+            logger.info(compaction.summary())
+            status_callback(f"4/5 {compaction.summary()}")
+            if request_logger is not None:
+                request_logger.log_compaction(compaction.documents, compaction.tokens_before, compaction.tokens_after)
+
+        for future in concurrent.futures.as_completed(future_to_documents):
+            done_batches += 1
+            status_callback(f"4/5 Zpracovávám PDF dávku {done_batches}/{total_batches}...")
+            progress_callback(done_batches, total_batches)
             try:
                 batch_results = future.result()
+                if batch_results and result_cache is not None and llm_client is not None:
+                    result_cache.store(future_to_documents[future], batch_results)
                 if batch_results:
                     for result in batch_results:
                         all_results[result['source_identifier']] = result
             except Exception as e:
                 logger.error(f"Chyba při zpracování dávky: {e}")
     return all_results
-
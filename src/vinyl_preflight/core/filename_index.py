@@ -0,0 +1,111 @@
+"""Index rysů jmen WAV souborů jednoho projektu.
+
+Jména se projdou jednou předkompilovanými regexy: strany, na které jméno
+ukazuje ("Side A", "A-side", "_b_", ...), číslo skladby, značka "master"
+a klasifikace pro detekci módu (strany vs. jednotlivé skladby). Hledání WAV
+pro stranu i detekce módu jsou pak jen vyhledání ve slovníku.
+"""
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+import re
+
+CONSOLIDATED = "consolidated"
+INDIVIDUAL = "individual"
+# detekce módu má smysl jen pro malý počet souborů (LP = 2-4 strany)
+MAX_CONSOLIDATED_WAVS = 4
+
+_INDIVIDUAL = re.compile(r'^\d{1,2}[\s_.-]|track[\s_-]*\d+|\d{2,}[\s_.-]')
+_CONSOLIDATED = re.compile(
+    r'side[\s_-]*[abc123]|[abc123][\s_-]*side|^[abc123][\s_.-]*$|master[\s_-]*[abc123]|[abc123][\s_-]*master'
+    r'|full[\s_-]*side|complete[\s_-]*[abc]',
+    re.IGNORECASE,
+)
+# označení strany ve jméně (malými písmeny); lookahead kvůli překrývajícím se výskytům.
+# Odpovídá vzorům find_wav_for_side: "side a"/"side_a"/"side-a"/"sidea", "a side"/..., "a." na
+# začátku, "_a_" uprostřed a "_a" na konci jména.
+_SIDE_MARKERS = (
+    re.compile(r'(?=side[ _-]?(.))', re.DOTALL),
+    re.compile(r'(?=(.)[ _-]?side)', re.DOTALL),
+    re.compile(r'^(.)[._-]', re.DOTALL),
+    re.compile(r'(?=[._-](.)[._-])', re.DOTALL),
+    re.compile(r'[._-](.)$', re.DOTALL),
+)
+_TRACK_NUMBER = re.compile(r'^(\d{1,3})[\s_.-]|track[\s_-]*(\d+)', re.IGNORECASE)
+
+
+class WavName:
+    """Rysy jednoho jména WAV."""
+
+    __slots__ = ("path", "name", "sides", "track_number", "is_master", "kind")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = Path(path).name
+        lower = self.name.lower()
+        sides: Set[str] = set()
+        for marker in _SIDE_MARKERS:
+            sides.update(m.group(1) for m in marker.finditer(lower))
+        self.sides: FrozenSet[str] = frozenset(sides)
+        number = _TRACK_NUMBER.search(self.name)
+        self.track_number: Optional[int] = int(number.group(1) or number.group(2)) if number else None
+        self.is_master = "master" in lower
+        if _INDIVIDUAL.search(self.name):
+            self.kind: Optional[str] = INDIVIDUAL
+        elif _CONSOLIDATED.search(self.name):
+            self.kind = CONSOLIDATED
+        else:
+            self.kind = None
+
+
+class FilenameIndex:
+    """Index jmen WAV projektu; pořadí cest se zachovává (první shoda vyhrává jako dřív)."""
+
+    def __init__(self, wav_paths: Iterable[str]):
+        self.entries: List[WavName] = [WavName(p) for p in wav_paths]
+        self._by_side: Dict[str, List[str]] = {}
+        for entry in self.entries:
+            for side in entry.sides:
+                self._by_side.setdefault(side, []).append(entry.path)
+        self._masters = [e.path for e in self.entries if e.is_master]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def wav_for_side(self, side: str, available: Optional[Iterable[str]] = None) -> Optional[str]:
+        """První WAV (v pořadí indexu), jehož jméno označuje stranu `side`; jen z `available`, pokud je dáno."""
+        side_lower = side.lower()
+        if len(side_lower) == 1:
+            candidates = self._by_side.get(side_lower, [])
+        else:
+            candidates = [e.path for e in self.entries if _names_side(e.name.lower(), side_lower)]
+        return _first_available(candidates, available)
+
+    def master_wav(self, available: Optional[Iterable[str]] = None) -> Optional[str]:
+        return _first_available(self._masters, available)
+
+    def is_consolidated(self) -> bool:
+        """Heuristika módu: soubory po stranách (A/B/C...) vs. po jednotlivých skladbách."""
+        count = len(self.entries)
+        if count == 0 or count > MAX_CONSOLIDATED_WAVS:
+            return False
+        individual = sum(1 for e in self.entries if e.kind == INDIVIDUAL)
+        consolidated = sum(1 for e in self.entries if e.kind == CONSOLIDATED)
+        if individual > count / 2:
+            return False
+        return consolidated > 0 or individual == 0
+
+
+def _first_available(candidates: List[str], available: Optional[Iterable[str]]) -> Optional[str]:
+    if available is None:
+        return candidates[0] if candidates else None
+    if not isinstance(available, (set, frozenset, dict)):
+        available = set(available)
+    return next((p for p in candidates if p in available), None)
+
+
+def _names_side(lower: str, side: str) -> bool:
+    # víceznakové označení strany (vzácné) - přímé porovnání bez indexu
+    s = re.escape(side)
+    return (any(p in lower for p in (f"side {side}", f"side_{side}", f"side-{side}", f"side{side}",
+                                      f"{side} side", f"{side}_side", f"{side}-side", f"{side}side"))
+            or re.search(f"^{s}[._-]|[._-]{s}[._-]|[._-]{s}$", lower) is not None)
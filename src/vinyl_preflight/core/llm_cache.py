@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import hashlib
+
+from vinyl_preflight.io.cache import SqliteCache, open_cache
+
+LLM_CACHE_NAMESPACE = "llm_extraction"
+LLM_CACHE_MAX_ENTRIES = 50_000
+LLM_CACHE_TTL_SECONDS = 90 * 24 * 3600
+
+
+def result_key(model: str, prompt_version: str, content: str) -> str:
+    """Klíč výsledku: model + verze promptu + SHA-256 textu dokumentu."""
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    return f"{model}:{prompt_version}:{digest}"
+
+
+class LlmResultCache:
+    """Perzistentní cache výsledků LLM extrakce po jednotlivých dokumentech.
+
+    Výsledek nezávisí na cestě k PDF, jen na jeho textu - přejmenovaný nebo
+    zkopírovaný dokument se do LLM znovu neposílá. Změna verze promptu
+    (nebo modelu) změní klíč, staré záznamy postupně vyprší.
+    """
+
+    def __init__(self, cache: SqliteCache, model: str, prompt_version: str):
+        self.cache = cache
+        self.model = model
+        self.prompt_version = prompt_version
+
+    @classmethod
+    def open(cls, model: str, prompt_version: str, cache_dir: Optional[Path] = None,
+             ttl_seconds: Optional[float] = LLM_CACHE_TTL_SECONDS) -> Optional["LlmResultCache"]:
+        cache = open_cache(LLM_CACHE_NAMESPACE, cache_dir, max_entries=LLM_CACHE_MAX_ENTRIES, ttl_seconds=ttl_seconds)
+        return cls(cache, model, prompt_version) if cache is not None else None
+
+    def key(self, content: str) -> str:
+        return result_key(self.model, self.prompt_version, content)
+
+    def lookup(self, documents: Iterable[Dict[str, str]]) -> Dict[str, Dict]:
+        """Vrátí uložené výsledky podle identifikátoru dokumentu (jen zásahy)."""
+        keys = {d["identifier"]: self.key(d["content"]) for d in documents}
+        found = self.cache.get_many(set(keys.values()))
+        hits: Dict[str, Dict] = {}
+        for identifier, key in keys.items():
+            if key in found:
+                hits[identifier] = dict(found[key], source_identifier=identifier, cached=True)
+        return hits
+
+    def store(self, documents: List[Dict[str, str]], results: Iterable[Dict]) -> None:
+        """Uloží úspěšné výsledky; chyby se neukládají, ať se příště zkusí znovu."""
+        content = {d["identifier"]: d["content"] for d in documents}
+        items = {}
+        for result in results:
+            identifier = result.get("source_identifier")
+            if result.get("status") != "success" or identifier not in content:
+                continue
+            items[self.key(content[identifier])] = {k: v for k, v in result.items() if k != "source_identifier"}
+        self.cache.set_many(items)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def close(self) -> None:
+        self.cache.close()
@@ -1,31 +1,137 @@
 from pathlib import Path
-import re
-from typing import Dict, Optional
-
-def find_wav_for_side(side: str, available_wavs: Dict[str, Optional[float]]) -> Optional[str]:
-    """Pokročilé hledání WAV souboru pro danou stranu (A/B/C...)."""
-    side_lower = side.lower()
-    patterns = [
-        f"side {side_lower}",
-        f"side_{side_lower}",
-        f"side-{side_lower}",
-        f"side{side_lower}",
-        f"{side_lower} side",
-        f"{side_lower}_side",
-        f"{side_lower}-side",
-        f"{side_lower}side",
-        f"^{side_lower}[._-]",
-        f"[._-]{side_lower}[._-]",
-        f"[._-]{side_lower}$",
-    ]
-    for wav_path in available_wavs:
-        filename_lower = Path(wav_path).name.lower()
-        for pattern in patterns:
-            if pattern.startswith('^') or pattern.endswith('$') or '[' in pattern:
-                if re.search(pattern, filename_lower):
-                    return wav_path
-            else:
-                if pattern in filename_lower:
-                    return wav_path
-    return None
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from vinyl_preflight.core.filename_index import FilenameIndex
+
+def find_wav_for_side(side: str, available_wavs: Dict[str, Optional[float]],
+                      index: Optional[FilenameIndex] = None) -> Optional[str]:
+    """Pokročilé hledání WAV souboru pro danou stranu (A/B/C...).
+
+    Se sdíleným `index` projektu je to jen vyhledání ve slovníku.
+    """
+    if index is None:
+        index = FilenameIndex(available_wavs)
+    return index.wav_for_side(side, available_wavs)
+
+
+# párování skladeb z PDF na WAV po skladbách
+MATCH_MIN_SCORE = 70  # skóre názvu (0-100) musí být vyšší, jinak skladba zůstane nespárovaná
+# délka rozhoduje jen mezi stejně dobrými názvy; blízkost délky klesá lineárně
+# od 1 (stejná délka) k 0 při rozdílu DURATION_SCALE_SECONDS
+DURATION_SCALE_SECONDS = 30.0
+_FORBIDDEN = float('inf')
+# thefuzz (force_ascii) před porovnáním mazal znaky U+0080-U+00FF (á, í, é, ...); zachováno kvůli stejným skóre
+_LATIN1_SUPPLEMENT = {code: None for code in range(128, 256)}
+
+
+def _fuzz_key(name: str) -> str:
+    from rapidfuzz.utils import default_process
+    from vinyl_preflight.utils.text import normalize_string
+
+    return default_process(normalize_string(name).translate(_LATIN1_SUPPLEMENT))
+
+
+def name_similarity_matrix(titles: Sequence[str], wav_paths: Sequence[str]) -> List[List[float]]:
+    """Skóre token_set_ratio (0-100, zaokrouhlené jako thefuzz) všech dvojic skladba × WAV.
+
+    Názvy se normalizují jednou za projekt (včetně zpracování jako thefuzz)
+    a celá matice se počítá jedním voláním rapidfuzz.
+    """
+    from rapidfuzz import fuzz, process
+
+    if not titles or not wav_paths:
+        return [[] for _ in titles]
+    queries = [_fuzz_key(t) for t in titles]
+    choices = [_fuzz_key(Path(p).stem) for p in wav_paths]
+    matrix = process.cdist(queries, choices, scorer=fuzz.token_set_ratio, workers=-1)
+    return [[float(round(score)) for score in row] for row in matrix.tolist()]
+
+
+def min_cost_assignment(cost: List[List[float]]) -> List[Tuple[int, int]]:
+    """Maďarská metoda (O(n²·m)) pro obdélníkovou matici n ≤ m; vrací dvojice (řádek, sloupec).
+
+    `inf` = zakázaná dvojice; řádek, který nejde přiřadit bez zakázané dvojice, ve výsledku chybí.
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    m = len(cost[0])
+    if n > m:
+        transposed = [[cost[i][j] for i in range(n)] for j in range(m)]
+        return sorted((i, j) for j, i in min_cost_assignment(transposed))
+    # zakázané dvojice nahradí velká konečná cena, aby potenciály zůstaly konečné
+    finite = [c for row in cost for c in row if c != _FORBIDDEN]
+    big = (max((abs(c) for c in finite), default=0.0) + 1.0) * (n + 1)
+    a = [[big if c == _FORBIDDEN else c for c in row] for row in cost]
+
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)  # p[j] = řádek (od 1) přiřazený sloupci j
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            delta = float('inf')
+            j1 = 0
+            row = a[i0 - 1]
+            ui0 = u[i0]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    pairs = [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+    return sorted((i, j) for i, j in pairs if cost[i][j] != _FORBIDDEN)
+
+
+def _duration_closeness(pdf_dur: Optional[float], wav_dur: Optional[float]) -> float:
+    if pdf_dur is None or wav_dur is None:
+        return 0.0
+    return max(0.0, 1.0 - abs(wav_dur - pdf_dur) / DURATION_SCALE_SECONDS)
+
+
+def match_tracks_to_wavs(tracks: Sequence[Dict], wav_durations: Dict[str, Optional[float]],
+                         min_score: float = MATCH_MIN_SCORE) -> List[Optional[str]]:
+    """Globálně optimální přiřazení skladeb k WAV (každý WAV nejvýš jedné skladbě).
+
+    Kandidátem je jen dvojice se skóre názvu > `min_score`; mezi kandidáty se
+    maximalizuje součet skóre názvu, blízkost délky rozhoduje jen při shodném
+    součtu. Vrací cestu WAV pro každou skladbu (ve stejném pořadí), nebo None.
+    """
+    wav_paths = list(wav_durations)
+    scores = name_similarity_matrix([t.get('title', '') or '' for t in tracks], wav_paths)
+    # skóre jsou celá čísla: součet vah za délku (nejvýš jedna za pár) musí zůstat pod 1 bodem
+    tie_weight = 1.0 / (min(len(tracks), len(wav_paths)) + 1)
+    # nekandidát má cenu 0 = "nespárovat", takže se hledá párování s maximální vahou
+    cost = [[-(score + tie_weight * _duration_closeness(track.get('duration_seconds'), wav_durations[wav_paths[j]]))
+             if score > min_score else 0.0
+             for j, score in enumerate(row)]
+            for track, row in zip(tracks, scores)]
+    matched: List[Optional[str]] = [None] * len(tracks)
+    if wav_paths:
+        for i, j in min_cost_assignment(cost):
+            if scores[i][j] > min_score:
+                matched[i] = wav_paths[j]
+    return matched
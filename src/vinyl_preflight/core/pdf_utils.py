@@ -1,10 +1,188 @@
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import hashlib
+import heapq
+import re
 import fitz  # PyMuPDF
 
-def extract_text_from_pdf(path: Path) -> str:
-    doc = fitz.open(path)
+from vinyl_preflight.core.executor import IO_BOUND, run_tasks
+from vinyl_preflight.io.archive_fs import ArchiveMember
+from vinyl_preflight.core.tracklist_parser import TIME_TOKEN
+from vinyl_preflight.io.cache import SqliteCache, open_cache
+
+# změna verze (např. jiná normalizace textu) zneplatní uložené texty
+PDF_TEXT_CACHE_NAMESPACE = "pdf_text_v2"
+PDF_TEXT_CACHE_MAX_ENTRIES = 20_000
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+# jen text: bez TEXT_PRESERVE_IMAGES se obrázky nedekódují, ligatury se rozloží na písmena
+TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_CID_FOR_UNKNOWN_UNICODE
+# výběr stránek až od této délky PDF (tiskové podklady s grafikou mají desítky až stovky stran)
+PAGE_SELECTION_MIN_PAGES = 6
+MAX_SELECTED_PAGES = 4
+# nejvíc stránek, které jeden dokument po výběru pošle do promptu
+MAX_PROMPT_PAGES = max(PAGE_SELECTION_MIN_PAGES - 1, MAX_SELECTED_PAGES)
+_TRACKLIST_HINT = re.compile(
+    r'\b(?:track\s*list(?:ing)?|side\s*[A-H]|strana\s*[A-H]|seite\s*[A-H]|total(?:\s+running)?\s+time|total)\b',
+    re.IGNORECASE,
+)
+
+PdfSource = Union[Path, ArchiveMember]
+
+
+def normalize_page_text(text: str) -> str:
+    """Sjednotí konce řádků a odstraní koncové mezery."""
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip('\n')
+
+
+def content_hash(data_or_path: Union[bytes, Path]) -> str:
+    digest = hashlib.sha256()
+    if isinstance(data_or_path, bytes):
+        digest.update(data_or_path)
+    else:
+        with open(data_or_path, 'rb') as f:
+            for buf in iter(lambda: f.read(_HASH_BUFFER_SIZE), b''):
+                digest.update(buf)
+    return digest.hexdigest()
+
+
+class PdfTextCache:
+    """Perzistentní cache textu PDF adresovaná obsahem (SHA-256 souboru)."""
+
+    def __init__(self, cache: SqliteCache):
+        self.cache = cache
+
+    @classmethod
+    def open(cls, cache_dir: Optional[Path] = None) -> Optional["PdfTextCache"]:
+        cache = open_cache(PDF_TEXT_CACHE_NAMESPACE, cache_dir, max_entries=PDF_TEXT_CACHE_MAX_ENTRIES)
+        return cls(cache) if cache is not None else None
+
+    def get(self, digest: str) -> Optional[Dict]:
+        return self.cache.get(digest)
+
+    def put(self, digest: str, pages: List[str], page_count: int) -> None:
+        # pages = jen stránky vybrané pro prompt (viz select_pages), page_count = skutečný počet stran
+        self.cache.set(digest, {'pages': pages, 'selected_pages': len(pages), 'page_count': page_count})
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def close(self) -> None:
+        self.cache.close()
+
+
+def tracklist_score(text: str) -> int:
+    """Hrubé skóre "stránka obsahuje tracklist": časové údaje a klíčová slova."""
+    return 2 * len(TIME_TOKEN.findall(text)) + len(_TRACKLIST_HINT.findall(text))
+
+
+def select_pages(pages: Iterable[str], page_count: int, max_pages: int = MAX_SELECTED_PAGES,
+                 min_pages: int = PAGE_SELECTION_MIN_PAGES) -> List[str]:
+    """Z dlouhého dokumentu ponechá nejvýš `max_pages` stránek s nejvyšším skóre (v původním pořadí).
+
+    Stránky se procházejí průběžně a drží se jen text kandidátů. Když žádná
+    stránka nemá známky tracklistu, vrátí prvních `max_pages` stránek.
+    """
+    if page_count < min_pages:
+        return list(pages)
+    best: List = []  # min-halda (skóre, -index, text)
+    first: List[str] = []
+    for index, text in enumerate(pages):
+        if index < max_pages:
+            first.append(text)
+        score = tracklist_score(text)
+        if score <= 0:
+            continue
+        if len(best) < max_pages:
+            heapq.heappush(best, (score, -index, text))
+        elif (score, -index) > best[0][:2]:
+            heapq.heapreplace(best, (score, -index, text))
+    if not best:
+        return first
+    return [text for _, _, text in sorted(best, key=lambda item: -item[1])]
+
+
+def prompt_page_count(page_count: int) -> int:
+    """Kolik stránek dokumentu o `page_count` stranách projde výběrem select_pages."""
+    return page_count if page_count < PAGE_SELECTION_MIN_PAGES else min(page_count, MAX_SELECTED_PAGES)
+
+
+def probe_page_count(path: PdfSource) -> Optional[int]:
+    """Počet stránek bez čtení obsahu (PyMuPDF načte jen xref); členy archivů se nesondují."""
+    if isinstance(path, ArchiveMember):
+        return None
+    try:
+        with fitz.open(path) as doc:
+            return doc.page_count
+    except Exception:
+        return None
+
+
+def _page_texts(doc) -> Iterable[str]:
+    for page in doc:
+        yield normalize_page_text(page.get_text("text", flags=TEXT_FLAGS))
+
+
+def _extract_pages(doc, select: bool = True) -> List[str]:
+    if not select:
+        return list(_page_texts(doc))
+    return select_pages(_page_texts(doc), doc.page_count)
+
+
+def source_digest(path: PdfSource) -> str:
+    """Obsahový hash PDF (klíč do PdfTextCache)."""
+    return content_hash(path.read_bytes() if isinstance(path, ArchiveMember) else path)
+
+
+def source_digests(paths: Iterable[PdfSource]) -> Dict[str, str]:
+    """Obsahové hashe PDF podle as_posix cesty (ve vláknech); nečitelné soubory chybí.
+
+    Spočítá se jednou za běh a předává se odhadu tokenů i načítání dokumentů,
+    ať se každé PDF (a člen archivu) čte kvůli hashi jen jednou.
+    """
+    return {path.as_posix(): digest for path, digest, error in run_tasks(source_digest, paths, kind=IO_BOUND)
+            if error is None}
+
+
+def parse_pdf(path: PdfSource, data: Optional[bytes] = None, select: bool = True) -> Tuple[List[str], int]:
+    """Parsuje PDF přes PyMuPDF (bez cache); vhodné pro spuštění v procesovém poolu.
+
+    Vrací (text stránek, počet stran dokumentu). Při `select` se z dlouhých
+    PDF vrací jen stránky se známkami tracklistu.
+    """
+    if isinstance(path, ArchiveMember):
+        # PDF z archivu se čte do paměti, bez zápisu na disk
+        doc = fitz.open(stream=data if data is not None else path.read_bytes(), filetype="pdf")
+    else:
+        doc = fitz.open(path)
     try:
-        return "\n".join(page.get_text() for page in doc)
+        return _extract_pages(doc, select), doc.page_count
     finally:
         doc.close()
 
+
+def parse_pdf_pages(path: PdfSource, data: Optional[bytes] = None, select: bool = True) -> List[str]:
+    """Jako parse_pdf, ale jen text stránek."""
+    return parse_pdf(path, data, select)[0]
+
+
+def extract_pages_from_pdf(path: PdfSource, cache: Optional[PdfTextCache] = None) -> List[str]:
+    """Vrátí normalizovaný text jednotlivých stránek; nezměněné PDF se čtou z cache bez PyMuPDF."""
+    data = path.read_bytes() if isinstance(path, ArchiveMember) else None
+    digest = None
+    if cache is not None:
+        digest = content_hash(data if data is not None else path)
+        hit = cache.get(digest)
+        if hit is not None:
+            return hit['pages']
+
+    pages, page_count = parse_pdf(path, data)
+
+    if cache is not None:
+        cache.put(digest, pages, page_count)
+    return pages
+
+
+def extract_text_from_pdf(path: PdfSource, cache: Optional[PdfTextCache] = None) -> str:
+    return "\n".join(extract_pages_from_pdf(path, cache))
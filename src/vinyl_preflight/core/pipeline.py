@@ -1,32 +1,231 @@
-from typing import Dict
-from vinyl_preflight.models import Project, ExtractionResult
+from pathlib import Path
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+import functools
+import heapq
+import math
+
+from vinyl_preflight.core.compaction import compact_pages
+from vinyl_preflight.core.executor import IO_BOUND, run_tasks
+from vinyl_preflight.core.extraction import (MAX_PARALLEL_API_REQUESTS, extract_documents, extract_locally,
+                                             load_document)
+from vinyl_preflight.core.filename_index import FilenameIndex
+from vinyl_preflight.core.pdf_utils import (MAX_PROMPT_PAGES, PdfTextCache, probe_page_count, prompt_page_count,
+                                             source_digests)
+from vinyl_preflight.core.validator import validate_consolidated_project, validate_individual_project
+from vinyl_preflight.core.wav_utils import probe_wav
+from vinyl_preflight.llm.client import LLMClient
+from vinyl_preflight.models import ExtractionResult, Project, Track
+from vinyl_preflight.utils.text import estimate_tokens
 
-# definice kroků pipeline jako samostatné funkce
+
+# definice kroků pipeline jako samostatné funkce (app.run je skládá do PipelineExecutor)
 
 def ingest(source_path: str) -> Project:
-    # stub: najde projekty v rozbaleném adresáři
-    return Project(name=source_path)
+    """Najde PDF a WAV projektu ve složce `source_path`; neexistující cesta dá prázdný projekt."""
+    root = Path(source_path)
+    if not root.is_dir():
+        return Project(name=root.name or source_path)
+    return Project(name=root.name, pdfs=sorted(root.rglob("*.pdf")), wavs=sorted(root.rglob("*.wav")))
 
-def extract(project: Project) -> ExtractionResult:
-    # stub: extrahuje tracky z PDFs pomocí LLM + pdf_utils (později)
-    return ExtractionResult(source=project.name, status='ok')
 
-def validate(result: ExtractionResult) -> ExtractionResult:
-    # stub validace
-    return result
+def extract(project: Project, llm_client: Optional[LLMClient] = None) -> ExtractionResult:
+    """Tracklist prvního PDF projektu: lokální parser, nejistý text do LLM (jen s `llm_client`)."""
+    if not project.pdfs:
+        return ExtractionResult(source=project.name, status='error', error="Projekt neobsahuje PDF.")
+    document = load_document(project.pdfs[0])
+    result = extract_locally(document)
+    if result is None:
+        if llm_client is None:
+            return ExtractionResult(source=document["identifier"], status='error',
+                                    error="Tracklist nejde přečíst lokálně a LLM klient není k dispozici.")
+        result = extract_documents([document], llm_client)[0]
+    if result.get("status") != "success":
+        return ExtractionResult(source=result["source_identifier"], status='error', error=result.get("error_message"))
+    tracks = [Track(**{**track, "title": track.get("title") or ""}) for track in result.get("data") or []]
+    return ExtractionResult(source=result["source_identifier"], status='success', tracks=tracks)
 
-def report(result: ExtractionResult) -> Dict:
-    return {'report_for': result.source}
 
-from pathlib import Path
-from typing import List
+def validate(project: Project, result: ExtractionResult) -> List[Dict]:
+    """Porovná tracklist s délkami WAV projektu (mód strany/tracky podle jmen WAV)."""
+    wav_durations: Dict[str, Optional[float]] = {}
+    for wav_path, info, error in run_tasks(probe_wav, project.wavs, kind=IO_BOUND):
+        wav_durations[wav_path.as_posix()] = None if error is not None else info.get("duration")
+    pdf_result = {"source_identifier": result.source, "status": result.status, "error_message": result.error,
+                  "data": [track.model_dump() for track in result.tracks]}
+    index = FilenameIndex(wav_durations)
+    if index.is_consolidated():
+        return validate_consolidated_project(project.name, pdf_result, wav_durations, index)
+    return validate_individual_project(project.name, pdf_result, wav_durations)
+
+
+def report(project: Project, rows: List[Dict]) -> Dict:
+    """Souhrn validace jednoho projektu."""
+    statuses = [row.get("status") for row in rows]
+    return {"project": project.name, "rows": rows, "ok": statuses.count("OK"),
+            "warn": statuses.count("WARN"), "fail": statuses.count("FAIL")}
+
 
 MAX_PDFS_PER_BATCH = 50
 
-def create_pdf_batches(projects: dict) -> List[List[Path]]:
-    all_pdfs_to_process = [pdf_path for proj in projects.values() for pdf_path in proj.get('pdfs', [])]
-    batches: List[List[Path]] = []
-    for i in range(0, len(all_pdfs_to_process), MAX_PDFS_PER_BATCH):
-        batches.append(all_pdfs_to_process[i:i + MAX_PDFS_PER_BATCH])
-    return batches
+# rozpočet jednoho požadavku (gemini-2.5-flash má 1M vstup / 65k výstup, necháváme rezervu)
+BATCH_INPUT_TOKEN_BUDGET = 200_000
+BATCH_OUTPUT_TOKEN_BUDGET = 32_000
+PROMPT_OVERHEAD_TOKENS = 400  # instrukce + JSON obálka dokumentu
+# odhad bez textu: PDF tracklistu má typicky 30-100 bajtů na token textu, bereme horní odhad
+PDF_BYTES_PER_TOKEN = 32
+# ... ale nejvýš hustá stránka textu na každou stránku, která půjde do promptu
+# (velikost PDF s grafikou nebo vloženými fonty s množstvím textu nesouvisí)
+MAX_TOKENS_PER_PAGE = 1_500
+MIN_DOCUMENT_TOKENS = 50
+# výstup (JSON skladeb) je zhruba úměrný textu tracklistu
+OUTPUT_TOKENS_PER_INPUT_TOKEN = 0.5
+OUTPUT_TOKENS_PER_DOCUMENT = 60
+
+
+def estimate_text_tokens(text: str) -> int:
+    return max(MIN_DOCUMENT_TOKENS, estimate_tokens(text))
+
+
+def _estimate_from_size(pdf_path: Path) -> int:
+    """Odhad bez textu: z velikosti souboru, omezený počtem stránek, které projdou do promptu."""
+    try:
+        size = pdf_path.stat().st_size
+    except OSError:
+        return MIN_DOCUMENT_TOKENS
+    page_count = probe_page_count(pdf_path)
+    pages = prompt_page_count(page_count) if page_count is not None else MAX_PROMPT_PAGES
+    return max(MIN_DOCUMENT_TOKENS, min(size // PDF_BYTES_PER_TOKEN, pages * MAX_TOKENS_PER_PAGE))
+
+
+def _estimate_from_cache(text_cache: PdfTextCache, digests: Mapping[str, str], pdf_path: Path) -> Optional[int]:
+    digest = digests.get(pdf_path.as_posix())
+    hit = text_cache.get(digest) if digest is not None else None
+    # do promptu jde zhuštěný text, odhad musí odpovídat jemu
+    return estimate_text_tokens(compact_pages(hit['pages'])) if hit is not None else None
+
+
+def estimate_pdf_tokens(pdf_paths: Sequence[Path], text_cache: Optional[PdfTextCache] = None,
+                        digests: Optional[Mapping[str, str]] = None) -> dict:
+    """Odhad vstupních tokenů podle as_posix cesty: z textu v PdfTextCache, jinak z velikosti a počtu stránek.
+
+    `digests` (viz pdf_utils.source_digests) se použijí pro dotaz do cache;
+    bez nich se hashe spočítají zde.
+    """
+    estimates = {}
+    if text_cache is not None:
+        if digests is None:
+            digests = source_digests(pdf_paths)
+        for pdf_path, tokens, error in run_tasks(functools.partial(_estimate_from_cache, text_cache, digests),
+                                                   pdf_paths, kind=IO_BOUND):
+            if error is None and tokens is not None:
+                estimates[pdf_path.as_posix()] = tokens
+    missing = [p for p in pdf_paths if p.as_posix() not in estimates]
+    for pdf_path, tokens, error in run_tasks(_estimate_from_size, missing, kind=IO_BOUND):
+        estimates[pdf_path.as_posix()] = tokens if error is None else MIN_DOCUMENT_TOKENS
+    return estimates
+
+
+def estimate_output_tokens(input_tokens: int) -> int:
+    return int(input_tokens * OUTPUT_TOKENS_PER_INPUT_TOKEN) + OUTPUT_TOKENS_PER_DOCUMENT
+
+
+def _pack_units(units: List[Tuple[int, int, List[int]]], input_room: int, output_budget: int,
+                max_documents: int, parallelism: int) -> List[List[int]]:
+    """Rozdělí nedělitelné jednotky (vstup, výstup, indexy dokumentů) do dávek; vrací indexy."""
+    if not units:
+        return []
+    # dolní mez počtu dávek podle nejtěsnějšího omezení
+    needed = max(math.ceil(sum(u[0] for u in units) / input_room),
+                 math.ceil(sum(u[1] for u in units) / output_budget),
+                 math.ceil(sum(len(u[2]) for u in units) / max_documents))
+    waves = math.ceil(needed / max(1, parallelism))
+    target = min(len(units), max(needed, waves * max(1, parallelism)))
+
+    bins: List[List[int]] = [[] for _ in range(target)]
+    used_in = [0] * target
+    used_out = [0] * target
+    heap = [(0, b) for b in range(target)]  # (zatížení výstupem, dávka)
+    for tokens, out, indices in sorted(units, key=lambda u: (-u[1], u[2][0])):
+        skipped = []
+        placed = None
+        while heap:
+            load, b = heapq.heappop(heap)
+            if (used_in[b] + tokens <= input_room and used_out[b] + out <= output_budget
+                    and len(bins[b]) + len(indices) <= max_documents):
+                placed = b
+                break
+            skipped.append((load, b))
+        if placed is None:
+            # odhad dolní meze nestačil (fragmentace) - nová dávka
+            placed = len(bins)
+            bins.append([])
+            used_in.append(0)
+            used_out.append(0)
+        bins[placed].extend(indices)
+        used_in[placed] += tokens
+        used_out[placed] += out
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        heapq.heappush(heap, (used_out[placed], placed))
+    return [sorted(b) for b in bins if b]
+
+
+def pack_batches(items: Sequence[Tuple[Path, int]], input_budget: int = BATCH_INPUT_TOKEN_BUDGET,
+                 output_budget: int = BATCH_OUTPUT_TOKEN_BUDGET, max_documents: int = MAX_PDFS_PER_BATCH,
+                 parallelism: int = MAX_PARALLEL_API_REQUESTS,
+                 groups: Optional[Sequence[Hashable]] = None) -> List[List[Path]]:
+    """Rozdělí (PDF, odhad tokenů) do dávek v rámci vstupního i výstupního rozpočtu.
+
+    S `groups` (např. název projektu pro každý dokument) zůstávají dokumenty
+    jedné skupiny v jedné dávce; skupina větší než rozpočet dostane vlastní
+    dávky, které s jinými skupinami nesdílí. Dokument, který se do rozpočtu
+    nevejde ani sám, jde do vlastní dávky. Počet dávek se zaokrouhlí nahoru
+    na násobek `parallelism`: při stejném počtu vln API požadavků jsou dávky
+    menší a dřív hotové. Jednotky se rozdělují od největší do nejméně
+    zatížené dávky, uvnitř dávky zůstává vstupní pořadí. Dávky jsou seřazené
+    od nejmenšího odhadu výstupu - malé projekty jsou hotové nejdřív.
+    """
+    input_room = input_budget - PROMPT_OVERHEAD_TOKENS
+    outputs = [estimate_output_tokens(tokens) for _, tokens in items]
+    grouped: Dict[Hashable, List[int]] = {}
+    for index in range(len(items)):
+        grouped.setdefault(groups[index] if groups is not None else index, []).append(index)
+
+    batches: List[List[int]] = []
+    units: List[Tuple[int, int, List[int]]] = []
+    for indices in grouped.values():
+        tokens = sum(items[i][1] for i in indices)
+        out = sum(outputs[i] for i in indices)
+        if tokens <= input_room and out <= output_budget and len(indices) <= max_documents:
+            units.append((tokens, out, indices))
+        elif len(indices) == 1:
+            batches.append(indices)
+        else:
+            # skupina se nevejde do jedné dávky - rozdělí se po dokumentech, jen mezi své dávky
+            singles = []
+            for i in indices:
+                if items[i][1] > input_room or outputs[i] > output_budget:
+                    batches.append([i])
+                else:
+                    singles.append((items[i][1], outputs[i], [i]))
+            batches.extend(_pack_units(singles, input_room, output_budget, max_documents, 1))
+    batches.extend(_pack_units(units, input_room, output_budget, max_documents, parallelism))
+
+    batches.sort(key=lambda b: (sum(outputs[i] for i in b), b[0]))
+    return [[items[i][0] for i in b] for b in batches]
+
+
+def create_pdf_batches(projects: dict, token_estimates: Optional[Mapping[str, int]] = None) -> List[List[Path]]:
+    """Dávky PDF pro LLM podle odhadu tokenů; PDF jednoho projektu zůstávají pohromadě (viz pack_batches).
 
+    `token_estimates` (as_posix → tokeny) typicky z estimate_pdf_tokens;
+    chybějící odhady se dopočítají z velikosti a počtu stránek.
+    """
+    token_estimates = token_estimates or {}
+    items: List[Tuple[Path, int]] = []
+    groups: List[str] = []
+    for name, proj in projects.items():
+        for pdf_path in proj.get('pdfs', []):
+            items.append((pdf_path, token_estimates.get(pdf_path.as_posix()) or _estimate_from_size(pdf_path)))
+            groups.append(name)
+    return pack_batches(items, groups=groups)
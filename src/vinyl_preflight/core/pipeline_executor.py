@@ -0,0 +1,224 @@
+"""Pipeline s kroky ve vlastních vláknech a omezenými frontami mezi nimi."""
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 64
+_POLL_SECONDS = 0.1
+_STOP = object()
+
+
+class Stage:
+    """Krok pipeline.
+
+    `fn(položka)` vrací iterovatelný výstup (0..n položek pro další krok),
+    typicky generátor. `finish()` se zavolá jednou po zpracování všech
+    vstupů a může vrátit ještě zbylé položky (např. neúplné skupiny).
+    Krok s jedním workerem smí držet stav bez zámků.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Iterable[Any]], workers: int = 1,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, finish: Optional[Callable[[], Iterable[Any]]] = None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.finish = finish
+
+
+def callback_source(producer: Callable[[Callable[[Any], None]], Any],
+                    queue_size: int = DEFAULT_QUEUE_SIZE) -> Iterator[Any]:
+    """Z API s callbackem (`producer(emit)`) udělá iterátor; producent běží ve vlastním vlákně.
+
+    Fronta je omezená - pomalý odběratel producenta přibrzdí. Výjimka
+    producenta se vyhodí v iterátoru.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    failure: List[BaseException] = []
+
+    def target():
+        try:
+            producer(q.put)
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            q.put(_STOP)
+
+    thread = threading.Thread(target=target, name="pipeline-source", daemon=True)
+    thread.start()
+    while True:
+        item = q.get()
+        if item is _STOP:
+            break
+        yield item
+    thread.join()
+    if failure:
+        raise failure[0]
+
+
+class PipelineExecutor:
+    """Spustí kroky za sebou; mezi kroky jsou omezené fronty (backpressure).
+
+    Položka postupuje dalším krokem hned, jak ji předchozí krok vydá, bez
+    čekání na ostatní. Chyba při zpracování položky se zaznamená do
+    `errors` (krok, položka, výjimka) a pipeline pokračuje.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        if not stages:
+            raise ValueError("Pipeline musí mít alespoň jeden krok")
+        self.stages = list(stages)
+        self.errors: List[Tuple[str, Any, BaseException]] = []
+        self._errors_lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    def _record(self, stage: str, item: Any, error: BaseException) -> None:
+        logger.error("Chyba v kroku '%s': %s", stage, error)
+        with self._errors_lock:
+            self.errors.append((stage, item, error))
+
+    def _put(self, q: "queue.Queue", item: Any) -> bool:
+        while not self._cancel.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: "queue.Queue") -> Any:
+        while not self._cancel.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _STOP
+
+    def _emit_all(self, stage: Stage, outputs: Optional[Iterable[Any]], out_q: "queue.Queue", item: Any) -> None:
+        try:
+            for output in outputs or ():
+                if not self._put(out_q, output):
+                    return
+        except Exception as e:
+            self._record(stage.name, item, e)
+
+    def run(self, *sources: Iterable[Any]) -> Iterator[Any]:
+        """Spustí pipeline nad vstupy (každý zdroj čte vlastní vlákno) a průběžně vrací výstupy posledního kroku."""
+        sources = sources or ((),)
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        queues.append(queue.Queue(maxsize=self.stages[-1].queue_size))
+        # kolik producentů do fronty i ještě běží; poslední pošle STOP všem workerům dalšího kroku
+        producers = [len(sources)] + [stage.workers for stage in self.stages]
+        lock = threading.Lock()
+
+        def producer_done(index: int) -> None:
+            with lock:
+                producers[index] -= 1
+                last = producers[index] == 0
+            if not last:
+                return
+            if index > 0:
+                stage = self.stages[index - 1]
+                if stage.finish is not None:
+                    try:
+                        outputs = stage.finish()
+                    except Exception as e:
+                        self._record(stage.name, None, e)
+                        outputs = None
+                    self._emit_all(stage, outputs, queues[index], None)
+            consumers = self.stages[index].workers if index < len(self.stages) else 1
+            for _ in range(consumers):
+                self._put(queues[index], _STOP)
+
+        def feed(source: Iterable[Any]) -> None:
+            try:
+                for item in source:
+                    if not self._put(queues[0], item):
+                        break
+            except Exception as e:
+                self._record("source", None, e)
+            finally:
+                producer_done(0)
+
+        def work(index: int) -> None:
+            stage = self.stages[index]
+            in_q, out_q = queues[index], queues[index + 1]
+            while True:
+                item = self._get(in_q)
+                if item is _STOP:
+                    break
+                try:
+                    outputs = stage.fn(item)
+                except Exception as e:
+                    self._record(stage.name, item, e)
+                    continue
+                self._emit_all(stage, outputs, out_q, item)
+            producer_done(index + 1)
+
+        feeders = [threading.Thread(target=feed, args=(source,), name="pipeline-feed", daemon=True) for source in sources]
+        workers = [threading.Thread(target=work, args=(index,), name=f"pipeline-{stage.name}", daemon=True)
+                   for index, stage in enumerate(self.stages) for _ in range(stage.workers)]
+        for thread in feeders + workers:
+            thread.start()
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _STOP:
+                    break
+                yield item
+        finally:
+            # předčasně ukončený odběr (nebo chyba odběratele) zastaví všechny kroky;
+            # na zdroje se nečeká, mohou být blokované v cizím kódu
+            self._cancel.set()
+            for thread in workers:
+                thread.join()
+
+
+class ProjectJoin:
+    """Spojuje průběžné výsledky (délky WAV, výsledky PDF) po projektech.
+
+    `add()` vrátí hotový projekt, jakmile dorazí poslední z jeho souborů;
+    `flush()` na konci vydá neúplné projekty (chybějící hodnoty jsou None).
+    Není thread-safe - patří do kroku s jedním workerem.
+    """
+
+    def __init__(self, projects: Mapping[str, Mapping[str, Sequence[Path]]]):
+        self.projects = projects
+        self._owner: dict = {}
+        self._pending: dict = {}
+        self._values: dict = {}
+        for name, info in projects.items():
+            keys = [('pdf', p.as_posix()) for p in info.get('pdfs', [])] + [('wav', p.as_posix()) for p in info.get('wavs', [])]
+            for key in keys:
+                self._owner[key] = name
+            self._pending[name] = len(keys)
+            self._values[name] = {}
+
+    def add(self, kind: str, key: str, value: Any) -> Optional[dict]:
+        name = self._owner.pop((kind, key), None)
+        if name is None:
+            return None  # neznámý nebo opakovaný soubor
+        self._values[name][(kind, key)] = value
+        self._pending[name] -= 1
+        if self._pending[name] == 0:
+            return self._ready(name)
+        return None
+
+    def _ready(self, name: str) -> dict:
+        del self._pending[name]
+        info = self.projects[name]
+        values = self._values.pop(name)
+        return {
+            'name': name,
+            'pdf_results': {p.as_posix(): values.get(('pdf', p.as_posix())) for p in info.get('pdfs', [])},
+            'wav_durations': {p.as_posix(): values.get(('wav', p.as_posix())) for p in info.get('wavs', [])},
+        }
+
+    def flush(self) -> List[dict]:
+        if self._pending:
+            logger.warning("Neúplné projekty na konci pipeline: %s", ", ".join(self._pending))
+        return [self._ready(name) for name in list(self._pending)]
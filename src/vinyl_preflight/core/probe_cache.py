@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import hashlib
+import logging
+
+from vinyl_preflight.io.archive_fs import ArchiveMember
+from vinyl_preflight.io.cache import SqliteCache, open_cache
+
+logger = logging.getLogger(__name__)
+
+# změna verze zneplatní všechny dříve uložené výsledky
+PROBE_CACHE_NAMESPACE = "wav_probe_v1"
+PROBE_CACHE_MAX_ENTRIES = 200_000
+PARTIAL_HASH_BYTES = 4096
+
+WavPath = Union[Path, ArchiveMember]
+
+
+def file_identity(path: WavPath) -> str:
+    """Stabilní identita souboru: velikost + mtime + levný hash začátku a konce.
+
+    U členů archivu se místo částečného hashe použije CRC z centrálního
+    adresáře, které pokrývá celý obsah a nic se kvůli němu nečte.
+    """
+    if isinstance(path, ArchiveMember):
+        return f"{path.size}:{int(path.mtime)}:crc{path.crc:08x}"
+    st = path.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+        if st.st_size > 2 * PARTIAL_HASH_BYTES:
+            f.seek(-PARTIAL_HASH_BYTES, 2)
+            digest.update(f.read(PARTIAL_HASH_BYTES))
+    return f"{st.st_size}:{st.st_mtime_ns}:{digest.hexdigest()}"
+
+
+class ProbeCache:
+    """Perzistentní cache výsledků probe WAV souborů (délka + formátová fakta)."""
+
+    def __init__(self, cache: SqliteCache):
+        self.cache = cache
+
+    @classmethod
+    def open(cls, cache_dir: Optional[Path] = None) -> Optional["ProbeCache"]:
+        cache = open_cache(PROBE_CACHE_NAMESPACE, cache_dir, max_entries=PROBE_CACHE_MAX_ENTRIES)
+        return cls(cache) if cache is not None else None
+
+    def lookup(self, paths: Iterable[WavPath]) -> Tuple[Dict[str, Dict[str, Any]], List[WavPath], Dict[str, str]]:
+        """Vrátí (zásahy podle as_posix, cesty k probe, identity podle as_posix)."""
+        paths = list(paths)
+        identities: Dict[str, str] = {}
+        misses: List[WavPath] = []
+        for path in paths:
+            try:
+                identities[path.as_posix()] = file_identity(path)
+            except OSError as e:
+                # chybu přístupu nahlásí až samotný probe
+                logger.debug("Nelze určit identitu souboru %s: %s", path, e)
+        cached = self.cache.get_many(identities.values())
+        hits: Dict[str, Dict[str, Any]] = {}
+        for path in paths:
+            identity = identities.get(path.as_posix())
+            if identity is not None and identity in cached:
+                hits[path.as_posix()] = cached[identity]
+            else:
+                misses.append(path)
+        return hits, misses, identities
+
+    def store(self, facts: Dict[str, Dict[str, Any]], identities: Dict[str, str]) -> None:
+        """Uloží úspěšné výsledky probe (klíč = as_posix cesty)."""
+        self.cache.set_many({identities[p]: f for p, f in facts.items() if f and p in identities})
+
+    def invalidate(self, paths: Iterable[WavPath]) -> None:
+        keys = []
+        for path in paths:
+            try:
+                keys.append(file_identity(path))
+            except OSError:
+                continue
+        self.cache.delete_many(keys)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def close(self) -> None:
+        self.cache.close()
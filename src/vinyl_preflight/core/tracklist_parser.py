@@ -0,0 +1,142 @@
+"""Deterministický parser standardních tracklistů ("A1 Title 3:45", "Side A" + "1. Title 3:45").
+
+Vrací stejné záznamy jako LLM extrakce ({"side", "track_number", "title",
+"duration_seconds"}) a skóre důvěry 0-1. Dokumenty s nízkou důvěrou se
+posílají do LLM.
+"""
+from typing import Dict, List, Optional, Tuple
+import re
+
+TIME_TOKEN = re.compile(r'(?<![\d:])(\d{1,2}):([0-5]\d)(?::([0-5]\d))?(?![\d:])')
+
+# "A1 Title 3:45", "B2. Artist - Title (4:10)", "C. Title ..... 12:30"
+_POSITION_TRACK = re.compile(
+    r'^\s*(?P<side>[A-Ha-h])\s?(?:(?P<num>\d{1,2})[\s.):\-]|[.):]\s*)\s*(?P<title>.*?)[\s.\-–…(\[]*'
+    r'(?P<dur>\d{1,2}:[0-5]\d(?::[0-5]\d)?)[)\]]?\s*$'
+)
+# "1. Title 3:45" (strana z nadpisu)
+_NUMBERED_TRACK = re.compile(
+    r'^\s*(?P<num>\d{1,2})[\s.):\-]+\s*(?P<title>.*?)[\s.\-–…(\[]*(?P<dur>\d{1,2}:[0-5]\d(?::[0-5]\d)?)[)\]]?\s*$'
+)
+# "Side A", "SIDE B - 18:32", "A-Side", "Seite C", "Strana D"
+_SIDE_HEADER = re.compile(
+    r'^\s*(?:(?:side|seite|strana|face)\s*[:\-]?\s*(?P<side1>[A-H])|(?P<side2>[A-H])\s*[\-_ ]?\s*side)\b(?P<rest>.*)$',
+    re.IGNORECASE,
+)
+_TOTAL = re.compile(r'\b(?:total|celkem|gesamt|side\s+length|running\s+time)\b', re.IGNORECASE)
+_POSITION_ONLY = re.compile(r'^\s*(?P<side>[A-Ha-h])\s?(?P<num>\d{1,2})\.?\s*$')
+_DURATION_ONLY = re.compile(r'^\s*[(\[]?(?P<dur>\d{1,2}:[0-5]\d(?::[0-5]\d)?)[)\]]?\s*$')
+
+# rozdíl součtu skladeb proti uvedenému součtu strany, který ještě tolerujeme
+SIDE_TOTAL_TOLERANCE_SECONDS = 3
+
+
+def parse_duration(token: str) -> Optional[int]:
+    m = TIME_TOKEN.search(token)
+    if not m:
+        return None
+    a, b, c = m.group(1), m.group(2), m.group(3)
+    if c is not None:
+        return int(a) * 3600 + int(b) * 60 + int(c)
+    return int(a) * 60 + int(b)
+
+
+def _clean_title(title: str) -> str:
+    return re.sub(r'[\s.\-–…:]+$', '', re.sub(r'^[\s.\-–:]+', '', title)).strip()
+
+
+def _join_split_lines(lines: List[str]) -> List[str]:
+    """Spojí sloupcový layout ("A1" / "Title" / "3:45" na samostatných řádcích) do jednoho řádku."""
+    out: List[str] = []
+    i = 0
+    while i < len(lines):
+        m = _POSITION_ONLY.match(lines[i])
+        if m and i + 2 < len(lines) and _DURATION_ONLY.match(lines[i + 2]) and lines[i + 1].strip():
+            out.append(f"{lines[i].strip()} {lines[i + 1].strip()} {lines[i + 2].strip()}")
+            i += 3
+            continue
+        out.append(lines[i])
+        i += 1
+    return out
+
+
+def parse_tracklist(text: str) -> Tuple[List[Dict], float]:
+    """Vrátí (skladby, důvěra). Důvěra 0 = nic rozumného nenalezeno."""
+    lines = _join_split_lines([line for line in text.splitlines() if line.strip()])
+    tracks: List[Dict] = []
+    side_totals: Dict[Optional[str], int] = {}  # None = celá deska
+    explained_times = 0
+    current_side: Optional[str] = None
+
+    for line in lines:
+        header = _SIDE_HEADER.match(line)
+        if header and not _POSITION_TRACK.match(line):
+            current_side = (header.group('side1') or header.group('side2')).upper()
+            total = parse_duration(header.group('rest') or '')
+            if total is not None:
+                side_totals[current_side] = total
+                explained_times += 1
+            continue
+
+        m = _POSITION_TRACK.match(line)
+        if m:
+            side = m.group('side').upper()
+            num = int(m.group('num')) if m.group('num') else 1
+            current_side = side
+        else:
+            m = _NUMBERED_TRACK.match(line)
+            if m:
+                side = current_side
+                num = int(m.group('num'))
+        if not m:
+            if _TOTAL.search(line):
+                total = parse_duration(line)
+                if total is not None:
+                    side_match = re.search(r'\b(?:side|seite|strana)\s*([A-H])?\b', line, re.IGNORECASE)
+                    if side_match is None:
+                        side = None  # součet celé desky
+                    else:
+                        side = (side_match.group(1) or current_side or '').upper() or None
+                    side_totals[side] = total
+                    explained_times += 1
+            continue
+        title = _clean_title(m.group('title'))
+        if not title:
+            continue
+        tracks.append({"side": side, "track_number": num, "title": title,
+                       "duration_seconds": parse_duration(m.group('dur'))})
+        explained_times += 1
+
+    return tracks, _confidence(text, tracks, side_totals, explained_times)
+
+
+def _confidence(text: str, tracks: List[Dict], side_totals: Dict[Optional[str], int], explained_times: int) -> float:
+    if not tracks:
+        return 0.0
+    if any(t['side'] is None for t in tracks):
+        # bez stran validace nedává smysl - necháme to na LLM
+        return 0.0
+    all_times = len(TIME_TOKEN.findall(text))
+    # časové údaje, které jsme nepřiřadili skladbě ani součtu, znamenají neznámý layout
+    confidence = min(1.0, explained_times / all_times) if all_times else 0.0
+
+    by_side: Dict[str, List[Dict]] = {}
+    for t in tracks:
+        by_side.setdefault(t['side'], []).append(t)
+    for side, side_tracks in by_side.items():
+        numbers = [t['track_number'] for t in side_tracks]
+        if numbers != list(range(1, len(numbers) + 1)):
+            confidence *= 0.8
+        total = side_totals.get(side)
+        if total is not None:
+            listed = sum(t['duration_seconds'] or 0 for t in side_tracks)
+            if abs(listed - total) > SIDE_TOTAL_TOLERANCE_SECONDS:
+                confidence *= 0.5
+    overall = side_totals.get(None)
+    if overall is not None:
+        listed = sum(t['duration_seconds'] or 0 for t in tracks)
+        if abs(listed - overall) > SIDE_TOTAL_TOLERANCE_SECONDS * len(by_side):
+            confidence *= 0.5
+    if len(tracks) == 1:
+        confidence *= 0.8
+    return round(confidence, 3)
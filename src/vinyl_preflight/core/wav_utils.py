@@ -1,8 +1,37 @@
 from pathlib import Path
+from typing import Any, Dict, Union
 import soundfile as sf
 
-def get_wav_duration(path: Path) -> float:
-    # vrátí délku v sekundách
-    info = sf.info(path)
-    return info.duration
+from vinyl_preflight.core.audio_probe import probe_file, probe_header
+from vinyl_preflight.io.archive_fs import ArchiveMember
+
+
+def _soundfile_info(source) -> Dict[str, Any]:
+    info = sf.info(source)
+    return {'duration': info.duration, 'frames': info.frames, 'samplerate': info.samplerate,
+            'channels': info.channels, 'format': info.format, 'subtype': info.subtype}
+
 
+def probe_wav(path: Union[Path, ArchiveMember]) -> Dict[str, Any]:
+    """Zjistí délku a formátová fakta (samplerate, channels, frames, format).
+
+    Nejdřív se zkusí čistě hlavičkový parser (core.audio_probe), neznámé
+    formáty jdou přes libsndfile.
+    """
+    if isinstance(path, ArchiveMember):
+        # člen archivu: stačí přečíst hlavičku, fallback na libsndfile nad streamem
+        with path.open() as f:
+            info = probe_header(f, path.size)
+            if info is not None:
+                return info
+        with path.open() as f:
+            return _soundfile_info(f)
+    info = probe_file(path)
+    if info is not None:
+        return info
+    return _soundfile_info(path)
+
+
+def get_wav_duration(path: Union[Path, ArchiveMember]) -> float:
+    # vrátí délku v sekundách
+    return probe_wav(path)['duration']
@@ -0,0 +1,140 @@
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Dict, List, NamedTuple
+import logging
+import time
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIXES = ('.zip', '.rar')
+
+
+class MemberStat(NamedTuple):
+    st_size: int
+    st_mtime: float
+
+
+class ArchiveMember:
+    """Path-like odkaz na soubor uvnitř ZIP/RAR archivu.
+
+    Implementuje podmnožinu rozhraní pathlib.Path, kterou používá pipeline
+    (name/stem/suffix, as_posix, exists, stat), a navíc open()/read_bytes()
+    pro čtení obsahu bez rozbalení archivu na disk.
+    """
+
+    __slots__ = ('archive', 'member', 'size', 'mtime', 'crc', 'stored')
+
+    def __init__(self, archive: Path, member: str, size: int = 0, mtime: float = 0.0, crc: int = 0,
+                 stored: bool = False):
+        self.archive = Path(archive)
+        self.member = member
+        self.size = size
+        self.mtime = mtime
+        self.crc = crc
+        # stored = člen je v archivu bez komprese
+        self.stored = stored
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.member).stem
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.member).suffix
+
+    def as_posix(self) -> str:
+        # identifikátor je záměrně "cesta": Path(identifikátor).name vrací jméno členu
+        return f"{self.archive.as_posix()}/{self.member}"
+
+    def exists(self) -> bool:
+        return self.archive.is_file()
+
+    def stat(self) -> MemberStat:
+        return MemberStat(st_size=self.size, st_mtime=self.mtime)
+
+    def open(self) -> BinaryIO:
+        """Otevře člen archivu jako (dopředně) čitelný binární stream."""
+        if self.archive.suffix.lower() == '.rar':
+            import rarfile  # type: ignore
+            rf = rarfile.RarFile(self.archive)
+            return rf.open(self.member)
+        zf = zipfile.ZipFile(self.archive)
+        try:
+            return zf.open(self.member)
+        finally:
+            # ZipExtFile drží vlastní referenci na soubor, archiv se zavře až se streamem
+            zf.close()
+
+    def read_bytes(self) -> bytes:
+        with self.open() as f:
+            return f.read()
+
+    def __str__(self) -> str:
+        return self.as_posix()
+
+    def __repr__(self) -> str:
+        return f"ArchiveMember({self.archive.name!r}, {self.member!r})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ArchiveMember):
+            return NotImplemented
+        return (self.archive, self.member) == (other.archive, other.member)
+
+    def __hash__(self) -> int:
+        return hash((self.archive, self.member))
+
+
+def is_archive(path: Path) -> bool:
+    return path.is_file() and path.suffix.lower() in ARCHIVE_SUFFIXES
+
+
+def _is_junk(name: str) -> bool:
+    # AppleDouble metadata (__MACOSX/, ._soubor.wav) nejsou skutečná audio/PDF data
+    parts = PurePosixPath(name).parts
+    return '__MACOSX' in parts or PurePosixPath(name).name.startswith('._')
+
+
+def list_members(archive_path: Path) -> List[ArchiveMember]:
+    """Manifest archivu: souborové členy jen z centrálního adresáře / RAR výpisu (bez dekomprese)."""
+    members: List[ArchiveMember] = []
+    if archive_path.suffix.lower() == '.rar':
+        import rarfile  # type: ignore
+        with rarfile.RarFile(archive_path) as rf:
+            for info in rf.infolist():
+                if info.is_dir() or _is_junk(info.filename):
+                    continue
+                mtime = time.mktime(info.date_time + (0, 0, -1)) if info.date_time else 0.0
+                stored = info.compress_type == getattr(rarfile, 'RAR_M0', 0x30)
+                members.append(ArchiveMember(archive_path, info.filename, info.file_size, mtime, info.CRC or 0, stored))
+        return members
+
+    with zipfile.ZipFile(archive_path) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or _is_junk(info.filename):
+                continue
+            mtime = time.mktime(info.date_time + (0, 0, -1))
+            stored = info.compress_type == zipfile.ZIP_STORED
+            members.append(ArchiveMember(archive_path, info.filename, info.file_size, mtime, info.CRC, stored))
+    return members
+
+
+def group_members(members: List[ArchiveMember]) -> Dict[str, List[ArchiveMember]]:
+    """Rozdělí manifest na PDF a WAV členy (ostatní soubory - artwork, stemy, DDP - vynechá)."""
+    pdfs: List[ArchiveMember] = []
+    wavs: List[ArchiveMember] = []
+    for member in members:
+        suffix = member.suffix.lower()
+        if suffix == '.pdf':
+            pdfs.append(member)
+        elif suffix == '.wav':
+            wavs.append(member)
+    return {'pdfs': pdfs, 'wavs': wavs}
+
+
+def scan_archive(archive_path: Path) -> Dict[str, List[ArchiveMember]]:
+    """Seskupí PDF a WAV členy archivu stejně jako rglob nad rozbalenou složkou."""
+    return group_members(list_members(archive_path))
@@ -1,19 +1,80 @@
 from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+import concurrent.futures
+import threading
+import time
 import zipfile
 import logging
 
+from vinyl_preflight.io.archive_fs import ArchiveMember, group_members, list_members
+
 logger = logging.getLogger(__name__)
 
+COPY_BUFFER_SIZE = 1024 * 1024
+# nekomprimované (stored) členy se jen kopírují, větší buffer = méně syscallů
+STORED_COPY_BUFFER_SIZE = 16 * 1024 * 1024
+
+# průběh extrakce jednoho archivu: (jméno archivu, hotové členy, celkem členů)
+ArchiveProgress = Callable[[str, int, int], None]
+
+
+class ExtractionTimeout(RuntimeError):
+    """Extrakce archivu překročila svůj časový limit."""
+
+
+class ScratchBudget:
+    """Globální rozpočet místa ve scratch prostoru sdílený paralelními extrakcemi.
+
+    Rozbalená data zůstávají na disku až do konce běhu, proto se rezervace
+    uvolňuje jen při selhání extrakce (data se smažou).
+    """
+
+    def __init__(self, limit_bytes: Optional[int] = None):
+        self.limit_bytes = limit_bytes
+        self.used_bytes = 0
+        self._lock = threading.Lock()
+
+    def try_reserve(self, n: int) -> bool:
+        with self._lock:
+            if self.limit_bytes is not None and self.used_bytes + n > self.limit_bytes:
+                return False
+            self.used_bytes += n
+            return True
+
+    def release(self, n: int) -> None:
+        with self._lock:
+            self.used_bytes = max(0, self.used_bytes - n)
+
+
+def _safe_target(dest: Path, member: str) -> Path:
+    # zabránit path traversal
+    p = Path(member)
+    if p.is_absolute() or '..' in p.parts:
+        raise RuntimeError('Unsafe zip member: ' + member)
+    return dest / p
+
+
+def _check_deadline(deadline: Optional[float], archive_path: Path) -> None:
+    if deadline is not None and time.monotonic() > deadline:
+        raise ExtractionTimeout(f"Extrakce '{archive_path.name}' překročila časový limit")
+
+
+def _copy_stream(src: BinaryIO, dst: BinaryIO, deadline: Optional[float], archive_path: Path,
+                 buffer_size: int = COPY_BUFFER_SIZE) -> None:
+    while True:
+        buf = src.read(buffer_size)
+        if not buf:
+            return
+        dst.write(buf)
+        _check_deadline(deadline, archive_path)
+
 
 def safe_extract_zip(zip_path: Path, dest: Path) -> None:
     # jednoduchá bezpečná extrakce: kontrola cesty a extrakce
     dest.mkdir(parents=True, exist_ok=True)
     with zipfile.ZipFile(zip_path, 'r') as z:
         for member in z.namelist():
-            # zabránit path traversal
-            p = Path(member)
-            if p.is_absolute() or '..' in p.parts:
-                raise RuntimeError('Unsafe zip member: ' + member)
+            _safe_target(dest, member)
         z.extractall(dest)
 
 
@@ -31,3 +92,113 @@ def safe_extract_rar(rar_path: Path, dest: Path) -> None:
     except Exception as e:
         logger.error("Chyba při extrakci RAR '%s': %s", rar_path.name, e)
 
+
+def select_members(manifest: List[ArchiveMember]) -> List[ArchiveMember]:
+    """Vybere z manifestu jen členy potřebné pro preflight (PDF + WAV).
+
+    Pokud archiv neobsahuje zároveň PDF i WAV, nemůže z něj vzniknout projekt
+    a vrací se prázdný seznam.
+    """
+    groups = group_members(manifest)
+    if not groups['pdfs'] or not groups['wavs']:
+        return []
+    return groups['pdfs'] + groups['wavs']
+
+
+def _open_archive(archive_path: Path):
+    if archive_path.suffix.lower() == '.rar':
+        import rarfile  # type: ignore
+        return rarfile.RarFile(archive_path, 'r')
+    return zipfile.ZipFile(archive_path, 'r')
+
+
+def extract_archive(archive_path: Path, dest: Path, deadline: Optional[float] = None,
+                    budget: Optional[ScratchBudget] = None, max_uncompressed_bytes: Optional[int] = None,
+                    progress: Optional[ArchiveProgress] = None, selective: bool = True) -> int:
+    """Bezpečně rozbalí ZIP/RAR do `dest` s limitem času, velikosti a rozpočtu scratch místa.
+
+    Nejdřív se přečte manifest archivu; se `selective=True` se rozbalí jen PDF
+    a WAV členy a archivy, ze kterých nemůže vzniknout projekt, se přeskočí.
+    Vrací počet zapsaných bajtů (0 = archiv přeskočen). Při překročení `deadline`
+    (time.monotonic) vyhodí ExtractionTimeout a částečně rozbalená data smaže.
+    """
+    manifest = list_members(archive_path)
+    members = select_members(manifest) if selective else manifest
+    if not members:
+        logger.info("Archiv '%s' neobsahuje PDF i WAV soubory. Přeskakuji.", archive_path.name)
+        return 0
+    total_size = sum(m.size for m in members)
+    if max_uncompressed_bytes is not None and total_size > max_uncompressed_bytes:
+        logger.warning("Archiv '%s' má příliš velký nekomprimovaný obsah. Přeskakuji.", archive_path.name)
+        return 0
+    if budget is not None and not budget.try_reserve(total_size):
+        logger.warning("Archiv '%s' (%.1f MB) se nevejde do rozpočtu scratch prostoru. Přeskakuji.",
+                       archive_path.name, total_size / (1024 * 1024))
+        return 0
+
+    dest.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+    try:
+        with _open_archive(archive_path) as archive:
+            for i, member in enumerate(members):
+                if progress and i % 100 == 0:  # průběh každých 100 souborů
+                    progress(archive_path.name, i, len(members))
+                _check_deadline(deadline, archive_path)
+                target = _safe_target(dest, member.member)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                written.append(target)
+                buffer_size = STORED_COPY_BUFFER_SIZE if member.stored else COPY_BUFFER_SIZE
+                with archive.open(member.member) as src, open(target, 'wb') as dst:
+                    _copy_stream(src, dst, deadline, archive_path, buffer_size)
+        if progress:
+            progress(archive_path.name, len(members), len(members))
+    except BaseException:
+        # cílová složka může obsahovat i jiná data (režim copy/link), mažeme jen to, co jsme zapsali
+        for target in written:
+            target.unlink(missing_ok=True)
+        if budget is not None:
+            budget.release(total_size)
+        raise
+    return total_size
+
+
+def extract_archives(jobs: List[Tuple[Path, Path]], max_workers: int = 4, scratch_budget_bytes: Optional[int] = None,
+                     timeout_seconds: Optional[float] = None, max_archive_bytes: Optional[int] = None,
+                     progress: Optional[ArchiveProgress] = None,
+                     on_archive_done: Optional[Callable[[int, int], None]] = None) -> Dict[Path, str]:
+    """Rozbalí více archivů souběžně (vlákna - dekomprese i zápis uvolňují GIL).
+
+    `jobs` je seznam dvojic (archiv, cílová složka). Každý archiv má vlastní
+    deadline `timeout_seconds` od začátku své extrakce. Vrací stav pro každý
+    archiv: 'ok', 'skipped', 'timeout' nebo 'error'.
+    """
+    budget = ScratchBudget(scratch_budget_bytes)
+    results: Dict[Path, str] = {}
+
+    def _run(archive_path: Path, dest: Path) -> str:
+        if max_archive_bytes is not None and archive_path.stat().st_size > max_archive_bytes:
+            logger.warning("Archiv '%s' je příliš velký (%.1f MB). Přeskakuji.",
+                           archive_path.name, archive_path.stat().st_size / (1024 * 1024))
+            return 'skipped'
+        deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+        max_uncompressed = max_archive_bytes * 2 if max_archive_bytes is not None else None  # 2x limit pro nekomprimovaný obsah
+        written = extract_archive(archive_path, dest, deadline, budget, max_uncompressed, progress)
+        return 'ok' if written else 'skipped'
+
+    if not jobs:
+        return results
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        future_to_archive = {executor.submit(_run, archive, dest): archive for archive, dest in jobs}
+        for i, future in enumerate(concurrent.futures.as_completed(future_to_archive)):
+            archive_path = future_to_archive[future]
+            try:
+                results[archive_path] = future.result()
+            except ExtractionTimeout as e:
+                logger.error("%s", e)
+                results[archive_path] = 'timeout'
+            except Exception as e:
+                logger.error("Chyba při extrakci archivu '%s': %s", archive_path.name, e)
+                results[archive_path] = 'error'
+            if on_archive_done:
+                on_archive_done(i + 1, len(jobs))
+    return results
@@ -0,0 +1,166 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "cache.sqlite3"
+# SQLite limit pro počet parametrů v jednom dotazu je 999 (starší verze)
+_QUERY_CHUNK = 500
+# evikce po dávkách: po překročení limitu se smaže až na (1 - EVICT_FRACTION) * limit
+EVICT_FRACTION = 0.1
+
+
+def default_cache_dir() -> Path:
+    """Adresář perzistentních cache (přepsatelný proměnnou VINYL_PREFLIGHT_CACHE_DIR)."""
+    env = os.getenv("VINYL_PREFLIGHT_CACHE_DIR")
+    if env:
+        return Path(env)
+    return Path.home() / ".cache" / "vinyl_preflight"
+
+
+class SqliteCache:
+    """Perzistentní cache klíč → JSON hodnota nad jedním SQLite souborem.
+
+    Více cache (probe WAV, text PDF, ...) sdílí jeden soubor, odlišují se
+    jmenným prostorem. Velikost je omezena počtem záznamů (LRU podle
+    posledního přístupu), volitelně i stářím záznamu (TTL). Evikce běží až
+    po překročení limitu a uvolní místo pro další dávku zápisů.
+    Instance je bezpečná pro použití z více vláken.
+    """
+
+    def __init__(self, path: Path, namespace: str, max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        self.path = Path(path)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # horní odhad počtu záznamů (REPLACE existujícího klíče ho nadsadí), přesně se zjistí při evikci
+        self._size: Optional[int] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (namespace, accessed)")
+        # expirované záznamy se mažou při otevření a pak s evikcí nad limitem
+        self.evict()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Vrátí nalezené (a neexpirované) hodnoty; chybějící klíče ve výsledku nejsou."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        now = time.time()
+        with self._lock, self._conn:
+            for i in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[i:i + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value, created FROM cache WHERE namespace = ? AND key IN ({placeholders})",
+                    [self.namespace, *chunk],
+                ).fetchall()
+                hits = []
+                for key, value, created in rows:
+                    if self._expired(created, now):
+                        continue
+                    try:
+                        found[key] = json.loads(value)
+                        hits.append(key)
+                    except ValueError:
+                        logger.warning("Poškozený záznam v cache '%s': %s", self.namespace, key)
+                if hits:
+                    self._conn.execute(
+                        f"UPDATE cache SET accessed = ? WHERE namespace = ? AND key IN ({','.join('?' * len(hits))})",
+                        [now, self.namespace, *hits],
+                    )
+        return found
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(self.namespace, k, json.dumps(v, ensure_ascii=False), now, now) for k, v in items.items()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)", rows)
+            if self.max_entries is None:
+                return
+            self._size = self._count() if self._size is None else self._size + len(rows)
+            over_limit = self._size > self.max_entries
+        if over_limit:
+            self.evict()
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        with self._lock, self._conn:
+            for i in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[i:i + _QUERY_CHUNK]
+                self._conn.execute(
+                    f"DELETE FROM cache WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [self.namespace, *chunk],
+                )
+
+    def clear(self) -> None:
+        """Zneplatní celý jmenný prostor."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            self._size = 0
+
+    def evict(self) -> None:
+        """Odstraní expirované záznamy; nad limitem i nejdéle nepoužité až na (1 - EVICT_FRACTION) * limit."""
+        with self._lock, self._conn:
+            if self.ttl_seconds is not None:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND created < ?",
+                    (self.namespace, time.time() - self.ttl_seconds),
+                )
+            if self.max_entries is not None:
+                self._size = self._count()
+                if self._size > self.max_entries:
+                    keep = self.max_entries - int(self.max_entries * EVICT_FRACTION)
+                    self._conn.execute(
+                        "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                        " SELECT key FROM cache WHERE namespace = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                        (self.namespace, self.namespace, keep),
+                    )
+                    self._size = min(self._size, keep)
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_cache(namespace: str, cache_dir: Optional[Path] = None, **kwargs) -> Optional[SqliteCache]:
+    """Otevře cache; pokud to nejde (read-only FS, poškozený soubor), vrátí None a běh pokračuje bez cache."""
+    path = Path(cache_dir or default_cache_dir()) / CACHE_FILENAME
+    try:
+        return SqliteCache(path, namespace, **kwargs)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Cache '%s' není dostupná (%s): %s", namespace, path, e)
+        return None
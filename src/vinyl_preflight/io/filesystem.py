@@ -1,6 +1,21 @@
 from pathlib import Path
+from typing import Dict
+import logging
+import os
 import shutil
 
+logger = logging.getLogger(__name__)
+
+# Režimy přípravy pracovního prostoru:
+# - inplace: složky projektů se čtou přímo ze zdroje (read-only), do scratch se rozbalují jen archivy
+# - link: složky se zrcadlí do scratch pomocí reflinků/hardlinků (kopie jen jako poslední možnost)
+# - copy: původní chování, plná kopie přes shutil.copytree
+WORKSPACE_MODES = ("inplace", "link", "copy")
+
+# ioctl FICLONE (Linux: btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+
 def ensure_dir(path: Path):
     path.mkdir(parents=True, exist_ok=True)
 
@@ -8,3 +23,50 @@ def safe_copy(src: Path, dest: Path):
     ensure_dir(dest.parent)
     shutil.copy2(src, dest)
 
+
+def reflink(src: Path, dest: Path) -> bool:
+    """Pokusí se vytvořit copy-on-write klon souboru. Vrací False, pokud to FS nepodporuje."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        shutil.copystat(src, dest)
+        return True
+    except OSError:
+        try:
+            dest.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def link_or_copy(src: Path, dest: Path) -> str:
+    """Zpřístupní soubor `src` pod cestou `dest` co nejlevněji.
+
+    Pořadí: reflink → hardlink → kopie. Vrací použitou metodu ('reflink', 'hardlink', 'copy').
+    """
+    ensure_dir(dest.parent)
+    if reflink(src, dest):
+        return 'reflink'
+    try:
+        os.link(src, dest)
+        return 'hardlink'
+    except OSError:
+        shutil.copy2(src, dest)
+        return 'copy'
+
+
+def link_tree(src_dir: Path, dest_dir: Path) -> Dict[str, int]:
+    """Zrcadlí strom `src_dir` do `dest_dir` bez duplikace dat (viz link_or_copy)."""
+    stats = {'reflink': 0, 'hardlink': 0, 'copy': 0}
+    for root, _dirs, files in os.walk(src_dir):
+        rel = Path(root).relative_to(src_dir)
+        for name in files:
+            method = link_or_copy(Path(root) / name, dest_dir / rel / name)
+            stats[method] += 1
+    if stats['copy']:
+        logger.info("Staging '%s': %d souborů muselo být zkopírováno (reflink/hardlink nedostupný)", src_dir.name, stats['copy'])
+    return stats
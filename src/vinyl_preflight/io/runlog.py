@@ -0,0 +1,151 @@
+"""Strukturovaný log běhu (JSON Lines) se zápisem v jednom vlákně.
+
+Událost se ve volajícím vlákně zkrátí a serializuje (do fronty jde hotový
+řádek, pozdější změny předaných objektů se do logu nepromítnou), do souboru
+řádky zapisuje jediné pozadí vlákno (žádné prokládání řádků, soubor se
+otevírá jednou). Každý řádek je JSON objekt `{"ts", "elapsed", "level", "event", ...}`.
+
+Dlouhé texty (prompt s textem PDF, surová odpověď LLM) se do logu nepíší
+celé: zůstane začátek, délka a SHA-256. S `payload_dir` se celý text uloží
+do vedlejšího souboru `<sha256>.txt` (každý obsah jednou).
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import hashlib
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+DEFAULT_QUEUE_SIZE = 10_000
+# delší řetězce se v logu nahradí náhledem + hashem
+MAX_FIELD_CHARS = 2_000
+PREVIEW_CHARS = 200
+_STOP = object()
+
+
+class RunLog:
+    """Náhrada DetailedLogger: stejné metody log_*, výstup JSON Lines přes frontu a writer vlákno.
+
+    Při plné frontě volající čeká na uvolnění místa (žádná událost se nezahodí).
+    """
+
+    def __init__(self, path: Union[str, Path], level: str = "info", queue_size: int = DEFAULT_QUEUE_SIZE,
+                 max_field_chars: int = MAX_FIELD_CHARS, payload_dir: Optional[Union[str, Path]] = None):
+        self.path = Path(path)
+        self.min_level = LEVELS[level]
+        self.max_field_chars = max_field_chars
+        self.payload_dir = Path(payload_dir) if payload_dir else None
+        self.start_time = datetime.now()
+        self._started = time.monotonic()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._payloads_written: set = set()
+        self._payloads_lock = threading.Lock()
+        self._closed = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._thread = threading.Thread(target=self._writer, name="runlog-writer", daemon=True)
+        self._thread.start()
+        self.emit("run_log_opened", started=self.start_time.isoformat(timespec='seconds'))
+
+    # --- obecné API ---
+
+    def emit(self, event: str, level: str = "info", **fields: Any) -> None:
+        """Zkrátí a serializuje událost a zařadí řádek k zápisu; vrací hned (kromě plné fronty)."""
+        if self._closed or LEVELS[level] < self.min_level:
+            return
+        record = {"ts": datetime.now().isoformat(timespec='milliseconds'),
+                  "elapsed": round(time.monotonic() - self._started, 3), "level": level, "event": event}
+        record.update(fields)
+        try:
+            line = json.dumps(self._shrink(record), ensure_ascii=False, default=str)
+        except Exception as e:
+            logger.error(f"Nelze serializovat událost '{event}' do logu běhu: {e}")
+            return
+        self._queue.put(line)
+
+    def close(self) -> None:
+        """Dopíše frontu a zavře soubor (opakované volání nic nedělá)."""
+        if self._closed:
+            return
+        self.emit("run_log_closed")
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- metody DetailedLogger ---
+
+    def log_step(self, step_name: str, data: Any = None) -> None:
+        self.emit("step", step=step_name, data=data)
+
+    def log_llm_request(self, request_data: Dict) -> None:
+        self.emit("llm_request", **request_data)
+
+    def log_llm_response(self, response_data: Dict) -> None:
+        self.emit("llm_response", **response_data)
+
+    def log_extracted_data(self, pdf_path: str, extracted_data: Dict) -> None:
+        self.emit("pdf_extracted", pdf=Path(pdf_path).name, path=pdf_path, result=extracted_data)
+
+    def log_wav_durations(self, wav_durations: Dict[str, Optional[float]]) -> None:
+        self.emit("wav_durations", durations={Path(p).name: d for p, d in wav_durations.items()},
+                  failed=sum(1 for d in wav_durations.values() if d is None))
+
+    def log_validation_results(self, project_name: str, validation_data: Dict) -> None:
+        self.emit("validation", project=project_name, **validation_data)
+
+    def log_compaction(self, documents: int, tokens_before: int, tokens_after: int) -> None:
+        self.emit("text_compaction", documents=documents, tokens_before=tokens_before, tokens_after=tokens_after,
+                  tokens_saved=tokens_before - tokens_after)
+
+    # --- serializace a writer ---
+
+    def _shrink(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if len(value) <= self.max_field_chars:
+                return value
+            encoded = value.encode('utf-8')
+            digest = hashlib.sha256(encoded).hexdigest()
+            shrunk = {"truncated": True, "length": len(value), "sha256": digest, "preview": value[:PREVIEW_CHARS]}
+            if self.payload_dir is not None:
+                shrunk["file"] = self._write_payload(digest, encoded)
+            return shrunk
+        if isinstance(value, dict):
+            return {str(k): self._shrink(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return [self._shrink(v) for v in value]
+        return value
+
+    def _write_payload(self, digest: str, data: bytes) -> str:
+        target = self.payload_dir / f"{digest}.txt"
+        with self._payloads_lock:
+            if digest not in self._payloads_written:
+                self.payload_dir.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+                self._payloads_written.add(digest)
+        return target.name
+
+    def _writer(self) -> None:
+        while True:
+            line = self._queue.get()
+            if line is _STOP:
+                break
+            try:
+                self._file.write(line + "\n")
+            except Exception as e:
+                logger.error(f"Nelze zapsat řádek do logu běhu: {e}")
+            if self._queue.empty():
+                self._file.flush()
+        self._file.flush()
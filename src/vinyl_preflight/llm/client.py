@@ -1,33 +1,170 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+
+from vinyl_preflight.llm.ratelimit import (DEFAULT_MAX_ATTEMPTS, RETRYABLE_STATUS, AdaptiveLimiter, backoff_delay,
+                                           parse_retry_after)
+from vinyl_preflight.llm.streaming import iter_content_deltas, iter_sse_data
+
+logger = logging.getLogger(__name__)
+
+# výchozí limit souběžných požadavků na jednoho klienta
+DEFAULT_MAX_CONCURRENCY = 10
+
+# (odpověď, výjimka) - právě jedno z nich je vyplněné
+CallResult = Tuple[Optional[Dict[str, Any]], Optional[BaseException]]
 
 class LLMClient(ABC):
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    # True = stream() posílá text průběžně, jinak je to jen obal nad call()
+    supports_streaming: bool = False
+
     @abstractmethod
     def call(self, prompt: str) -> Dict[str, Any]:
         """Send a prompt to an LLM and return a structured response."""
         raise NotImplementedError
 
+    def call_many(self, prompts: Sequence[str], max_concurrency: Optional[int] = None) -> List[CallResult]:
+        """Pošle prompty souběžně (nejvýš `max_concurrency` najednou) a vrátí výsledky ve vstupním pořadí.
+
+        Chyba jednoho promptu se vrátí na jeho pozici, ostatní prompty neovlivní.
+        """
+        def safe_call(prompt: str) -> CallResult:
+            try:
+                return self.call(prompt), None
+            except Exception as e:
+                return None, e
+
+        prompts = list(prompts)
+        if len(prompts) <= 1:
+            return [safe_call(p) for p in prompts]
+        workers = min(len(prompts), max_concurrency or self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm") as executor:
+            return list(executor.map(safe_call, prompts))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Vrací text odpovědi po kusech; výchozí implementace čeká na celou odpověď."""
+        yield self.call(prompt)["choices"][0]["message"]["content"]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 class MockLLMClient(LLMClient):
     def call(self, prompt: str) -> Dict[str, Any]:
         return {"text": "MOCK_RESPONSE", "success": True}
 
 
 class OpenRouterLLMClient(LLMClient):
-    def __init__(self, api_url: str, headers: Dict[str, str], model: str, timeout: int = 180):
+    """Klient OpenRouter nad sdílenou `requests.Session`.
+
+    Spojení se drží otevřená (keep-alive) a znovu používají, TLS handshake
+    proběhne jen jednou na spojení. Souběh řídí sdílený AdaptiveLimiter
+    (od `initial_concurrency` až po `max_concurrency`); 429/5xx a síťové
+    chyby se opakují s backoffem, respektuje se `Retry-After`.
+    """
+
+    def __init__(self, api_url: str, headers: Dict[str, str], model: str, timeout: int = 180,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, initial_concurrency: Optional[int] = None,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, limiter: Optional[AdaptiveLimiter] = None,
+                 sleep: Callable[[float], None] = time.sleep):
         self.api_url = api_url
         self.headers = headers
         self.model = model
         self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.supports_streaming = True
+        # odpověď delší než polovina timeoutu = provider je přetížený
+        self.limiter = limiter or AdaptiveLimiter(initial=initial_concurrency or max_concurrency,
+                                                  max_limit=max_concurrency, latency_threshold=timeout / 2)
+        self._sleep = sleep
+        self._session_lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
 
-    def call(self, prompt: str) -> Dict[str, Any]:
-        payload = {
+    @property
+    def session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                # pool_maxsize = limit souběhu, ať se žádné spojení nezahazuje
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(self.headers)
+                self._session = session
+            return self._session
+
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "messages": [{"role": "user", "content": prompt}],
             "response_format": {"type": "json_object"},
             "temperature": 0.0,
         }
-        resp = requests.post(self.api_url, headers=self.headers, json=payload, timeout=self.timeout)
-        resp.raise_for_status()
-        return resp.json()
 
+    def _send(self, payload: Dict[str, Any], stream: bool = False) -> requests.Response:
+        """POST s opakováním. U `stream=True` zůstává slot limiteru obsazený, uvolní ho volající."""
+        for attempt in range(self.max_attempts):
+            last = attempt == self.max_attempts - 1
+            retry_after = None
+            self.limiter.acquire()
+            keep_slot = False
+            try:
+                started = time.monotonic()
+                try:
+                    resp = self.session.post(self.api_url, json=payload, timeout=self.timeout, stream=stream)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    self.limiter.on_failure()
+                    if last:
+                        raise
+                    logger.warning("LLM požadavek selhal (%s), pokus %d/%d", e, attempt + 1, self.max_attempts)
+                    resp = None
+                if resp is not None:
+                    if resp.status_code < 400:
+                        self.limiter.on_success(time.monotonic() - started)
+                        keep_slot = stream
+                        return resp
+                    # odpověď, která se nevrací volajícímu, by jinak držela spojení z poolu (stream=True)
+                    resp.close()
+                    if resp.status_code not in RETRYABLE_STATUS:
+                        resp.raise_for_status()
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    self.limiter.on_failure(retry_after)
+                    if last:
+                        resp.raise_for_status()
+                    logger.warning("LLM API vrátilo %d, pokus %d/%d", resp.status_code, attempt + 1, self.max_attempts)
+            finally:
+                if not keep_slot:
+                    self.limiter.release()
+            # na další pokus se čeká mimo slot, ať neblokuje ostatní požadavky
+            self._sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+        raise RuntimeError("LLM požadavek se nepodařilo dokončit")
+
+    def call(self, prompt: str) -> Dict[str, Any]:
+        return self._send(self._payload(prompt)).json()
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """SSE streaming odpovědi; přerušení iterace zavře spojení (generování se zastaví)."""
+        resp = self._send(dict(self._payload(prompt), stream=True), stream=True)
+        try:
+            yield from iter_content_deltas(iter_sse_data(resp.iter_lines(decode_unicode=True)))
+        finally:
+            resp.close()
+            self.limiter.release()
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
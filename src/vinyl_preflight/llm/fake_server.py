@@ -0,0 +1,265 @@
+"""Lokální náhrada OpenRouter API pro zátěžové testy a benchmarky bez kreditů.
+
+Server přijímá `POST /api/v1/chat/completions` ve stejném tvaru jako
+OpenRouter, z promptu vytáhne dokumenty a vrátí věrohodné
+`{"results": [...]}` (skladby čte lokální parser tracklistů, jinak jedna
+vymyšlená skladba). Umí zpoždění s volitelným rozdělením, chyby 429/5xx
+s `Retry-After`, useknutý JSON, vynechané dokumenty i SSE streaming.
+
+    with FakeOpenRouterServer(FaultProfile(rate_429=0.1), latency=lognormal_latency(2.0)) as server:
+        client = OpenRouterLLMClient(server.api_url, {}, "fake-model")
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+
+from vinyl_preflight.core.tracklist_parser import parse_tracklist
+
+logger = logging.getLogger(__name__)
+
+API_PATH = "/api/v1/chat/completions"
+# z kolika znaků se skládá jeden SSE chunk
+STREAM_CHUNK_CHARS = 64
+
+# dokumenty jsou v promptu jako JSON pole mezi řádky "---"
+_DOCUMENTS_BLOCK = re.compile(r'^---\n(\[.*\])\n---$', re.MULTILINE | re.DOTALL)
+_IDENTIFIER = re.compile(r'"identifier": "((?:[^"\\]|\\.)*)"')
+
+Latency = Callable[[random.Random], float]
+
+
+def fixed_latency(seconds: float) -> Latency:
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> Latency:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5, cap: Optional[float] = None) -> Latency:
+    """Log-normální zpoždění (dlouhý chvost jako u skutečného API), volitelně oříznuté `cap`."""
+    mu = 0.0 if median <= 0 else math.log(median)
+
+    def sample(rng: random.Random) -> float:
+        value = rng.lognormvariate(mu, sigma) if median > 0 else 0.0
+        return min(value, cap) if cap is not None else value
+    return sample
+
+
+class FaultProfile:
+    """Pravděpodobnosti chyb na jeden požadavek (resp. dokument u `drop_rate`).
+
+    `truncate_first` usekne deterministicky prvních N odpovědí 200 (navíc
+    k `truncate_rate`), např. pro test opakování jednoho dokumentu.
+    """
+
+    def __init__(self, rate_429: float = 0.0, rate_5xx: float = 0.0, truncate_rate: float = 0.0,
+                 drop_rate: float = 0.0, retry_after: Optional[float] = 1.0, truncate_first: int = 0):
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.truncate_rate = truncate_rate
+        self.drop_rate = drop_rate
+        # hodnota hlavičky Retry-After u 429; None = hlavičku neposílat
+        self.retry_after = retry_after
+        self.truncate_first = truncate_first
+
+
+def extract_prompt_documents(prompt: str) -> List[Dict[str, str]]:
+    """Dokumenty z promptu `build_extraction_prompt`; při neznámém tvaru aspoň identifikátory."""
+    match = _DOCUMENTS_BLOCK.search(prompt)
+    if match:
+        try:
+            documents = json.loads(match.group(1))
+            if isinstance(documents, list):
+                return [d for d in documents if isinstance(d, dict) and "identifier" in d]
+        except json.JSONDecodeError:
+            pass
+    return [{"identifier": json.loads(f'"{i}"'), "content": ""} for i in _IDENTIFIER.findall(prompt)]
+
+
+def fake_result(document: Dict[str, str]) -> Dict[str, Any]:
+    content = document.get("content", "")
+    if content.startswith("CHYBA:"):
+        return {"source_identifier": document["identifier"], "status": "error", "error_message": content}
+    tracks, _ = parse_tracklist(content)
+    if not tracks:
+        tracks = [{"side": "A", "track_number": 1, "title": "Fake Track", "duration_seconds": 180}]
+    return {"source_identifier": document["identifier"], "status": "success", "data": tracks}
+
+
+class FakeOpenRouterServer:
+    """Vlákny obsluhovaný HTTP server na `127.0.0.1`; `port=0` vybere volný port."""
+
+    def __init__(self, faults: Optional[FaultProfile] = None, latency: Optional[Latency] = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.faults = faults or FaultProfile()
+        self.latency = latency or fixed_latency(0.0)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._sleep = sleep
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "ok": 0, "429": 0, "5xx": 0, "truncated": 0,
+                                      "dropped_documents": 0, "streamed": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def start(self) -> "FakeOpenRouterServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="fake-openrouter", daemon=True)
+        self._thread.start()
+        logger.info("Fake OpenRouter běží na %s", self.api_url)
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _draw(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _respond(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Rozhodne o odpovědi: {"status", "headers", "content"}, u chyby je content None."""
+        self._count("requests")
+        with self._rng_lock:
+            delay = max(0.0, self.latency(self._rng))
+        if delay:
+            self._sleep(delay)
+
+        roll = self._draw()
+        if roll < self.faults.rate_429:
+            self._count("429")
+            headers = {}
+            if self.faults.retry_after is not None:
+                headers["Retry-After"] = f"{self.faults.retry_after:g}"
+            return {"status": 429, "headers": headers, "content": None}
+        if roll < self.faults.rate_429 + self.faults.rate_5xx:
+            self._count("5xx")
+            return {"status": 503, "headers": {}, "content": None}
+
+        prompt = "".join(m.get("content", "") for m in payload.get("messages", []) if isinstance(m, dict))
+        results = []
+        for document in extract_prompt_documents(prompt):
+            if self.faults.drop_rate and self._draw() < self.faults.drop_rate:
+                self._count("dropped_documents")
+                continue
+            results.append(fake_result(document))
+        content = json.dumps({"results": results}, ensure_ascii=False)
+        with self._stats_lock:
+            truncated = self.stats["ok"] < self.faults.truncate_first
+        truncated = truncated or (bool(self.faults.truncate_rate) and self._draw() < self.faults.truncate_rate)
+        if truncated:
+            self._count("truncated")
+            content = content[:max(1, len(content) * 2 // 3)]
+        self._count("ok")
+        return {"status": 200, "headers": {}, "content": content}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug("fake-openrouter: " + format, *args)
+
+            def _send_json(self, status: int, body: Dict[str, Any], headers: Dict[str, str]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, content: str, model: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(b": OPENROUTER PROCESSING\n\n")
+                for start in range(0, len(content), STREAM_CHUNK_CHARS):
+                    chunk = {"model": model, "choices": [{"index": 0,
+                                                          "delta": {"content": content[start:start + STREAM_CHUNK_CHARS]}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def do_POST(self):
+                if self.path.split("?")[0] != API_PATH:
+                    self._send_json(404, {"error": {"message": "Not found"}}, {})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except (ValueError, json.JSONDecodeError):
+                    self._send_json(400, {"error": {"message": "Invalid JSON"}}, {})
+                    return
+                answer = server._respond(payload)
+                if answer["content"] is None:
+                    self._send_json(answer["status"], {"error": {"message": "Injected failure",
+                                                                 "code": answer["status"]}}, answer["headers"])
+                    return
+                model = payload.get("model", "fake-model")
+                if payload.get("stream"):
+                    server._count("streamed")
+                    self._send_stream(answer["content"], model)
+                    return
+                self._send_json(200, {"id": "fake", "model": model, "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": answer["content"]},
+                     "finish_reason": "stop"}]}, {})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lokální náhrada OpenRouter API")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=1.0, help="medián zpoždění v sekundách (log-normální)")
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    fake = FakeOpenRouterServer(FaultProfile(args.rate_429, args.rate_5xx, args.truncate_rate, args.drop_rate),
+                                latency=lognormal_latency(args.latency, args.sigma), port=args.port, seed=args.seed)
+    fake.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,119 @@
+"""Adaptivní omezení souběhu a opakování požadavků na LLM API.
+
+Limit souběžných požadavků roste aditivně s každou úspěšnou odpovědí
+a při 429/5xx, timeoutu nebo výrazně pomalé odpovědi se multiplikativně
+snižuje (AIMD). `Retry-After` z odpovědi pozdrží všechny nové požadavky.
+"""
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Optional
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 520, 522, 524})
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 60.0
+MAX_RETRY_AFTER_SECONDS = 300.0
+# mezi dvěma sníženími limitu - souběžné chyby jedné vlny se počítají jednou
+DECREASE_COOLDOWN_SECONDS = 1.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Hodnota hlavičky Retry-After (sekundy nebo HTTP datum) → sekundy čekání."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - (now if now is not None else time.time())
+        except (TypeError, ValueError, IndexError):
+            return None
+    return min(max(0.0, seconds), MAX_RETRY_AFTER_SECONDS)
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_SECONDS, cap: float = BACKOFF_CAP_SECONDS,
+                  rng: Callable[[float, float], float] = random.uniform) -> float:
+    """Exponenciální backoff s plným jitterem (attempt od 0)."""
+    return rng(0.0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveLimiter:
+    """AIMD limit souběžných požadavků sdílený všemi vlákny klienta."""
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 decrease_factor: float = 0.5, latency_threshold: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Neplatné meze limitu souběhu")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        # úspěšná odpověď pomalejší než tato mez se bere jako známka přetížení
+        self.latency_threshold = latency_threshold
+        self._clock = clock
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = float('-inf')
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self._paused_until - self._clock()
+                if wait <= 0 and self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_success(self, latency: float) -> None:
+        if self.latency_threshold is not None and latency > self.latency_threshold:
+            self._decrease(f"pomalá odpověď {latency:.1f} s")
+            return
+        with self._cond:
+            # +1 za "okno" (limit úspěšných odpovědí)
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def on_failure(self, retry_after: Optional[float] = None) -> None:
+        if retry_after:
+            with self._cond:
+                self._paused_until = max(self._paused_until, self._clock() + retry_after)
+        self._decrease("přetížení API" if retry_after is None else f"Retry-After {retry_after:.0f} s")
+
+    def _decrease(self, reason: str) -> None:
+        with self._cond:
+            now = self._clock()
+            if now - self._last_decrease < DECREASE_COOLDOWN_SECONDS:
+                return
+            self._last_decrease = now
+            self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+            logger.info("Snižuji souběh LLM požadavků na %d (%s)", int(self._limit), reason)
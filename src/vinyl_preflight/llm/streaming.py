@@ -0,0 +1,139 @@
+"""Streamované odpovědi LLM: SSE události a průběžné parsování `{"results": [...]}`."""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+SSE_DONE = "[DONE]"
+
+
+class StreamError(RuntimeError):
+    """Chyba hlášená providerem uvnitř streamu (HTTP status už byl 200)."""
+
+
+def iter_sse_data(lines: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """Vrací obsah `data:` jednotlivých SSE událostí (víceřádková data spojí), skončí na [DONE]."""
+    data: List[str] = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.rstrip('\r')
+        if not line:
+            if data:
+                event = "\n".join(data)
+                data = []
+                if event == SSE_DONE:
+                    return
+                yield event
+            continue
+        if line.startswith(':'):
+            continue  # komentář / keep-alive (OpenRouter posílá ": OPENROUTER PROCESSING")
+        field, _, value = line.partition(':')
+        if field == 'data':
+            data.append(value[1:] if value.startswith(' ') else value)
+    if data:
+        event = "\n".join(data)
+        if event != SSE_DONE:
+            yield event
+
+
+def iter_content_deltas(events: Iterable[str]) -> Iterator[str]:
+    """Z chat-completion chunků vrací přírůstky textu odpovědi."""
+    for event in events:
+        chunk = json.loads(event)
+        if 'error' in chunk:
+            raise StreamError(chunk['error'].get('message', str(chunk['error'])))
+        for choice in chunk.get('choices', []):
+            content = (choice.get('delta') or {}).get('content')
+            if content:
+                yield content
+
+
+class ResultsStreamParser:
+    """Průběžný parser obálky `{"results": [...]}`.
+
+    `feed()` přijímá kusy textu a vrací prvky pole `results`, jejichž JSON
+    objekt je už kompletní. Text mimo pole se jen prochází; zpracovaný text,
+    který už není potřeba, se zahazuje.
+    """
+
+    def __init__(self, key: str = "results"):
+        self.key = key
+        self.text_parts: List[str] = []
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._str_start = 0
+        self._last_key: Optional[str] = None
+        self._last_token = ""
+        self._array_depth: Optional[int] = None
+        self._elem_start: Optional[int] = None
+        self.emitted = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text_parts.append(chunk)
+        self._buf += chunk
+        out: List[Dict[str, Any]] = []
+        buf = self._buf
+        i = self._pos
+        while i < len(buf):
+            c = buf[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif c == '\\':
+                    self._esc = True
+                elif c == '"':
+                    self._in_str = False
+                    if self._depth == 1:
+                        self._last_key = buf[self._str_start + 1:i]
+                    self._last_token = '"'
+            elif c == '"':
+                self._in_str = True
+                self._str_start = i
+            elif c in '{[':
+                if self._array_depth is not None and self._depth == self._array_depth and self._elem_start is None:
+                    self._elem_start = i
+                if (c == '[' and self._array_depth is None and self._depth == 1
+                        and self._last_token == ':' and self._last_key == self.key):
+                    self._array_depth = 2
+                self._depth += 1
+                self._last_token = c
+            elif c in '}]':
+                self._depth -= 1
+                if self._array_depth is not None and self._depth == self._array_depth and self._elem_start is not None:
+                    if c == '}':
+                        out.append(self._element(buf[self._elem_start:i + 1]))
+                    self._elem_start = None
+                elif self._array_depth is not None and self._depth < self._array_depth:
+                    self._array_depth = None
+                self._last_token = c
+            elif not c.isspace():
+                self._last_token = c
+            i += 1
+        # zpracovaný text mimo rozpracovaný prvek už nebude potřeba
+        keep = self._elem_start if self._elem_start is not None else (self._str_start if self._in_str else i)
+        self._buf = buf[keep:]
+        self._pos = i - keep
+        if self._elem_start is not None:
+            self._elem_start -= keep
+        if self._in_str:
+            self._str_start -= keep
+        return [e for e in out if e is not None]
+
+    def _element(self, raw: str) -> Optional[Dict[str, Any]]:
+        try:
+            element = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning("Nelze parsovat prvek výsledků ze streamu: %s", e)
+            return None
+        self.emitted += 1
+        return element
+
+    @property
+    def text(self) -> str:
+        """Celý dosud přijatý text odpovědi."""
+        return "".join(self.text_parts)
@@ -6,3 +6,11 @@ def normalize_string(s: str) -> str:
     s = re.sub(r'[\W_]+', ' ', s)
     return " ".join(s.split())
 
+
+
+# hrubý odhad pro latinku (tokenizéry Gemini/GPT ~ 4 znaky na token)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1 if text else 0
@@ -3,33 +3,36 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
-import concurrent.futures
 import time
 import os
 import sys
-import json
 import csv
 from pathlib import Path
-from datetime import datetime
 import math
-from typing import Callable, Dict, List, Tuple, Optional
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
 import shutil
 import tempfile
-import zipfile
-import re
 
-import requests
 import soundfile as sf
 from dotenv import load_dotenv
 import multiprocessing as mp
-import fitz
-from thefuzz import fuzz
 import logging
 from vinyl_preflight.utils.timefmt import seconds_to_mmss as _util_seconds_to_mmss, safe_round as _util_safe_round
 from vinyl_preflight.core.validator import detect_consolidated_mode as _detect_mode
-from vinyl_preflight.core.wav_utils import get_wav_duration as _get_wav_duration
-from vinyl_preflight.core.pdf_utils import extract_text_from_pdf as _extract_text_from_pdf
+from vinyl_preflight.core.filename_index import FilenameIndex
+from vinyl_preflight.core.matcher import find_wav_for_side
+from vinyl_preflight.core.wav_utils import probe_wav as _probe_wav
+from vinyl_preflight.core.probe_cache import ProbeCache
+from vinyl_preflight.core.executor import IO_BOUND, run_tasks
+from vinyl_preflight.core.pdf_utils import PdfTextCache, source_digests
+from vinyl_preflight.core.extraction import PROMPT_VERSION, process_all_pdf_batches, process_single_extraction_batch
+from vinyl_preflight.core.llm_cache import LlmResultCache
+from vinyl_preflight.llm.client import OpenRouterLLMClient
 from vinyl_preflight.io.output import write_csv
+from vinyl_preflight.io.runlog import RunLog
+from vinyl_preflight.io.filesystem import WORKSPACE_MODES, link_tree
+from vinyl_preflight.io.archive_fs import scan_archive
+from vinyl_preflight.io.archives import extract_archives
 
 
 
@@ -46,11 +49,21 @@ except ImportError:
 MODEL_NAME = "google/gemini-2.5-flash"
 API_URL = "https://openrouter.ai/api/v1/chat/completions"
 MAX_PDFS_PER_BATCH = 50
-MAX_PARALLEL_API_REQUESTS = 10
+MAX_PARALLEL_API_REQUESTS = 10  # počáteční souběh, dál ho řídí AIMD limiter klienta
+API_CONCURRENCY_LIMIT = 32  # strop, na který může souběh vystoupat
 API_REQUEST_TIMEOUT = 180
 VALIDATION_TOLERANCE_SECONDS = 10
 MAX_ARCHIVE_SIZE_MB = 1024
-MAX_EXTRACTION_TIME_SECONDS = 300
+MAX_EXTRACTION_TIME_SECONDS = 300  # deadline pro extrakci jednoho archivu
+MAX_PARALLEL_EXTRACTIONS = 4
+VALIDATION_WORKERS = 2
+SCRATCH_BUDGET_MB = 50 * 1024  # globální strop pro data rozbalená do scratch prostoru
+WORKSPACE_MODE = "inplace"  # viz vinyl_preflight.io.filesystem.WORKSPACE_MODES
+ARCHIVE_MODE = "virtual"  # 'virtual' = čtení přímo z archivu, 'extract' = rozbalení do scratch
+ARCHIVE_MODES = ("virtual", "extract")
+RUN_LOG_LEVEL = "info"
+# True = celé prompty a odpovědi LLM se ukládají vedle logu (<log>_payloads/<sha256>.txt)
+RUN_LOG_PAYLOADS = False
 CSV_HEADERS = [
     "project_title", "status", "validation_item", "item_type",
     "pdf_duration_mmss", "wav_duration_mmss", "difference_mmss",
@@ -64,76 +77,7 @@ def seconds_to_mmss(seconds: Optional[float]) -> str:
 def safe_round(value: Optional[float], decimals: int = 2) -> Optional[float]:
     return _util_safe_round(value, decimals)
 
-class DetailedLogger:
-    """Třída pro detailní logování průběhu zpracování"""
-
-    def __init__(self, log_file_path: str):
-        self.log_file_path = log_file_path
-        self.start_time = datetime.now()
-
-        # Vytvoř log soubor s hlavičkou
-        with open(log_file_path, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("VINYL PREFLIGHT PROCESSOR - DETAILNÍ LOG\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Spuštěno: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 80 + "\n\n")
-
-    def log_step(self, step_name: str, data: any = None):
-        """Zaloguje krok s časovým razítkem"""
-        timestamp = datetime.now()
-        elapsed = (timestamp - self.start_time).total_seconds()
-
-        with open(self.log_file_path, 'a', encoding='utf-8') as f:
-            f.write(f"\n[{timestamp.strftime('%H:%M:%S')}] (+{elapsed:.1f}s) {step_name}\n")
-            f.write("-" * 60 + "\n")
-
-            if data is not None:
-                if isinstance(data, dict):
-                    f.write(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
-                elif isinstance(data, (list, tuple)):
-                    for i, item in enumerate(data):
-                        f.write(f"  [{i}] {item}\n")
-                else:
-                    f.write(str(data) + "\n")
-            f.write("\n")
-
-    def log_llm_request(self, request_data: dict):
-        """Zaloguje požadavek na LLM"""
-        self.log_step("🤖 LLM REQUEST - DATA ODESLANÁ DO LLM", {
-            "model": request_data.get("model"),
-            "messages": request_data.get("messages"),
-            "temperature": request_data.get("temperature"),
-            "max_tokens": request_data.get("max_tokens")
-        })
-
-    def log_llm_response(self, response_data: dict):
-        """Zaloguje odpověď z LLM"""
-        self.log_step("🤖 LLM RESPONSE - DATA PŘIJATÁ Z LLM", response_data)
-
-    def log_extracted_data(self, pdf_path: str, extracted_data: dict):
-        """Zaloguje extrahovaná data z PDF"""
-        self.log_step(f"📄 EXTRAHOVANÁ DATA Z PDF: {Path(pdf_path).name}", extracted_data)
-
-    def log_wav_durations(self, wav_durations: dict):
-        """Zaloguje délky WAV souborů"""
-        formatted_data = {}
-        for wav_path, duration in wav_durations.items():
-            filename = Path(wav_path).name
-            if duration is not None:
-                minutes = int(duration // 60)
-                seconds = int(duration % 60)
-                formatted_data[filename] = f"{minutes:02d}:{seconds:02d} ({duration:.2f}s)"
-            else:
-                formatted_data[filename] = "CHYBA"
-
-        self.log_step("🎵 DÉLKY WAV SOUBORŮ", formatted_data)
-
-    def log_validation_results(self, project_name: str, validation_data: dict):
-        """Zaloguje výsledky validace"""
-        self.log_step(f"✅ VALIDACE PROJEKTU: {project_name}", validation_data)
-
-def _get_wav_duration_worker(filepath: Path) -> Tuple[str, Optional[float]]:
+def _probe_wav_worker(filepath: Path) -> Tuple[str, Optional[Dict]]:
     try:
         if not filepath.exists():
             logger.error(f"WAV file does not exist: {filepath}")
@@ -143,12 +87,13 @@ def _get_wav_duration_worker(filepath: Path) -> Tuple[str, Optional[float]]:
             logger.error(f"WAV file is empty: {filepath.name}")
             return filepath.as_posix(), None
 
-        dur = _get_wav_duration(filepath)
+        facts = _probe_wav(filepath)
+        dur = facts.get('duration')
         if dur is None or dur <= 0:
             logger.warning(f"WAV file has invalid duration: {filepath.name}")
             return filepath.as_posix(), None
 
-        return filepath.as_posix(), dur
+        return filepath.as_posix(), facts
     except (sf.LibsndfileError, RuntimeError) as e:
         logger.error(f"Corrupted or invalid WAV file '{filepath.name}': {e}")
         return filepath.as_posix(), None
@@ -159,15 +104,41 @@ def _get_wav_duration_worker(filepath: Path) -> Tuple[str, Optional[float]]:
         logger.error(f"Unexpected error reading WAV '{filepath.name}': {e}")
         return filepath.as_posix(), None
 
-from vinyl_preflight.utils.text import normalize_string
+def _get_wav_duration_worker(filepath: Path) -> Tuple[str, Optional[float]]:
+    path_str, facts = _probe_wav_worker(filepath)
+    return path_str, facts['duration'] if facts else None
 
 class PreflightProcessor:
-    def __init__(self, api_key: str, progress_callback: Callable, status_callback: Callable):
+    def __init__(self, api_key: str, progress_callback: Callable, status_callback: Callable,
+                 workspace_mode: str = WORKSPACE_MODE, scratch_dir: Optional[str] = None,
+                 archive_mode: str = ARCHIVE_MODE, max_parallel_extractions: int = MAX_PARALLEL_EXTRACTIONS,
+                 scratch_budget_mb: Optional[int] = SCRATCH_BUDGET_MB, cache_dir: Optional[str] = None,
+                 use_cache: bool = True, probe_workers: Optional[int] = None):
         if not api_key: raise ValueError("API klíč nesmí být prázdný.")
+        if workspace_mode not in WORKSPACE_MODES:
+            raise ValueError(f"Neznámý režim pracovního prostoru: {workspace_mode}")
+        if archive_mode not in ARCHIVE_MODES:
+            raise ValueError(f"Neznámý režim archivů: {archive_mode}")
         self.api_key = api_key
         self.progress_callback = progress_callback
         self.status_callback = status_callback
+        self.workspace_mode = workspace_mode
+        # scratch_dir: kde vzniká dočasný prostor (pro režim 'link' ideálně na stejném FS jako zdroj)
+        self.scratch_dir = scratch_dir
+        self.archive_mode = archive_mode
+        self.max_parallel_extractions = max_parallel_extractions
+        self.scratch_budget_mb = scratch_budget_mb
+        # perzistentní cache (probe WAV, ...); None = výchozí adresář, viz io.cache.default_cache_dir
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.use_cache = use_cache
+        # počet souběžných čtení hlaviček WAV (None = automaticky podle CPU)
+        self.probe_workers = probe_workers
+        self.pdf_text_cache: Optional[PdfTextCache] = None
+        self.llm_result_cache: Optional[LlmResultCache] = None
+        # obsahové hashe PDF běhu (klíč do PdfTextCache), počítají se jednou při tvorbě dávek
+        self.pdf_digests: Optional[Dict[str, str]] = None
         self.headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        self.llm_client: Optional[OpenRouterLLMClient] = None
         self.detailed_logger = None
 
     def run(self, source_directory: str):
@@ -178,22 +149,23 @@ class PreflightProcessor:
             timestamp = time.strftime('%Y-%m-%d_%H-%M-%S')
             output_filename = output_dir / f"Preflight_Report_{timestamp}.csv"
 
-            # Inicializace detailního loggeru
-            log_filename = output_dir / f"Detailed_Log_{timestamp}.txt"
-            self.detailed_logger = DetailedLogger(str(log_filename))
+            # Inicializace detailního logu (JSON Lines, zapisuje ho jedno pozadí vlákno)
+            log_filename = output_dir / f"Detailed_Log_{timestamp}.jsonl"
+            payload_dir = output_dir / f"Detailed_Log_{timestamp}_payloads" if RUN_LOG_PAYLOADS else None
+            self.detailed_logger = RunLog(log_filename, level=RUN_LOG_LEVEL, payload_dir=payload_dir)
             self.detailed_logger.log_step("🚀 SPUŠTĚNÍ ZPRACOVÁNÍ", {
                 "source_directory": source_directory,
                 "output_file": str(output_filename),
                 "log_file": str(log_filename)
             })
 
-            with tempfile.TemporaryDirectory(prefix="preflight_") as tmpdir:
+            with tempfile.TemporaryDirectory(prefix="preflight_", dir=self.scratch_dir) as tmpdir:
                 temp_path = Path(tmpdir)
                 self.status_callback("1/5 Připravuji pracovní prostor a extrahuji archivy...")
-                self._prepare_workspace(Path(source_directory), temp_path)
+                scan_roots = self._prepare_workspace(Path(source_directory), temp_path)
 
                 self.status_callback("2/5 Skenuji soubory a připravuji projekty...")
-                projects = self._scan_and_group_projects(temp_path)
+                projects = self._scan_workspace(scan_roots)
 
                 # Detailní výpis nalezených projektů
                 if projects:
@@ -224,125 +196,45 @@ class PreflightProcessor:
                     self.status_callback("Připraveno.")
                     return None
 
-                self.status_callback("3/5 Zjišťuji délky WAV souborů...")
-                wav_durations = self._get_all_wav_durations(projects)
-
-                # Detailní výpis délek WAV souborů
-                self.status_callback(f"ZJIŠTĚNY DÉLKY {len(wav_durations)} WAV SOUBORŮ:")
-                for wav_path, duration in wav_durations.items():
-                    if duration is not None:
-                        minutes = int(duration // 60)
-                        seconds = int(duration % 60)
-                        self.status_callback(f"  🎵 {Path(wav_path).name}: {minutes:02d}:{seconds:02d} ({duration:.2f}s)")
-                    else:
-                        self.status_callback(f"  ❌ {Path(wav_path).name}: CHYBA při čtení")
-
-                # Logování WAV délek
-                self.detailed_logger.log_wav_durations(wav_durations)
-
-                self.status_callback("4/5 Vytvářím dávky PDF pro efektivní extrakci...")
-                from vinyl_preflight.core.pipeline import create_pdf_batches
-                pdf_batches = create_pdf_batches(projects)
-
-                # Detailní výpis PDF dávek
-                self.status_callback(f"VYTVOŘENO {len(pdf_batches)} DÁVEK PDF:")
-
-                batches_data = {}
-                for i, batch in enumerate(pdf_batches):
-                    batch_name = f"batch_{i+1}"
-                    batches_data[batch_name] = [pdf_path.name for pdf_path in batch]
-
-                    self.status_callback(f"  📦 Dávka {i+1}: {len(batch)} PDF souborů")
-                    for pdf_path in batch:
-                        self.status_callback(f"    📄 {pdf_path.name}")
-
-                self.detailed_logger.log_step("📦 PDF DÁVKY", batches_data)
-
-                self.status_callback(f"4/5 Budu zpracovávat {len(pdf_batches)} dávek PDF. Odesílám k LLM...")
-                from vinyl_preflight.core.extraction import process_all_pdf_batches
-                extracted_pdf_data = process_all_pdf_batches(pdf_batches, self.status_callback, self.progress_callback)
-
-                # Detailní výpis výsledků extrakce
-                self.status_callback(f"EXTRAKCE DOKONČENA - VÝSLEDKY PRO {len(extracted_pdf_data)} PDF:")
-                for pdf_path, result in extracted_pdf_data.items():
-                    status = result.get('status', 'unknown')
-                    if status == 'success':
-                        tracks = result.get('data', [])
-                        self.status_callback(f"  ✅ {Path(pdf_path).name}: {len(tracks)} skladeb")
-                        for track in tracks:
-                            side = track.get('side', 'N/A')
-                            title = track.get('title', 'N/A')
-                            duration = track.get('duration_seconds', 0)
-                            minutes = int(duration // 60)
-                            seconds = int(duration % 60)
-                            self.status_callback(f"    🎵 Side {side}: {title} ({minutes:02d}:{seconds:02d})")
-                    else:
-                        error = result.get('error_message', 'Neznámá chyba')
-                        self.status_callback(f"  ❌ {Path(pdf_path).name}: CHYBA - {error}")
-
-                    # Logování extrahovaných dat pro každý PDF
-                    if self.detailed_logger:
-                        self.detailed_logger.log_extracted_data(pdf_path, result)
-
-                self.status_callback("5/5 Zahajuji finální validaci a zápis do reportu...")
-                # modulární CSV zápis: hlavička + řádky
-                from vinyl_preflight.io.output import write_csv_header, append_csv_rows
-                write_csv_header(output_filename, CSV_HEADERS)
-
-                total_projects = len(projects)
-                for i, (project_name, project_info) in enumerate(projects.items()):
-                    self.status_callback(f"5/5 Validuji projekt {i+1}/{total_projects}: {project_name}")
-                    self.progress_callback(i, total_projects)
-
-                    project_pdf_results = {p.as_posix(): extracted_pdf_data.get(p.as_posix()) for p in project_info['pdfs']}
-                    project_wav_durations = {p.as_posix(): wav_durations.get(p.as_posix()) for p in project_info['wavs']}
-
-                    # Detailní výpis před validací
-                    self.status_callback(f"  🔍 VALIDUJI PROJEKT '{project_name}':")
-                    self.status_callback(f"    📄 PDF výsledky: {len(project_pdf_results)} souborů")
-                    self.status_callback(f"    🎵 WAV délky: {len(project_wav_durations)} souborů")
-
-                    # Detekce módu
-                    wav_paths = list(project_wav_durations.keys())
-                    is_consolidated = _detect_mode(wav_paths)
-                    mode = "CONSOLIDATED (strany)" if is_consolidated else "INDIVIDUAL (tracky)"
-                    self.status_callback(f"    🎯 Detekovaný mód: {mode}")
-
-                    from vinyl_preflight.core.validator import validate_consolidated_project, validate_individual_project
-                    if is_consolidated:
-                        pdf_result = next(iter(project_pdf_results.values()), None)
-                        validation_rows = validate_consolidated_project(project_name, pdf_result, project_wav_durations)
-                    else:
-                        pdf_result = next(iter(project_pdf_results.values()), None)
-                        validation_rows = validate_individual_project(project_name, pdf_result, project_wav_durations)
-
-                    # Výpis výsledků validace
-                    self.status_callback(f"    📊 VÝSLEDKY VALIDACE: {len(validation_rows)} položek")
-                    for row in validation_rows:
-                        status = row.get('status', 'N/A')
-                        item = row.get('validation_item', 'N/A')
-                        item_type = row.get('item_type', 'N/A')
-                        pdf_dur = row.get('pdf_duration_mmss', 'N/A')
-                        wav_dur = row.get('wav_duration_mmss', 'N/A')
-                        diff = row.get('difference_mmss', 'N/A')
-
-                        status_icon = "✅" if status == "OK" else "❌"
-                        self.status_callback(f"      {status_icon} {item} ({item_type}): PDF {pdf_dur} vs WAV {wav_dur} = {diff}")
-
-                    # Logování validace projektu
-                    if self.detailed_logger:
-                        validation_data = {
-                            "project_name": project_name,
-                            "pdf_results_count": len(project_pdf_results),
-                            "wav_durations_count": len(project_wav_durations),
-                            "detected_mode": "CONSOLIDATED" if is_consolidated else "INDIVIDUAL",
-                            "validation_rows": validation_rows
-                        }
-                        self.detailed_logger.log_validation_results(project_name, validation_data)
-
-                    append_csv_rows(output_filename, validation_rows, CSV_HEADERS)
-
-                self.progress_callback(total_projects, total_projects)
+                self.status_callback("3/5 Vytvářím dávky PDF pro efektivní extrakci...")
+                from vinyl_preflight.core.pipeline import create_pdf_batches, estimate_pdf_tokens
+                self.pdf_text_cache = PdfTextCache.open(self.cache_dir) if self.use_cache else None
+                self.llm_result_cache = LlmResultCache.open(MODEL_NAME, PROMPT_VERSION, self.cache_dir) if self.use_cache else None
+                try:
+                    all_pdfs = [pdf_path for proj in projects.values() for pdf_path in proj.get('pdfs', [])]
+                    self.pdf_digests = source_digests(all_pdfs) if self.pdf_text_cache is not None else None
+                    pdf_batches = create_pdf_batches(projects, estimate_pdf_tokens(all_pdfs, self.pdf_text_cache,
+                                                                                   self.pdf_digests))
+
+                    # Detailní výpis PDF dávek
+                    self.status_callback(f"VYTVOŘENO {len(pdf_batches)} DÁVEK PDF:")
+
+                    batches_data = {}
+                    for i, batch in enumerate(pdf_batches):
+                        batch_name = f"batch_{i+1}"
+                        batches_data[batch_name] = [pdf_path.name for pdf_path in batch]
+
+                        self.status_callback(f"  📦 Dávka {i+1}: {len(batch)} PDF souborů")
+                        for pdf_path in batch:
+                            self.status_callback(f"    📄 {pdf_path.name}")
+
+                    self.detailed_logger.log_step("📦 PDF DÁVKY", batches_data)
+
+                    # modulární CSV zápis: hlavička, řádky se připisují, jak se projekty dokončují
+                    from vinyl_preflight.io.output import write_csv_header
+                    write_csv_header(output_filename, CSV_HEADERS)
+
+                    self.status_callback(f"4/5 Zjišťuji délky WAV a odesílám {len(pdf_batches)} dávek PDF k LLM...")
+                    self.status_callback("5/5 Projekty se validují a zapisují do reportu průběžně, jakmile mají hotová PDF i WAV.")
+                    self._run_project_pipeline(projects, pdf_batches, output_filename)
+                finally:
+                    for resource in (self.pdf_text_cache, self.llm_result_cache, self.llm_client):
+                        if resource is not None:
+                            resource.close()
+                    self.pdf_text_cache = None
+                    self.llm_result_cache = None
+                    self.llm_client = None
+                    self.pdf_digests = None
 
             end_time = time.time()
             total_time = end_time - start_time
@@ -365,65 +257,95 @@ class PreflightProcessor:
             import traceback
             traceback.print_exc()
             self.status_callback(f"Chyba: Proces byl přerušen. {e}")
+            if self.detailed_logger:
+                self.detailed_logger.emit("run_failed", level="error", error=str(e))
             return None
+        finally:
+            if self.detailed_logger:
+                self.detailed_logger.close()
 
-    def _prepare_workspace(self, source_root: Path, temp_root: Path):
+    def _prepare_workspace(self, source_root: Path, temp_root: Path) -> List[Path]:
+        """
+        Připraví pracovní prostor a vrátí seznam kořenů, které se mají skenovat.
+        V režimu 'inplace' se složky projektů nekopírují a čtou se přímo ze zdroje;
+        do temp_root se materializují pouze archivy. V archivním režimu 'virtual'
+        se archivy nerozbalují vůbec a vrací se jako samostatné kořeny (soubory).
+        """
+        archive_roots: List[Path] = []
+        extraction_jobs: List[Tuple[Path, Path]] = []
         for item in source_root.iterdir():
             if item.is_dir():
-                shutil.copytree(item, temp_root / item.name, dirs_exist_ok=True)
+                if self.workspace_mode == "copy":
+                    shutil.copytree(item, temp_root / item.name, dirs_exist_ok=True)
+                elif self.workspace_mode == "link":
+                    link_tree(item, temp_root / item.name)
             elif item.is_file():
-                target_dir = temp_root / item.stem
-                if item.suffix.lower() == '.zip':
-                    self._extract_zip_safely(item, target_dir)
-                elif item.suffix.lower() == '.rar' and rarfile:
-                    self._extract_rar_safely(item, target_dir)
+                if item.suffix.lower() == '.zip' or (item.suffix.lower() == '.rar' and rarfile):
+                    if self.archive_mode == "virtual":
+                        archive_roots.append(item)
+                    else:
+                        extraction_jobs.append((item, temp_root / item.stem))
+
+        if extraction_jobs:
+            self._extract_archives(extraction_jobs)
+
+        if self.workspace_mode == "inplace":
+            return [source_root, temp_root] + archive_roots
+        return [temp_root] + archive_roots
+
+    def _extract_archives(self, jobs: List[Tuple[Path, Path]]) -> Dict[Path, str]:
+        """Rozbalí archivy souběžně s globálním rozpočtem scratch místa a deadlinem na archiv."""
+        self.status_callback(f"1/5 Extrahuji {len(jobs)} archivů ({self.max_parallel_extractions} souběžně)...")
+        budget = self.scratch_budget_mb * 1024 * 1024 if self.scratch_budget_mb else None
+        results = extract_archives(
+            jobs,
+            max_workers=self.max_parallel_extractions,
+            scratch_budget_bytes=budget,
+            timeout_seconds=MAX_EXTRACTION_TIME_SECONDS,
+            max_archive_bytes=MAX_ARCHIVE_SIZE_MB * 1024 * 1024,
+            progress=lambda name, done, total: self.status_callback(f"Extrahuji: {name} ({done}/{total} souborů)"),
+            on_archive_done=self.progress_callback,
+        )
+        for archive_path, state in results.items():
+            if state != 'ok':
+                self.status_callback(f"  ⚠️ Archiv {archive_path.name}: {state}")
+        return results
 
     def _extract_zip_safely(self, zip_path: Path, target_dir: Path):
         """Safely extract ZIP with size and time limits"""
-        # Check file size
-        size_mb = zip_path.stat().st_size / (1024 * 1024)
-        if size_mb > MAX_ARCHIVE_SIZE_MB:
-            logger.warning(f"ZIP soubor '{zip_path.name}' je příliš velký ({size_mb:.1f}MB > {MAX_ARCHIVE_SIZE_MB}MB). Přeskakuji.")
-            return
-
-        logger.info(f"Extrahuji ZIP: {zip_path.name} ({size_mb:.1f}MB)")
-        target_dir.mkdir(parents=True, exist_ok=True)
-
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # Check total uncompressed size
-                total_size = sum(info.file_size for info in zip_ref.infolist())
-                if total_size > MAX_ARCHIVE_SIZE_MB * 1024 * 1024 * 2:  # 2x limit for uncompressed
-                    logger.warning(f"ZIP '{zip_path.name}' má příliš velký nekomprimovaný obsah. Přeskakuji.")
-                    return
-
-                # Extract with progress reporting
-                members = zip_ref.infolist()
-                for i, member in enumerate(members):
-                    if i % 100 == 0:  # Report progress every 100 files
-                        self.status_callback(f"Extrahuji ZIP: {zip_path.name} ({i}/{len(members)} souborů)")
-                    zip_ref.extract(member, target_dir)
-
-        except Exception as e:
-            logger.error(f"Chyba při extrakci ZIP '{zip_path.name}': {e}")
+        self._extract_archives([(zip_path, target_dir)])
 
     def _extract_rar_safely(self, rar_path: Path, target_dir: Path):
         """Safely extract RAR with size and time limits"""
-        # Check file size
-        size_mb = rar_path.stat().st_size / (1024 * 1024)
-        if size_mb > MAX_ARCHIVE_SIZE_MB:
-            logger.warning(f"RAR soubor '{rar_path.name}' je příliš velký ({size_mb:.1f}MB > {MAX_ARCHIVE_SIZE_MB}MB). Přeskakuji.")
-            return
-
-        logger.info(f"Extrahuji RAR: {rar_path.name} ({size_mb:.1f}MB)")
-        target_dir.mkdir(parents=True, exist_ok=True)
+        self._extract_archives([(rar_path, target_dir)])
+
+    def _scan_workspace(self, roots: List[Path]) -> Dict[str, Dict[str, List[Path]]]:
+        """Naskenuje všechny kořeny; projekty stejného jména (složka + archiv) se sloučí."""
+        projects: Dict[str, Dict[str, List[Path]]] = {}
+        for root in roots:
+            if root.is_file():
+                found = self._scan_archive_project(root)
+            else:
+                found = self._scan_and_group_projects(root)
+            for name, files in found.items():
+                if name in projects:
+                    projects[name]['pdfs'].extend(files['pdfs'])
+                    projects[name]['wavs'].extend(files['wavs'])
+                else:
+                    projects[name] = files
+        return projects
 
+    def _scan_archive_project(self, archive_path: Path) -> Dict[str, Dict[str, List[Path]]]:
+        """Archiv = jeden projekt (jméno podle archivu), členy se čtou bez rozbalení."""
         try:
-            with rarfile.RarFile(rar_path, 'r') as rar_ref:
-                rar_ref.extractall(target_dir)
-
+            files = scan_archive(archive_path)
         except Exception as e:
-            logger.error(f"CHYBA: Nepodařilo se extrahovat RAR soubor '{rar_path.name}'. Důvod: {e}")
+            logger.error(f"Nelze přečíst obsah archivu '{archive_path.name}': {e}")
+            return {}
+        if files['pdfs'] and files['wavs']:
+            logger.debug(f"Project {archive_path.stem} (archiv): {len(files['pdfs'])} PDFs, {len(files['wavs'])} WAVs")
+            return {archive_path.stem: files}
+        return {}
 
     def _scan_and_group_projects(self, root_dir: Path) -> Dict[str, Dict[str, List[Path]]]:
         projects = {}
@@ -461,9 +383,13 @@ class PreflightProcessor:
         return projects
 
     def _get_all_wav_durations(self, projects: dict) -> Dict[str, Optional[float]]:
+        return dict(self._iter_wav_durations(projects))
+
+    def _iter_wav_durations(self, projects: dict) -> Iterator[Tuple[str, Optional[float]]]:
+        """Průběžně vrací (as_posix cesty, délka) - zásahy cache hned, ostatní, jak se dočtou."""
         if not projects:
             logger.warning("No projects provided for WAV duration analysis")
-            return {}
+            return
 
         all_wav_paths = []
         for proj_name, proj_data in projects.items():
@@ -474,127 +400,181 @@ class PreflightProcessor:
 
         if not all_wav_paths:
             logger.warning("No WAV files found in any project")
-            return {}
+            return
 
-        durations = {}
+        probe_cache = ProbeCache.open(self.cache_dir) if self.use_cache else None
+        to_probe = all_wav_paths
+        identities: Dict[str, str] = {}
+        fresh: Dict[str, Dict] = {}
         try:
-            with mp.Pool() as pool:
-                results = pool.map(_get_wav_duration_worker, all_wav_paths)
-            for path_str, duration in results:
-                durations[path_str] = duration
-        except Exception as e:
-            logger.error(f"Error processing WAV durations: {e}")
-            # Fallback to sequential processing
-            for wav_path in all_wav_paths:
-                path_str, duration = _get_wav_duration_worker(wav_path)
-                durations[path_str] = duration
-
-        return durations
+            if probe_cache is not None:
+                hits, to_probe, identities = probe_cache.lookup(all_wav_paths)
+                logger.info(f"WAV probe cache: {len(hits)} zásahů, {len(to_probe)} k přečtení")
+                for path_str, facts in hits.items():
+                    yield path_str, facts.get('duration')
+
+            # čtení hlaviček je I/O práce → vlákna; chyba jednoho souboru se týká jen jeho
+            for wav_path, result, error in run_tasks(_probe_wav_worker, to_probe, kind=IO_BOUND,
+                                                     max_workers=self.probe_workers):
+                if error is not None:
+                    logger.error(f"Error processing WAV '{wav_path.name}': {error}")
+                    result = (wav_path.as_posix(), None)
+                path_str, facts = result
+                if facts:
+                    fresh[path_str] = facts
+                yield path_str, facts['duration'] if facts else None
+        finally:
+            if probe_cache is not None:
+                probe_cache.store(fresh, identities)
+                probe_cache.close()
 
     def _create_pdf_batches(self, projects: dict) -> List[List[Path]]:
-        all_pdfs_to_process = [pdf_path for proj in projects.values() for pdf_path in proj['pdfs']]
-        batches = []
-        for i in range(0, len(all_pdfs_to_process), MAX_PDFS_PER_BATCH):
-            batches.append(all_pdfs_to_process[i:i + MAX_PDFS_PER_BATCH])
-        return batches
-
-    def _process_all_pdf_batches(self, batches: list) -> dict:
-        all_results = {}
-        total_batches = len(batches)
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PARALLEL_API_REQUESTS) as executor:
-            future_to_batch = {executor.submit(self._process_single_extraction_batch, batch): i for i, batch in enumerate(batches)}
-
-            for i, future in enumerate(concurrent.futures.as_completed(future_to_batch)):
-                self.status_callback(f"4/5 Zpracovávám PDF dávku {i+1}/{total_batches}...")
-                self.progress_callback(i + 1, total_batches)
-                try:
-                    batch_results = future.result()
-                    if batch_results:
-                        for result in batch_results:
-                            all_results[result['source_identifier']] = result
-                except Exception as e:
-                    logger.error(f"Chyba při zpracování dávky: {e}")
-        return all_results
+        from vinyl_preflight.core.pipeline import create_pdf_batches
+        return create_pdf_batches(projects)
+
+    def _llm_client(self) -> OpenRouterLLMClient:
+        # jeden klient (a jedna HTTP session s keep-alive) pro celý běh
+        if self.llm_client is None:
+            self.llm_client = OpenRouterLLMClient(API_URL, self.headers, MODEL_NAME, API_REQUEST_TIMEOUT,
+                                                  max_concurrency=API_CONCURRENCY_LIMIT,
+                                                  initial_concurrency=MAX_PARALLEL_API_REQUESTS)
+        return self.llm_client
+
+    def _process_all_pdf_batches(self, batches: list, on_result: Optional[Callable[[Dict], None]] = None) -> dict:
+        # progress bar patří pipeline (dokončené projekty), ne dávkám
+        return process_all_pdf_batches(batches, self.status_callback, lambda done, total: None,
+                                       text_cache=self.pdf_text_cache, llm_client=self._llm_client(),
+                                       request_logger=self.detailed_logger, result_cache=self.llm_result_cache,
+                                       on_result=on_result, digests=self.pdf_digests)
 
     def _process_single_extraction_batch(self, batch: List[Path]) -> Optional[List[Dict]]:
-        documents_to_process = []
-        for pdf_path in batch:
-            try:
-                if not pdf_path.exists():
-                    logger.error(f"PDF file does not exist: {pdf_path}")
-                    documents_to_process.append({"identifier": pdf_path.as_posix(), "content": "CHYBA: Soubor neexistuje."})
-                    continue
-
-                if pdf_path.stat().st_size == 0:
-                    logger.error(f"PDF file is empty: {pdf_path.name}")
-                    documents_to_process.append({"identifier": pdf_path.as_posix(), "content": "CHYBA: Prázdný soubor."})
-                    continue
-
-                text = _extract_text_from_pdf(pdf_path)
-                if not text.strip():
-                    text = f"VAROVÁNÍ: PDF soubor '{pdf_path.name}' neobsahuje žádný extrahovatelný text."
-
-                documents_to_process.append({"identifier": pdf_path.as_posix(), "content": text})
-
-            except fitz.FileDataError as e:
-                logger.error(f"Corrupted PDF file: {pdf_path.name}, {e}")
-                documents_to_process.append({"identifier": pdf_path.as_posix(), "content": f"CHYBA: Poškozený PDF soubor. {e}"})
-            except (OSError, PermissionError) as e:
-                logger.error(f"Cannot access PDF file: {pdf_path.name}, {e}")
-                documents_to_process.append({"identifier": pdf_path.as_posix(), "content": f"CHYBA: Nelze přistoupit k souboru. {e}"})
-            except Exception as e:
-                logger.error(f"Unexpected error reading PDF: {pdf_path.name}, {e}")
-                documents_to_process.append({"identifier": pdf_path.as_posix(), "content": f"CHYBA: Neočekávaná chyba. {e}"})
-
-        if not documents_to_process: return None
-
-        prompt = f"""
-Jsi expert na hudební mastering. Tvým úkolem je precizně extrahovat informace o skladbách z několika dokumentů.
-Analyzuj KAŽDÝ dokument v poli a vrať VÝHRADNĚ JEDEN JSON objekt s klíčem "results". Hodnota klíče "results" bude pole, kde každý prvek reprezentuje jeden zpracovaný dokument.
-
-Struktura pro každý prvek v poli "results":
-- "source_identifier": Unikátní identifikátor dokumentu.
-- "status": 'success' nebo 'error'.
-- "data": Pokud 'success', zde bude pole skladeb. Každá skladba musí obsahovat "side", "track_number", "title", "duration_seconds".
-- "error_message": Popis chyby, pokud status je 'error'.
-
-Zde jsou dokumenty ke zpracování:
----
-{json.dumps(documents_to_process, indent=2, ensure_ascii=False)}
----
-"""
-        payload = { "model": MODEL_NAME, "messages": [{"role": "user", "content": prompt}], "response_format": {"type": "json_object"}, "temperature": 0.0 }
-
-        # Logování LLM požadavku
-        if self.detailed_logger:
-            self.detailed_logger.log_llm_request({
-                "model": MODEL_NAME,
-                "documents_count": len(documents_to_process),
-                "documents": [{"identifier": d["identifier"], "content_length": len(d["content"])} for d in documents_to_process],
-                "prompt_length": len(prompt),
-                "full_payload": payload
-            })
-
-        try:
-            response = requests.post(API_URL, headers=self.headers, json=payload, timeout=API_REQUEST_TIMEOUT)
-            response.raise_for_status()
-            response_json = response.json()
-            content_str = response_json["choices"][0]["message"]["content"]
-            parsed_results = json.loads(content_str).get("results", [])
-
-            # Logování LLM odpovědi
-            if self.detailed_logger:
-                self.detailed_logger.log_llm_response({
-                    "raw_response": response_json,
-                    "parsed_results": parsed_results,
-                    "results_count": len(parsed_results)
-                })
+        return process_single_extraction_batch(batch, self.pdf_text_cache, self._llm_client(), self.detailed_logger,
+                                               self.llm_result_cache)
+
+    def _run_project_pipeline(self, projects: dict, pdf_batches: List[List[Path]], output_filename: Path) -> None:
+        """Kroky 3-5 jako proudová pipeline: WAV probe a extrakce PDF běží souběžně,
+        projekt jde do validace a CSV hned, jak má hotové vlastní PDF i WAV."""
+        from vinyl_preflight.core.pipeline_executor import PipelineExecutor, ProjectJoin, Stage, callback_source
+        from vinyl_preflight.io.output import append_csv_rows
+
+        join = ProjectJoin(projects)
+        wav_durations: Dict[str, Optional[float]] = {}
+
+        def wav_events():
+            for path_str, duration in self._iter_wav_durations(projects):
+                yield 'wav', path_str, duration
+
+        def pdf_events():
+            for result in callback_source(lambda emit: self._process_all_pdf_batches(pdf_batches, on_result=emit)):
+                yield 'pdf', result['source_identifier'], result
+
+        def on_event(event):
+            kind, key, value = event
+            if kind == 'wav':
+                wav_durations[key] = value
+                self._report_wav_duration(key, value)
+            else:
+                self._report_extraction(key, value)
+            ready = join.add(kind, key, value)
+            return [ready] if ready is not None else []
+
+        def validate(ready):
+            rows = self._validate_ready_project(ready['name'], ready['pdf_results'], ready['wav_durations'])
+            return [(ready['name'], rows)]
+
+        def write(item):
+            project_name, rows = item
+            append_csv_rows(output_filename, rows, CSV_HEADERS)
+            return [project_name]
+
+        executor = PipelineExecutor([
+            Stage('join', on_event, finish=join.flush),
+            Stage('validate', validate, workers=VALIDATION_WORKERS),
+            Stage('report', write),
+        ])
+        total_projects = len(projects)
+        self.progress_callback(0, total_projects)
+        for done, project_name in enumerate(executor.run(wav_events(), pdf_events()), start=1):
+            self.status_callback(f"5/5 Projekt {done}/{total_projects} zapsán do reportu: {project_name}")
+            self.progress_callback(done, total_projects)
+        for stage, _, error in executor.errors:
+            self.status_callback(f"  ❌ Chyba v kroku '{stage}': {error}")
+
+        # Logování WAV délek
+        self.detailed_logger.log_wav_durations(wav_durations)
+
+    def _report_wav_duration(self, wav_path: str, duration: Optional[float]) -> None:
+        if duration is not None:
+            minutes = int(duration // 60)
+            seconds = int(duration % 60)
+            self.status_callback(f"  🎵 {Path(wav_path).name}: {minutes:02d}:{seconds:02d} ({duration:.2f}s)")
+        else:
+            self.status_callback(f"  ❌ {Path(wav_path).name}: CHYBA při čtení")
+
+    def _report_extraction(self, pdf_path: str, result: Dict) -> None:
+        status = result.get('status', 'unknown')
+        if status == 'success':
+            tracks = result.get('data', [])
+            self.status_callback(f"  ✅ {Path(pdf_path).name}: {len(tracks)} skladeb")
+            for track in tracks:
+                side = track.get('side', 'N/A')
+                title = track.get('title', 'N/A')
+                duration = track.get('duration_seconds') or 0
+                minutes = int(duration // 60)
+                seconds = int(duration % 60)
+                self.status_callback(f"    🎵 Side {side}: {title} ({minutes:02d}:{seconds:02d})")
+        else:
+            error = result.get('error_message', 'Neznámá chyba')
+            self.status_callback(f"  ❌ {Path(pdf_path).name}: CHYBA - {error}")
 
-            return parsed_results
-        except Exception as e:
-            logger.error(f"Chyba API volání pro dávku: {e}")
-            return [{"source_identifier": d["identifier"], "status": "error", "data": [], "error_message": str(e)} for d in documents_to_process]
+        # Logování extrahovaných dat pro každý PDF
+        if self.detailed_logger:
+            self.detailed_logger.log_extracted_data(pdf_path, result)
+
+    def _validate_ready_project(self, project_name: str, project_pdf_results: Dict[str, Optional[Dict]],
+                                project_wav_durations: Dict[str, Optional[float]]) -> List[Dict]:
+        # Detailní výpis před validací
+        self.status_callback(f"  🔍 VALIDUJI PROJEKT '{project_name}':")
+        self.status_callback(f"    📄 PDF výsledky: {len(project_pdf_results)} souborů")
+        self.status_callback(f"    🎵 WAV délky: {len(project_wav_durations)} souborů")
+
+        # Detekce módu (index jmen WAV sdílí i hledání stran při validaci)
+        wav_index = FilenameIndex(project_wav_durations)
+        is_consolidated = wav_index.is_consolidated()
+        mode = "CONSOLIDATED (strany)" if is_consolidated else "INDIVIDUAL (tracky)"
+        self.status_callback(f"    🎯 Detekovaný mód: {mode}")
+
+        from vinyl_preflight.core.validator import validate_consolidated_project, validate_individual_project
+        pdf_result = next(iter(project_pdf_results.values()), None)
+        if is_consolidated:
+            validation_rows = validate_consolidated_project(project_name, pdf_result, project_wav_durations, wav_index)
+        else:
+            validation_rows = validate_individual_project(project_name, pdf_result, project_wav_durations)
+
+        # Výpis výsledků validace
+        self.status_callback(f"    📊 VÝSLEDKY VALIDACE: {len(validation_rows)} položek")
+        for row in validation_rows:
+            status = row.get('status', 'N/A')
+            item = row.get('validation_item', 'N/A')
+            item_type = row.get('item_type', 'N/A')
+            pdf_dur = row.get('pdf_duration_mmss', 'N/A')
+            wav_dur = row.get('wav_duration_mmss', 'N/A')
+            diff = row.get('difference_mmss', 'N/A')
+
+            status_icon = "✅" if status == "OK" else "❌"
+            self.status_callback(f"      {status_icon} {item} ({item_type}): PDF {pdf_dur} vs WAV {wav_dur} = {diff}")
+
+        # Logování validace projektu
+        if self.detailed_logger:
+            validation_data = {
+                "project_name": project_name,
+                "pdf_results_count": len(project_pdf_results),
+                "wav_durations_count": len(project_wav_durations),
+                "detected_mode": "CONSOLIDATED" if is_consolidated else "INDIVIDUAL",
+                "validation_rows": validation_rows
+            }
+            self.detailed_logger.log_validation_results(project_name, validation_data)
+        return validation_rows
 
     def _validate_project(self, project_name: str, pdf_results: Dict[str, Dict], wav_durations: Dict[str, Optional[float]]) -> List[Dict]:
         """
@@ -617,39 +597,7 @@ Zde jsou dokumenty ke zpracování:
         Pokročilé hledání WAV souboru pro danou stranu.
         Podporuje různé formáty pojmenování: SIDE A, Side_A, side-a, A, atd.
         """
-        side_lower = side.lower()
-
-        # Různé patterns pro hledání WAV souboru pro stranu
-        patterns = [
-            f"side {side_lower}",           # "side a", "side b", "side c"
-            f"side_{side_lower}",           # "side_a", "side_b", "side_c"
-            f"side-{side_lower}",           # "side-a", "side-b", "side-c"
-            f"side{side_lower}",            # "sidea", "sideb", "sidec"
-            f"{side_lower} side",           # "a side", "b side", "c side"
-            f"{side_lower}_side",           # "a_side", "b_side", "c_side"
-            f"{side_lower}-side",           # "a-side", "b-side", "c-side"
-            f"{side_lower}side",            # "aside", "bside", "cside"
-            f"^{side_lower}[._-]",          # "a.", "b_", "c-" na začátku
-            f"[._-]{side_lower}[._-]",      # "_a_", ".b.", "-c-" uprostřed
-            f"[._-]{side_lower}$",          # "_a", ".b", "-c" na konci
-        ]
-
-        # Hledáme první WAV soubor, který odpovídá některému z patterns
-        for wav_path in available_wavs:
-            filename_lower = Path(wav_path).name.lower()
-
-            # Přímé hledání v názvu souboru
-            for pattern in patterns:
-                if pattern.startswith('^') or pattern.endswith('$') or '[' in pattern:
-                    # Regex pattern
-                    if re.search(pattern, filename_lower):
-                        return wav_path
-                else:
-                    # Jednoduchý substring
-                    if pattern in filename_lower:
-                        return wav_path
-
-        return None
+        return find_wav_for_side(side, available_wavs)
 
     def _validate_consolidated_project(self, project_name: str, pdf_results: Dict[str, Dict], wav_durations: Dict[str, Optional[float]]) -> List[Dict]:
         """Zpracovává POUZE projekty v konsolidovaném módu."""
@@ -670,14 +618,13 @@ Zde jsou dokumenty ke zpracování:
             sides[side].append(track)
 
         available_wavs = wav_durations.copy()
+        wav_index = FilenameIndex(wav_durations)
 
         for side, tracks_on_side in sides.items():
             pdf_total_duration = sum(t.get('duration_seconds', 0) for t in tracks_on_side if t.get('duration_seconds') is not None)
 
             # Pokročilé hledání WAV souboru pro stranu
-            wav_path_for_side = self._find_wav_for_side(side, available_wavs)
-            if not wav_path_for_side:
-                wav_path_for_side = next((p for p in available_wavs if "master" in Path(p).name.lower()), None)
+            wav_path_for_side = wav_index.wav_for_side(side, available_wavs) or wav_index.master_wav(available_wavs)
 
             wav_dur = available_wavs.pop(wav_path_for_side, None) if wav_path_for_side else None
 
@@ -713,49 +660,9 @@ Zde jsou dokumenty ke zpracování:
             rows.append({"project_title": project_name, "status": "FAIL", "pdf_source": Path(pdf_path_str).name, "notes": f"Extrakce dat z PDF selhala: {pdf_result.get('error_message', 'Neznámá chyba')}"})
             return rows
 
-        pdf_tracks = pdf_result.get('data', [])
-        pdf_path_str = pdf_result.get('source_identifier')
-
-        available_wavs = {k: v for k, v in wav_durations.items() if v is not None}
-        for track in pdf_tracks:
-            pdf_dur = track.get('duration_seconds')
-            track_title = track.get('title', '')
-
-            best_match_wav, highest_score = None, 0
-            for wav_path, wav_dur in available_wavs.items():
-                score = fuzz.token_set_ratio(normalize_string(track_title), normalize_string(Path(wav_path).stem))
-                if score > highest_score:
-                    highest_score, best_match_wav = score, wav_path
-
-            wav_path_str, wav_dur, notes = None, None, ""
-            if highest_score > 70:
-                wav_path_str, wav_dur = best_match_wav, available_wavs.pop(best_match_wav)
-            else:
-                notes = "Nepodařilo se spárovat WAV soubor podle názvu."
-
-            diff = wav_dur - pdf_dur if wav_dur is not None and pdf_dur is not None else None
-            status = "OK"
-            if diff is not None and abs(diff) > VALIDATION_TOLERANCE_SECONDS:
-                status, notes = "ERROR", f"Rozdíl překročil toleranci {VALIDATION_TOLERANCE_SECONDS}s"
-            elif wav_path_str is None:
-                status = "FAIL"
-
-            rows.append({
-                "project_title": project_name, "status": status, "validation_item": track_title,
-                "item_type": "TRACK", "pdf_duration_mmss": seconds_to_mmss(pdf_dur).replace('+', ''),
-                "wav_duration_mmss": seconds_to_mmss(wav_dur).replace('+', ''), "difference_mmss": seconds_to_mmss(diff),
-                "pdf_duration_sec": safe_round(pdf_dur),
-                "wav_duration_sec": safe_round(wav_dur),
-                "difference_sec": safe_round(diff),
-                "pdf_source": Path(pdf_path_str).name,
-                "wav_source": Path(wav_path_str).name if wav_path_str else "N/A",
-                "notes": notes
-            })
-
-        for wav_path_str, wav_dur in available_wavs.items():
-            rows.append({"project_title": project_name, "status": "WARN", "wav_source": Path(wav_path_str).name, "notes": "Tento WAV soubor nebyl spárován s žádnou skladbou z PDF."})
-
-        return rows
+        # párování skladeb na WAV (globální optimum přes core.matcher) řeší core validátor
+        from vinyl_preflight.core.validator import validate_individual_project
+        return validate_individual_project(project_name, pdf_result, wav_durations)
 
 # Grafické uživatelské rozhraní
 class VinylPreflightApp:
@@ -1,7 +1,37 @@
+import fitz
+import numpy as np
+import soundfile as sf
+
 from vinyl_preflight.app import run
 
+
+def _make_project(root, seconds):
+    root.mkdir()
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "A1 Opening Song 3:00\nA2 Second Song 4:00\nB1 Third Song 2:00")
+    doc.save(root / 'tracklist.pdf')
+    doc.close()
+    for side, length in seconds.items():
+        sf.write(root / f'{root.name}_Side_{side}.wav', np.zeros(int(length * 100)), 100, format='WAV', subtype='PCM_16')
+    return root
+
+
 def test_pipeline_e2e():
     r = run({'source': 'test-src'})
     assert r['status'] == 'done'
     assert 'report' in r
 
+
+def test_pipeline_e2e_validates_project(tmp_path):
+    project = _make_project(tmp_path / 'album', {'A': 420, 'B': 120})
+    r = run({'source': str(project)})
+    assert r['status'] == 'done'
+    assert r['report']['project'] == 'album'
+    assert r['report']['ok'] == 2 and r['report']['fail'] == 0
+
+
+def test_pipeline_e2e_keeps_source_order(tmp_path):
+    sources = [str(_make_project(tmp_path / f'album{i}', {'A': 420, 'B': 120})) for i in range(6)]
+    r = run({'sources': sources, 'extract_workers': 3, 'validate_workers': 3})
+    assert r['status'] == 'done'
+    assert [rep['project'] for rep in r['report']] == [f'album{i}' for i in range(6)]
@@ -84,6 +84,39 @@ class TestPreflightProcessor:
         assert len(projects["test_project"]["pdfs"]) == 1
         assert len(projects["test_project"]["wavs"]) == 1
     
+    def test_inplace_workspace_does_not_copy(self, processor, temp_dir):
+        """Test režimu 'inplace' - složky projektů se čtou přímo ze zdroje"""
+        source = temp_dir / "source"
+        project_dir = source / "test_project"
+        project_dir.mkdir(parents=True)
+        (project_dir / "tracklist.pdf").write_bytes(b"%PDF-1.4 fake pdf")
+        (project_dir / "side_a.wav").write_bytes(b"RIFF fake wav")
+        scratch = temp_dir / "scratch"
+        scratch.mkdir()
+
+        roots = processor._prepare_workspace(source, scratch)
+        assert list(scratch.iterdir()) == []
+
+        projects = processor._scan_workspace(roots)
+        assert projects["test_project"]["wavs"] == [project_dir / "side_a.wav"]
+
+    def test_virtual_archive_is_not_extracted(self, processor, temp_dir):
+        """Test archivního režimu 'virtual' - ZIP se skenuje bez rozbalení"""
+        import zipfile
+        source = temp_dir / "source"
+        source.mkdir()
+        with zipfile.ZipFile(source / "album.zip", "w") as zf:
+            zf.writestr("album/tracklist.pdf", b"%PDF-1.4 fake pdf")
+            zf.writestr("album/side_a.wav", b"RIFF fake wav")
+        scratch = temp_dir / "scratch"
+        scratch.mkdir()
+
+        roots = processor._prepare_workspace(source, scratch)
+        assert list(scratch.iterdir()) == []
+
+        projects = processor._scan_workspace(roots)
+        assert [wav.name for wav in projects["album"]["wavs"]] == ["side_a.wav"]
+
     def test_nonexistent_directory(self, processor):
         """Test neexistujícího adresáře"""
         nonexistent = Path("/nonexistent/directory")
@@ -0,0 +1,55 @@
+from pathlib import Path
+import io
+import zipfile
+
+import fitz
+import numpy as np
+import soundfile as sf
+
+from vinyl_preflight.core.pdf_utils import extract_text_from_pdf
+from vinyl_preflight.core.wav_utils import get_wav_duration
+from vinyl_preflight.io.archive_fs import ArchiveMember, scan_archive
+
+
+def _wav_bytes(seconds: float, rate: int = 8000) -> bytes:
+    buf = io.BytesIO()
+    sf.write(buf, np.zeros(int(seconds * rate)), rate, format='WAV', subtype='PCM_16')
+    return buf.getvalue()
+
+
+def _pdf_bytes(text: str) -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _make_zip(path: Path) -> Path:
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('album/side_a.wav', _wav_bytes(2.5))
+        zf.writestr('album/tracklist.pdf', _pdf_bytes('A1 Song 3:45'))
+        zf.writestr('album/cover.tif', b'II*\x00')
+        zf.writestr('__MACOSX/album/._side_a.wav', b'junk')
+    return path
+
+
+def test_scan_archive(tmp_path):
+    files = scan_archive(_make_zip(tmp_path / 'album.zip'))
+    assert [m.name for m in files['wavs']] == ['side_a.wav']
+    assert [m.name for m in files['pdfs']] == ['tracklist.pdf']
+
+
+def test_member_is_path_like(tmp_path):
+    archive = _make_zip(tmp_path / 'album.zip')
+    member = scan_archive(archive)['wavs'][0]
+    assert member.exists()
+    assert member.stat().st_size > 0
+    assert Path(member.as_posix()).name == 'side_a.wav'
+    assert member == ArchiveMember(archive, 'album/side_a.wav')
+
+
+def test_wav_duration_and_pdf_text_from_archive(tmp_path):
+    files = scan_archive(_make_zip(tmp_path / 'album.zip'))
+    assert abs(get_wav_duration(files['wavs'][0]) - 2.5) < 0.01
+    assert 'Song' in extract_text_from_pdf(files['pdfs'][0])
@@ -1,7 +1,10 @@
-from vinyl_preflight.io.archives import safe_extract_zip
+from vinyl_preflight.io.archives import ExtractionTimeout, extract_archive, extract_archives, safe_extract_zip
 from pathlib import Path
+import time
 import zipfile
 
+import pytest
+
 def test_safe_extract(tmp_path):
     z = tmp_path / 't.zip'
     d = tmp_path / 'out'
@@ -13,3 +16,48 @@ def test_safe_extract(tmp_path):
     safe_extract_zip(z, d)
     assert (d / 'a.txt').exists()
 
+
+
+def _zip_with(path: Path, files: dict) -> Path:
+    with zipfile.ZipFile(path, 'w') as zz:
+        for name, data in files.items():
+            zz.writestr(name, data)
+    return path
+
+
+def test_extract_archives_parallel(tmp_path):
+    jobs = []
+    for i in range(5):
+        z = _zip_with(tmp_path / f'album{i}.zip', {'a.pdf': b'%PDF', 'side_a.wav': b'RIFF'})
+        jobs.append((z, tmp_path / 'out' / z.stem))
+    seen = []
+    results = extract_archives(jobs, max_workers=3, on_archive_done=lambda done, total: seen.append(done))
+    assert set(results.values()) == {'ok'}
+    assert sorted(seen) == [1, 2, 3, 4, 5]
+    assert (tmp_path / 'out' / 'album4' / 'side_a.wav').exists()
+
+
+def test_extract_archives_scratch_budget(tmp_path):
+    z = _zip_with(tmp_path / 'big.zip', {'a.pdf': b'%PDF', 'side_a.wav': b'x' * 1000})
+    results = extract_archives([(z, tmp_path / 'out')], scratch_budget_bytes=100)
+    assert results[z] == 'skipped'
+
+
+def test_extract_archive_deadline(tmp_path):
+    z = _zip_with(tmp_path / 'slow.zip', {'a.pdf': b'%PDF', 'side_a.wav': b'RIFF'})
+    with pytest.raises(ExtractionTimeout):
+        extract_archive(z, tmp_path / 'out', deadline=time.monotonic() - 1)
+    assert not (tmp_path / 'out' / 'side_a.wav').exists()
+
+
+def test_extract_archive_is_selective(tmp_path):
+    z = _zip_with(tmp_path / 'album.zip', {'a.pdf': b'%PDF', 'side_a.wav': b'RIFF', 'art/cover.tif': b'II*'})
+    assert extract_archive(z, tmp_path / 'out') == 8
+    assert (tmp_path / 'out' / 'side_a.wav').exists()
+    assert not (tmp_path / 'out' / 'art').exists()
+
+
+def test_extract_archive_skips_archive_without_project(tmp_path):
+    z = _zip_with(tmp_path / 'stems.zip', {'stems/kick.wav': b'RIFF', 'art/cover.tif': b'II*'})
+    assert extract_archive(z, tmp_path / 'out') == 0
+    assert not (tmp_path / 'out').exists()
@@ -0,0 +1,43 @@
+import time
+
+from vinyl_preflight.io.cache import SqliteCache
+
+
+def test_cache_roundtrip(tmp_path):
+    c = SqliteCache(tmp_path / 'c.sqlite3', 'ns')
+    c.set_many({'a': {'duration': 1.5}, 'b': [1, 2]})
+    assert c.get('a') == {'duration': 1.5}
+    assert c.get_many(['a', 'b', 'x']) == {'a': {'duration': 1.5}, 'b': [1, 2]}
+    # jiný jmenný prostor ve stejném souboru je oddělený
+    assert SqliteCache(tmp_path / 'c.sqlite3', 'other').get('a') is None
+
+
+def test_cache_eviction_and_clear(tmp_path):
+    c = SqliteCache(tmp_path / 'c.sqlite3', 'ns', max_entries=2)
+    c.set('a', 1)
+    time.sleep(0.01)
+    c.set('b', 2)
+    time.sleep(0.01)
+    c.get('a')  # 'a' je teď čerstvější než 'b'
+    c.set('c', 3)
+    assert set(c.get_many(['a', 'b', 'c'])) == {'a', 'c'}
+    c.clear()
+    assert len(c) == 0
+
+
+def test_cache_evicts_in_batches_over_limit(tmp_path):
+    c = SqliteCache(tmp_path / 'c.sqlite3', 'ns', max_entries=10)
+    c.set_many({str(i): i for i in range(10)})
+    assert len(c) == 10
+    c.set('new', 1)
+    assert len(c) == 9
+    assert c.get('new') == 1
+    c.set('newer', 2)
+    assert len(c) == 10
+
+
+def test_cache_ttl(tmp_path):
+    c = SqliteCache(tmp_path / 'c.sqlite3', 'ns', ttl_seconds=0)
+    c.set('a', 1)
+    time.sleep(0.01)
+    assert c.get('a') is None
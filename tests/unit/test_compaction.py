@@ -0,0 +1,31 @@
+from vinyl_preflight.core.compaction import CompactionReport, compact_pages
+
+
+def test_compact_pages_keeps_lines_near_times():
+    page = "\n".join(["Mastering notes"] + [f"filler line {i}" for i in range(10)]
+                     + ["Side A", "A1   Intro    3:45", "A2  Outro  12:01"] + [f"more filler {i}" for i in range(10)])
+    text = compact_pages([page], context_lines=1)
+    assert "A1 Intro 3:45" in text
+    assert "Side A" in text
+    assert "filler line 0" not in text
+    assert "more filler 0" in text
+    assert "more filler 5" not in text
+
+
+def test_compact_pages_drops_repeated_headers():
+    pages = [f"ACME Pressing Ltd.\nA{i} Song {i} 3:0{i}\nPage {i}" for i in range(1, 4)]
+    text = compact_pages(pages)
+    assert "ACME" not in text
+    assert "A2 Song 2 3:02" in text
+
+
+def test_compact_pages_without_times_keeps_text():
+    assert compact_pages(["  Just\t\ta   label  \n\n sheet "]) == "Just a label\nsheet"
+
+
+def test_compaction_report():
+    report = CompactionReport()
+    report.add("x" * 400, "x" * 40)
+    assert report.documents == 1
+    assert report.tokens_saved == 101 - 11
+    assert "ušetřeno" in report.summary()
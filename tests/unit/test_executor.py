@@ -0,0 +1,76 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import os
+
+from vinyl_preflight.core import executor
+from vinyl_preflight.core.executor import CPU_BOUND, IO_BOUND, run_bounded, run_tasks
+
+
+def _square(x):
+    if x == 3:
+        raise ValueError('bad item')
+    return x * x
+
+
+def _crash_in_worker(item):
+    parent_pid, x = item
+    # v procesu workeru simuluje pád (segfault parseru), ve vlákně rodiče projde
+    if x == 2 and os.getpid() != parent_pid:
+        os._exit(1)
+    return x * 10
+
+
+def test_run_tasks_isolates_errors():
+    results = {item: (value, error) for item, value, error in run_tasks(_square, range(10), kind=IO_BOUND, chunksize=4)}
+    assert len(results) == 10
+    assert results[4] == (16, None)
+    assert isinstance(results[3][1], ValueError)
+
+
+def test_run_tasks_process_pool():
+    results = {item: value for item, value, error in run_tasks(_square, [1, 2, 5], kind=CPU_BOUND, max_workers=2)}
+    assert results == {1: 1, 2: 4, 5: 25}
+
+
+def test_run_tasks_empty():
+    assert list(run_tasks(_square, [])) == []
+
+
+def test_run_tasks_falls_back_to_threads_when_worker_dies():
+    items = [(os.getpid(), x) for x in range(6)]
+    results = {item[1]: (value, error) for item, value, error in run_tasks(_crash_in_worker, items, kind=CPU_BOUND,
+                                                                           max_workers=2, chunksize=1)}
+    assert results == {x: (x * 10, None) for x in range(6)}
+
+
+def test_run_bounded_falls_back_to_threads_when_worker_dies():
+    items = [(os.getpid(), x) for x in range(6)]
+    results = {item[1]: (value, error) for item, value, error in run_bounded(_crash_in_worker, items, weight=lambda i: 1,
+                                                                             max_weight=10, max_workers=2)}
+    assert results == {x: (x * 10, None) for x in range(6)}
+
+
+class StrandingProcessPool:
+    """První úloha zůstane navždy nedokončená, další submit hlásí rozpad (závod v ProcessPoolExecutor)."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        if self.submitted > 1:
+            raise BrokenProcessPool('worker died')
+        return Future()
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_stranded_process_tasks_are_rerun_in_threads(monkeypatch):
+    make = executor._make_executor
+    monkeypatch.setattr(executor, '_make_executor',
+                        lambda kind, workers: StrandingProcessPool() if kind == CPU_BOUND else make(kind, workers))
+    results = {item: value for item, value, error in run_tasks(_square, [1, 2, 4], kind=CPU_BOUND, chunksize=1)}
+    assert results == {1: 1, 2: 4, 4: 16}
+    results = {item: value for item, value, error in run_bounded(_square, [1, 2, 4], weight=lambda i: 1, max_weight=10)}
+    assert results == {1: 1, 2: 4, 4: 16}
@@ -0,0 +1,200 @@
+import json
+import re
+
+import fitz
+
+from vinyl_preflight.core.executor import CPU_BOUND, IO_BOUND
+from vinyl_preflight.core.extraction import PROMPT_VERSION, extract_documents, iter_documents, process_all_pdf_batches
+from vinyl_preflight.core.llm_cache import LlmResultCache
+from vinyl_preflight.io.cache import SqliteCache
+from vinyl_preflight.io.runlog import RunLog
+from vinyl_preflight.llm.client import LLMClient
+
+
+class EchoLLMClient(LLMClient):
+    """Vrací úspěšný výsledek pro každý dokument v promptu."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def call(self, prompt):
+        self.prompts.append(prompt)
+        ids = re.findall(r'"identifier": "(.*?)"', prompt)
+        results = [{"source_identifier": i, "status": "success", "data": [{"side": "A", "title": "Song"}]} for i in ids]
+        return {"choices": [{"message": {"content": json.dumps({"results": results})}}]}
+
+
+def _make_pdf(path, text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_iter_documents_handles_bad_files(tmp_path):
+    good = _make_pdf(tmp_path / 'good.pdf', 'A1 Song 3:45')
+    broken = tmp_path / 'broken.pdf'
+    broken.write_bytes(b'not a pdf at all')
+    empty = tmp_path / 'empty.pdf'
+    empty.write_bytes(b'')
+    docs = {d['identifier']: d['content'] for d in iter_documents([good, broken, empty], kind=IO_BOUND, max_open_bytes=1)}
+    assert 'Song' in docs[good.as_posix()]
+    assert docs[broken.as_posix()].startswith('CHYBA')
+    assert docs[empty.as_posix()] == 'CHYBA: Prázdný soubor.'
+
+
+def test_iter_documents_process_pool(tmp_path):
+    pdfs = [_make_pdf(tmp_path / f'{i}.pdf', f'Track {i}') for i in range(3)]
+    docs = list(iter_documents(pdfs, kind=CPU_BOUND, max_workers=2))
+    assert sorted(d['identifier'] for d in docs) == sorted(p.as_posix() for p in pdfs)
+
+
+def test_process_all_pdf_batches_with_client(tmp_path):
+    pdfs = [_make_pdf(tmp_path / f'{i}.pdf', f'Track {i}') for i in range(5)]
+    client = EchoLLMClient()
+    results = process_all_pdf_batches([pdfs[:3], pdfs[3:]], lambda m: None, lambda a, b: None,
+                                      llm_client=client, pdf_workers=2)
+    assert len(client.prompts) == 2
+    assert set(results) == {p.as_posix() for p in pdfs}
+    assert all(r['status'] == 'success' for r in results.values())
+
+
+def test_confident_documents_bypass_llm(tmp_path):
+    local = _make_pdf(tmp_path / 'local.pdf', 'A1 Song 3:45\nA2 Other 4:00')
+    remote = _make_pdf(tmp_path / 'remote.pdf', 'Track list attached separately')
+    only_local = _make_pdf(tmp_path / 'only.pdf', 'B1 Song 2:00')
+    client = EchoLLMClient()
+    progress = []
+    results = process_all_pdf_batches([[local, remote], [only_local]], lambda m: None, lambda a, b: progress.append(a),
+                                      llm_client=client, pdf_workers=2, local_parse_threshold=0.5)
+    assert len(client.prompts) == 1
+    assert 'local.pdf' not in client.prompts[0]
+    assert results[local.as_posix()]['extracted_by'] == 'local'
+    assert results[local.as_posix()]['data'][1]['duration_seconds'] == 240
+    assert results[only_local.as_posix()]['extracted_by'] == 'local'
+    assert 'extracted_by' not in results[remote.as_posix()]
+    assert sorted(progress) == [1, 2]
+
+    client = EchoLLMClient()
+    process_all_pdf_batches([[local]], lambda m: None, lambda a, b: None, llm_client=client, pdf_workers=1,
+                            local_parse_threshold=None)
+    assert len(client.prompts) == 1
+
+
+def test_compaction_savings_go_to_run_log(tmp_path):
+    pdf = _make_pdf(tmp_path / 'spaced.pdf', 'Track     list      attached      separately')
+    with RunLog(tmp_path / 'run.jsonl') as log:
+        process_all_pdf_batches([[pdf]], lambda m: None, lambda a, b: None, llm_client=EchoLLMClient(),
+                                pdf_workers=1, request_logger=log)
+    events = [json.loads(line) for line in (tmp_path / 'run.jsonl').read_text(encoding='utf-8').splitlines()]
+    compaction = next(e for e in events if e['event'] == 'text_compaction')
+    assert compaction['documents'] == 1
+    assert compaction['tokens_saved'] == compaction['tokens_before'] - compaction['tokens_after']
+
+
+def test_cached_results_skip_llm(tmp_path):
+    pdfs = [_make_pdf(tmp_path / f'{i}.pdf', f'Track {i}') for i in range(3)]
+    cache = LlmResultCache(SqliteCache(tmp_path / 'c.sqlite3', 'llm'), 'm', PROMPT_VERSION)
+    client = EchoLLMClient()
+    first = process_all_pdf_batches([pdfs[:2]], lambda m: None, lambda a, b: None,
+                                    llm_client=client, pdf_workers=1, result_cache=cache)
+    assert len(cache.cache) == 2
+
+    client = EchoLLMClient()
+    second = process_all_pdf_batches([pdfs], lambda m: None, lambda a, b: None,
+                                     llm_client=client, pdf_workers=1, result_cache=cache)
+    assert len(client.prompts) == 1
+    assert re.findall(r'"identifier": "(.*?)"', client.prompts[0]) == [pdfs[2].as_posix()]
+    assert second[pdfs[0].as_posix()]['cached'] is True
+    assert second[pdfs[0].as_posix()]['data'] == first[pdfs[0].as_posix()]['data']
+
+
+class BisectLLMClient(EchoLLMClient):
+    """Selže pro dávky nad 2 dokumenty a vynechá dokument 'skip'."""
+
+    def call(self, prompt):
+        ids = re.findall(r'"identifier": "(.*?)"', prompt)
+        self.prompts.append(ids)
+        if len(ids) > 2:
+            raise ValueError("Unterminated string")
+        results = [{"source_identifier": i, "status": "success", "data": []} for i in ids
+                   if i != 'skip' or len(ids) == 1]
+        return {"choices": [{"message": {"content": json.dumps({"results": results})}}]}
+
+
+def test_failed_batches_are_bisected_and_missing_documents_retried():
+    docs = [{"identifier": i, "content": "x"} for i in ('a', 'b', 'skip', 'd', 'e')]
+    client = BisectLLMClient()
+    results = extract_documents(docs, client)
+    assert sorted(r['source_identifier'] for r in results) == ['a', 'b', 'd', 'e', 'skip']
+    assert all(r['status'] == 'success' for r in results)
+    # a/b po úspěchu v poloviční dávce už znovu neodcházejí
+    assert sum('a' in ids for ids in client.prompts) == 2
+    assert ['skip'] in client.prompts
+
+
+def test_unrecoverable_document_reports_error():
+    client = BisectLLMClient()
+    client.call = lambda prompt: (_ for _ in ()).throw(ValueError("boom"))
+    results = extract_documents([{"identifier": "a", "content": "x"}, {"identifier": "b", "content": "y"}], client)
+    assert [r['status'] for r in results] == ['error', 'error']
+
+
+class HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+def test_throttled_batch_fails_whole_without_bisecting():
+    client = BisectLLMClient()
+
+    def overloaded(prompt):
+        client.prompts.append(prompt)
+        raise HttpError(503)
+    client.call = overloaded
+    docs = [{"identifier": i, "content": "x"} for i in ('a', 'b', 'c', 'd')]
+    results = extract_documents(docs, client)
+    assert [r['status'] for r in results] == ['error'] * 4
+    assert len(client.prompts) == 1
+
+
+def test_context_length_error_is_bisected():
+    client = BisectLLMClient()
+    original = client.call
+
+    def too_long(prompt):
+        if len(re.findall(r'"identifier": "(.*?)"', prompt)) > 1:
+            client.prompts.append(prompt)
+            raise HttpError(413)
+        return original(prompt)
+    client.call = too_long
+    results = extract_documents([{"identifier": i, "content": "x"} for i in ('a', 'b')], client)
+    assert [r['status'] for r in results] == ['success', 'success']
+
+
+class StreamingEchoClient(EchoLLMClient):
+    supports_streaming = True
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        ids = re.findall(r'"identifier": "(.*?)"', prompt)
+        text = json.dumps({"results": [{"source_identifier": i, "status": "success", "data": []} for i in ids]})
+        for i in range(0, len(text), 5):
+            self.chunks_sent = i
+            yield text[i:i + 5]
+        yield "  trailing text nobody waits for"
+        self.finished = True
+
+
+def test_streamed_results_are_emitted_per_document():
+    docs = [{"identifier": i, "content": "x"} for i in ('a', 'b')]
+    client = StreamingEchoClient()
+    seen = []
+    results = extract_documents(docs, client, on_result=lambda r: seen.append((r['source_identifier'], client.chunks_sent)))
+    assert [r['source_identifier'] for r in results] == ['a', 'b']
+    assert [s[0] for s in seen] == ['a', 'b']
+    # 'a' je k dispozici dřív než celá odpověď
+    assert seen[0][1] < seen[1][1]
+    assert not hasattr(client, 'finished')
@@ -0,0 +1,55 @@
+import pytest
+
+from vinyl_preflight.core.extraction import MAX_DOCUMENT_RETRIES, build_extraction_prompt, extract_documents
+from vinyl_preflight.llm.client import OpenRouterLLMClient
+from vinyl_preflight.llm.fake_server import FakeOpenRouterServer, FaultProfile, extract_prompt_documents
+
+DOCUMENTS = [{"identifier": f"/p/{i}.pdf", "content": f"A1 Song {i} 3:4{i}\nB1 Other 4:10"} for i in range(3)]
+
+
+def test_extract_prompt_documents_roundtrip():
+    assert extract_prompt_documents(build_extraction_prompt(DOCUMENTS)) == DOCUMENTS
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_fake_server_serves_results(stream):
+    with FakeOpenRouterServer(seed=1) as server, OpenRouterLLMClient(server.api_url, {}, "fake") as client:
+        results = extract_documents(DOCUMENTS, client, on_result=(lambda r: None) if stream else None)
+    assert sorted(r["source_identifier"] for r in results) == [d["identifier"] for d in DOCUMENTS]
+    assert all(r["status"] == "success" and len(r["data"]) == 2 for r in results)
+    assert server.stats["streamed"] == (1 if stream else 0)
+
+
+def test_fake_server_injects_faults():
+    faults = FaultProfile(rate_429=1.0, retry_after=0)
+    with FakeOpenRouterServer(faults) as server, OpenRouterLLMClient(server.api_url, {}, "fake", max_attempts=2,
+                                                                      sleep=lambda s: None) as client:
+        results = extract_documents(DOCUMENTS[:1], client)
+    assert results[0]["status"] == "error"
+    assert server.stats["429"] == 2
+
+
+def test_fake_server_drops_documents():
+    with FakeOpenRouterServer(FaultProfile(drop_rate=1.0)) as server, \
+            OpenRouterLLMClient(server.api_url, {}, "fake") as client:
+        results = extract_documents(DOCUMENTS, client)
+    assert all(r["status"] == "error" for r in results)
+    assert server.stats["dropped_documents"] >= len(DOCUMENTS)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_truncated_document_is_retried(stream):
+    with FakeOpenRouterServer(FaultProfile(truncate_first=1)) as server, \
+            OpenRouterLLMClient(server.api_url, {}, "fake") as client:
+        results = extract_documents(DOCUMENTS[:1], client, on_result=(lambda r: None) if stream else None)
+    assert results[0]["status"] == "success"
+    assert server.stats["truncated"] == 1
+    assert server.stats["requests"] == 2
+
+
+def test_dropped_document_gives_up_after_bounded_retries():
+    with FakeOpenRouterServer(FaultProfile(drop_rate=1.0)) as server, \
+            OpenRouterLLMClient(server.api_url, {}, "fake") as client:
+        results = extract_documents(DOCUMENTS[:1], client)
+    assert results[0]["status"] == "error"
+    assert server.stats["requests"] == 1 + MAX_DOCUMENT_RETRIES
@@ -0,0 +1,31 @@
+from vinyl_preflight.core.filename_index import CONSOLIDATED, INDIVIDUAL, FilenameIndex, WavName
+from vinyl_preflight.core.matcher import find_wav_for_side
+
+
+def test_wav_name_features():
+    name = WavName("/p/Album_Master_Side-B.wav")
+    assert "b" in name.sides and name.is_master and name.kind == CONSOLIDATED
+    track = WavName("/p/07 - Song.wav")
+    assert track.track_number == 7 and track.kind == INDIVIDUAL
+
+
+def test_wav_for_side_patterns():
+    wavs = ["/p/Album SIDE A.wav", "/p/b_side.wav", "/p/C-final.wav", "/p/x_d.wav", "/p/mix_e_v2.wav"]
+    index = FilenameIndex(wavs)
+    assert [index.wav_for_side(s) for s in "ABCDE"] == wavs
+    assert index.wav_for_side("F") is None
+    assert index.wav_for_side("A", available=wavs[1:]) is None
+
+
+def test_find_wav_for_side_keeps_first_match_order():
+    wavs = {"/p/side a take1.wav": 1.0, "/p/side a take2.wav": 2.0}
+    assert find_wav_for_side("a", wavs) == "/p/side a take1.wav"
+    assert find_wav_for_side("AA", {"/p/side aa.wav": 1.0}) == "/p/side aa.wav"
+
+
+def test_master_and_mode():
+    index = FilenameIndex(["/p/Final MASTER.wav", "/p/notes.wav"])
+    assert index.master_wav() == "/p/Final MASTER.wav"
+    assert index.is_consolidated() is True
+    assert FilenameIndex([f"/p/{i:02d} Song.wav" for i in range(1, 4)]).is_consolidated() is False
+    assert FilenameIndex([]).is_consolidated() is False
@@ -0,0 +1,20 @@
+from vinyl_preflight.io.filesystem import link_or_copy, link_tree
+
+
+def test_link_or_copy(tmp_path):
+    src = tmp_path / 'a.wav'
+    src.write_bytes(b'RIFF')
+    dest = tmp_path / 'stage' / 'a.wav'
+    method = link_or_copy(src, dest)
+    assert method in ('reflink', 'hardlink', 'copy')
+    assert dest.read_bytes() == b'RIFF'
+
+
+def test_link_tree(tmp_path):
+    src = tmp_path / 'proj'
+    (src / 'sub').mkdir(parents=True)
+    (src / 'tracklist.pdf').write_bytes(b'%PDF')
+    (src / 'sub' / 'side_a.wav').write_bytes(b'RIFF')
+    stats = link_tree(src, tmp_path / 'stage')
+    assert sum(stats.values()) == 2
+    assert (tmp_path / 'stage' / 'sub' / 'side_a.wav').exists()
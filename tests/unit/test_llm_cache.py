@@ -0,0 +1,25 @@
+from vinyl_preflight.core.llm_cache import LlmResultCache, result_key
+from vinyl_preflight.io.cache import SqliteCache
+
+
+def test_result_key_depends_on_model_prompt_and_content():
+    base = result_key('m', '1', 'A1 Song 3:45')
+    assert result_key('m', '1', 'A1 Song 3:45') == base
+    assert result_key('m', '2', 'A1 Song 3:45') != base
+    assert result_key('other', '1', 'A1 Song 3:45') != base
+    assert result_key('m', '1', 'A1 Song 3:46') != base
+
+
+def test_lookup_by_content_and_store_only_success(tmp_path):
+    cache = LlmResultCache(SqliteCache(tmp_path / 'c.sqlite3', 'llm'), 'm', '1')
+    docs = [{"identifier": "a.pdf", "content": "same"}, {"identifier": "b.pdf", "content": "broken"}]
+    cache.store(docs, [
+        {"source_identifier": "a.pdf", "status": "success", "data": [{"side": "A"}]},
+        {"source_identifier": "b.pdf", "status": "error", "data": [], "error_message": "x"},
+    ])
+    hits = cache.lookup([{"identifier": "renamed.pdf", "content": "same"}, docs[1]])
+    assert hits == {"renamed.pdf": {"source_identifier": "renamed.pdf", "status": "success",
+                                    "data": [{"side": "A"}], "cached": True}}
+
+    bumped = LlmResultCache(cache.cache, 'm', '2')
+    assert bumped.lookup(docs) == {}
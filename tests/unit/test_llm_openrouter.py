@@ -1,26 +1,108 @@
 from vinyl_preflight.llm.client import OpenRouterLLMClient
+from vinyl_preflight.llm.ratelimit import AdaptiveLimiter
 import pytest
 
 class DummyResponse:
-    def __init__(self, json_data, status_code=200):
+    def __init__(self, json_data, status_code=200, headers=None):
         self._json = json_data
         self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
     def raise_for_status(self):
         if self.status_code >= 400:
             raise RuntimeError("HTTP error")
     def json(self):
         return self._json
+    def close(self):
+        self.closed = True
 
 
 def test_openrouter_client_call(monkeypatch):
     called = {}
-    def fake_post(url, headers=None, json=None, timeout=None):
+    def fake_post(self, url, headers=None, json=None, timeout=None, **kwargs):
         called['ok'] = True
         return DummyResponse({"choices": [{"message": {"content": '{"results": []}'}}]})
-    monkeypatch.setattr("requests.post", fake_post)
+    monkeypatch.setattr("requests.Session.post", fake_post)
 
     client = OpenRouterLLMClient(api_url="http://x", headers={}, model="m")
     r = client.call("hello")
     assert 'choices' in r
     assert called.get('ok') is True
 
+
+
+def test_openrouter_client_reuses_session(monkeypatch):
+    sessions = set()
+    def fake_post(self, url, headers=None, json=None, timeout=None, **kwargs):
+        sessions.add(id(self))
+        if json["messages"][0]["content"] == "bad":
+            return DummyResponse({}, status_code=500)
+        return DummyResponse({"echo": json["messages"][0]["content"]})
+    monkeypatch.setattr("requests.Session.post", fake_post)
+
+    client = OpenRouterLLMClient(api_url="http://x", headers={"Authorization": "Bearer k"}, model="m", max_concurrency=2,
+                                 max_attempts=2, sleep=lambda s: None)
+    results = client.call_many(["a", "bad", "c"])
+    assert [r[0] for r in results] == [{"echo": "a"}, None, {"echo": "c"}]
+    assert isinstance(results[1][1], RuntimeError)
+    assert len(sessions) == 1
+    assert client.session.headers["Authorization"] == "Bearer k"
+    client.close()
+
+
+def test_openrouter_client_retries_with_retry_after(monkeypatch):
+    responses = [DummyResponse({}, 429, {"Retry-After": "7"}), DummyResponse({}, 503), DummyResponse({"ok": True})]
+    monkeypatch.setattr("requests.Session.post", lambda self, url, json=None, timeout=None, **kw: responses.pop(0))
+    clock = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    limiter = AdaptiveLimiter(initial=4, max_limit=10, clock=lambda: clock[0])
+    client = OpenRouterLLMClient(api_url="http://x", headers={}, model="m", max_concurrency=10,
+                                 limiter=limiter, sleep=fake_sleep)
+    assert client.call("hello") == {"ok": True}
+    assert sleeps[0] == 7.0
+    assert 0 <= sleeps[1] <= 2
+    assert limiter.limit < 4
+
+
+def test_openrouter_client_closes_failed_responses(monkeypatch):
+    failed = [DummyResponse({}, 503), DummyResponse({}, 503)]
+    responses = list(failed)
+    monkeypatch.setattr("requests.Session.post", lambda self, url, json=None, timeout=None, **kw: responses.pop(0))
+
+    client = OpenRouterLLMClient(api_url="http://x", headers={}, model="m", max_attempts=2, sleep=lambda s: None)
+    with pytest.raises(RuntimeError):
+        list(client.stream("hello"))
+    assert all(resp.closed for resp in failed)
+    assert client.limiter.in_flight == 0
+
+
+class StreamResponse(DummyResponse):
+    def __init__(self, lines):
+        super().__init__({})
+        self.lines = lines
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+
+def test_openrouter_client_stream(monkeypatch):
+    def chunk(text):
+        return 'data: {"choices": [{"delta": {"content": "%s"}}]}' % text
+
+    resp = StreamResponse([": OPENROUTER PROCESSING", "", chunk("{\\\"res"), "", chunk("ults\\\": []}"), "", "data: [DONE]", ""])
+    payloads = []
+    def fake_post(self, url, json=None, timeout=None, stream=False):
+        payloads.append((json, stream))
+        return resp
+    monkeypatch.setattr("requests.Session.post", fake_post)
+
+    client = OpenRouterLLMClient(api_url="http://x", headers={}, model="m")
+    assert "".join(client.stream("hello")) == '{"results": []}'
+    assert payloads[0][0]["stream"] is True and payloads[0][1] is True
+    assert resp.closed
+    assert client.limiter.in_flight == 0
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from thefuzz import fuzz
+
+from vinyl_preflight.core.matcher import match_tracks_to_wavs, min_cost_assignment, name_similarity_matrix
+from vinyl_preflight.core.validator import validate_individual_project
+from vinyl_preflight.utils.text import normalize_string
+
+
+def test_min_cost_assignment_is_optimal():
+    cost = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+    pairs = min_cost_assignment(cost)
+    assert sum(cost[i][j] for i, j in pairs) == 5
+    assert min_cost_assignment([[1], [0]]) == [(1, 0)]
+    assert min_cost_assignment([[float('inf')]]) == []
+
+
+def test_early_track_does_not_steal_better_match():
+    tracks = [{"title": "Love", "duration_seconds": 200}, {"title": "Love Song", "duration_seconds": 240}]
+    wavs = {"/p/01 Love Song.wav": 240.0, "/p/02 Love.wav": 200.0}
+    assert match_tracks_to_wavs(tracks, wavs) == ["/p/02 Love.wav", "/p/01 Love Song.wav"]
+
+
+def test_duration_breaks_name_ties():
+    tracks = [{"title": "Intro", "duration_seconds": 60}, {"title": "Intro", "duration_seconds": 300}]
+    wavs = {"/p/Intro (long).wav": 301.0, "/p/Intro.wav": 61.0}
+    assert match_tracks_to_wavs(tracks, wavs) == ["/p/Intro.wav", "/p/Intro (long).wav"]
+
+
+def test_better_name_wins_over_closer_duration():
+    tracks = [{"title": "Summer Rain", "duration_seconds": 200}]
+    wavs = {"/p/01 Summer Rain.wav": 300.0, "/p/02 Summer Rains.wav": 200.0}
+    assert match_tracks_to_wavs(tracks, wavs) == ["/p/01 Summer Rain.wav"]
+
+
+def test_unmatched_tracks_and_wavs():
+    tracks = [{"title": "Alpha", "duration_seconds": 100}, {"title": "Completely Different", "duration_seconds": 100}]
+    result = {"status": "success", "source_identifier": "/p/list.pdf", "data": tracks}
+    rows = validate_individual_project("P", result, {"/p/01 Alpha.wav": 101.0, "/p/99 Zeta.wav": 50.0})
+    assert [r["status"] for r in rows] == ["OK", "FAIL", "WARN"]
+
+
+
+def test_accented_names_score_like_thefuzz():
+    titles = ["Píseň o lásce", "Žluťoučký kůň", "Café Noir", "Řeka"]
+    wavs = ["/p/01 Pisen o lasce.wav", "/p/02 Žlutoučký kůň.wav", "/p/03 Cafe Noir.wav", "/p/04 Reka.wav"]
+    expected = [[fuzz.token_set_ratio(normalize_string(t), normalize_string(Path(w).stem)) for w in wavs]
+                for t in titles]
+    assert name_similarity_matrix(titles, wavs) == expected
@@ -0,0 +1,58 @@
+import fitz
+
+from vinyl_preflight.core import pdf_utils
+from vinyl_preflight.core.pdf_utils import PdfTextCache, extract_pages_from_pdf, extract_text_from_pdf, normalize_page_text
+from vinyl_preflight.io.cache import SqliteCache
+
+
+def _make_pdf(path, lines):
+    doc = fitz.open()
+    for line in lines:
+        doc.new_page().insert_text((72, 72), line)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_normalize_page_text():
+    assert normalize_page_text('A1 Song   \r\nA2 Other\t\n\n') == 'A1 Song\nA2 Other'
+
+
+def test_text_cache_skips_pymupdf(tmp_path, monkeypatch):
+    pdf = _make_pdf(tmp_path / 'tracklist.pdf', ['A1 Song 3:45', 'B1 Other 4:10'])
+    cache = PdfTextCache(SqliteCache(tmp_path / 'c.sqlite3', 'pdf'))
+    pages = extract_pages_from_pdf(pdf, cache)
+    assert len(pages) == 2 and 'Song' in pages[0]
+
+    def fail(*args, **kwargs):
+        raise AssertionError('PyMuPDF se nemá volat pro nezměněné PDF')
+    monkeypatch.setattr(pdf_utils.fitz, 'open', fail)
+    assert extract_text_from_pdf(pdf, cache) == '\n'.join(pages)
+
+
+def test_select_pages_keeps_tracklist_pages():
+    pages = ['Cover art'] * 20
+    pages[3] = 'Side A\nA1 Song 3:45\nA2 Other 4:10'
+    pages[15] = 'Side B\nB1 Third 5:00'
+    assert pdf_utils.select_pages(iter(pages), len(pages), max_pages=2) == [pages[3], pages[15]]
+    assert pdf_utils.select_pages(iter(['Cover'] * 10), 10, max_pages=3) == ['Cover'] * 3
+    assert pdf_utils.select_pages(iter(['Cover'] * 3), 3) == ['Cover'] * 3
+
+
+def test_parse_pdf_pages_selects_from_long_pdf(tmp_path):
+    lines = [f'Artwork page {i}' for i in range(12)]
+    lines[7] = 'A1 Song 3:45'
+    pdf = _make_pdf(tmp_path / 'artwork.pdf', lines)
+    assert pdf_utils.parse_pdf_pages(pdf) == ['A1 Song 3:45']
+    assert len(pdf_utils.parse_pdf_pages(pdf, select=False)) == 12
+
+
+def test_text_cache_keeps_page_count_of_selected_pdf(tmp_path):
+    lines = [f'Artwork page {i}' for i in range(12)]
+    lines[7] = 'A1 Song 3:45'
+    pdf = _make_pdf(tmp_path / 'artwork.pdf', lines)
+    cache = PdfTextCache(SqliteCache(tmp_path / 'c.sqlite3', 'pdf'))
+    extract_pages_from_pdf(pdf, cache)
+    hit = cache.get(pdf_utils.source_digest(pdf))
+    assert hit['selected_pages'] == 1
+    assert hit['page_count'] == 12
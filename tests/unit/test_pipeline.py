@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import os
+
+import fitz
+
+from vinyl_preflight.core import extraction, pdf_utils
+from vinyl_preflight.core.executor import IO_BOUND
+from vinyl_preflight.core.extraction import iter_documents
+from vinyl_preflight.core.pdf_utils import PdfTextCache, source_digests
+from vinyl_preflight.core.pipeline import (MAX_TOKENS_PER_PAGE, create_pdf_batches, estimate_output_tokens,
+                                            estimate_pdf_tokens, pack_batches)
+from vinyl_preflight.io.cache import SqliteCache
+
+
+def _items(n, tokens):
+    return [(Path(f'{i}.pdf'), tokens) for i in range(n)]
+
+
+def test_small_documents_spread_over_parallel_requests():
+    batches = pack_batches(_items(25, 1000), parallelism=10)
+    assert len(batches) == 10
+    assert sorted(p.name for b in batches for p in b) == sorted(f'{i}.pdf' for i in range(25))
+    assert max(len(b) for b in batches) - min(len(b) for b in batches) <= 1
+
+
+def test_batches_respect_token_budgets():
+    batches = pack_batches(_items(200, 3000), input_budget=50_000, output_budget=16_000, parallelism=4)
+    assert len(batches) % 4 == 0
+    for batch in batches:
+        assert len(batch) * 3000 <= 50_000
+        assert len(batch) * estimate_output_tokens(3000) <= 16_000
+
+
+def test_oversized_document_is_isolated():
+    items = [(Path('big.pdf'), 500_000)] + _items(3, 100)
+    batches = pack_batches(items, parallelism=1)
+    assert batches == [[Path('0.pdf'), Path('1.pdf'), Path('2.pdf')], [Path('big.pdf')]]
+
+
+def test_large_pdf_estimate_is_capped_by_page_count(tmp_path):
+    # 3 MB nekomprimovatelné přílohy, ale jen jedna stránka textu
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "A1 Song 3:00")
+    doc.embfile_add("artwork.bin", os.urandom(3_000_000))
+    pdf = tmp_path / 'artwork.pdf'
+    doc.save(pdf)
+    doc.close()
+    assert pdf.stat().st_size > 2_000_000
+    assert estimate_pdf_tokens([pdf])[pdf.as_posix()] <= MAX_TOKENS_PER_PAGE
+
+
+def test_pdf_digests_are_computed_once(tmp_path, monkeypatch):
+    pdfs = []
+    for i in range(3):
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), f"A1 Song {i} 3:00")
+        doc.save(tmp_path / f'{i}.pdf')
+        doc.close()
+        pdfs.append(tmp_path / f'{i}.pdf')
+    text_cache = PdfTextCache(SqliteCache(tmp_path / 'c.sqlite3', 'pdf'))
+    list(iter_documents(pdfs[:1], text_cache, kind=IO_BOUND))
+    digests = source_digests(pdfs)
+
+    def no_hashing(path):
+        raise AssertionError(f"{path} hashed again")
+    monkeypatch.setattr(pdf_utils, 'source_digest', no_hashing)
+    monkeypatch.setattr(extraction, 'source_digest', no_hashing)
+    estimates = estimate_pdf_tokens(pdfs, text_cache, digests)
+    assert set(estimates) == {p.as_posix() for p in pdfs}
+    docs = list(iter_documents(pdfs, text_cache, kind=IO_BOUND, digests=digests))
+    assert sorted(d['identifier'] for d in docs) == sorted(p.as_posix() for p in pdfs)
+    assert all('Song' in d['content'] for d in docs)
+
+
+def test_create_pdf_batches_uses_estimates(tmp_path):
+    pdfs = [tmp_path / f'{i}.pdf' for i in range(4)]
+    for pdf in pdfs:
+        pdf.write_bytes(b'%PDF' + b'x' * 100)
+    estimates = {pdfs[0].as_posix(): 10_000_000}
+    batches = create_pdf_batches({'p': {'pdfs': pdfs}}, estimates)
+    assert [pdfs[0]] in batches
+    assert sorted(p for b in batches for p in b) == sorted(pdfs)
+
+
+def test_project_pdfs_stay_together_and_small_batches_go_first():
+    items = [(Path('a1.pdf'), 3000), (Path('b1.pdf'), 100), (Path('a2.pdf'), 3000), (Path('c1.pdf'), 500)]
+    batches = pack_batches(items, parallelism=3, groups=['a', 'b', 'a', 'c'])
+    assert batches == [[Path('b1.pdf')], [Path('c1.pdf')], [Path('a1.pdf'), Path('a2.pdf')]]
+
+
+def test_oversized_project_gets_its_own_batches():
+    items = [(Path(f'a{i}.pdf'), 3000) for i in range(4)] + [(Path('b.pdf'), 100)]
+    batches = pack_batches(items, input_budget=7000, parallelism=1, groups=['a'] * 4 + ['b'])
+    assert [Path('b.pdf')] in batches
+    assert sorted(len(b) for b in batches) == [1, 2, 2]
+    assert all(len({p.name[0] for p in b}) == 1 for b in batches)
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from vinyl_preflight.core.pipeline_executor import PipelineExecutor, ProjectJoin, Stage, callback_source
+
+
+def test_pipeline_executor_streams_and_isolates_errors():
+    seen = []
+
+    def square(x):
+        if x == 3:
+            raise ValueError("bad item")
+        yield x * x
+
+    def collect(x):
+        seen.append(x)
+        return [x] if x % 2 == 0 else []
+
+    executor = PipelineExecutor([Stage('square', square, workers=3, queue_size=2),
+                                 Stage('even', collect, finish=lambda: ['done'])])
+    out = list(executor.run(range(6), callback_source(lambda emit: [emit(x) for x in (10, 11)])))
+    assert sorted(out[:-1]) == [0, 4, 16, 100]
+    assert out[-1] == 'done'
+    assert sorted(seen) == [0, 1, 4, 16, 25, 100, 121]
+    assert [(stage, item) for stage, item, _ in executor.errors] == [('square', 3)]
+
+
+def test_pipeline_executor_stops_when_consumer_leaves():
+    executor = PipelineExecutor([Stage('id', lambda x: [x], workers=2, queue_size=1)])
+    out = executor.run(iter(range(10 ** 9)))
+    assert next(out) in (0, 1)
+    out.close()
+
+
+def test_project_join_releases_projects_independently():
+    a = {'pdfs': [Path('/a/t.pdf')], 'wavs': [Path('/a/1.wav'), Path('/a/2.wav')]}
+    b = {'pdfs': [Path('/b/t.pdf')], 'wavs': [Path('/b/1.wav')]}
+    join = ProjectJoin({'a': a, 'b': b})
+    assert join.add('wav', '/a/1.wav', 10.0) is None
+    assert join.add('pdf', '/b/t.pdf', {'status': 'success'}) is None
+    ready = join.add('wav', '/b/1.wav', 5.0)
+    assert ready == {'name': 'b', 'pdf_results': {'/b/t.pdf': {'status': 'success'}}, 'wav_durations': {'/b/1.wav': 5.0}}
+    assert join.add('wav', '/b/1.wav', 5.0) is None
+    assert join.flush() == [{'name': 'a', 'pdf_results': {'/a/t.pdf': None},
+                             'wav_durations': {'/a/1.wav': 10.0, '/a/2.wav': None}}]
@@ -0,0 +1,31 @@
+from vinyl_preflight.core.probe_cache import ProbeCache, file_identity
+from vinyl_preflight.io.cache import SqliteCache
+
+
+def test_file_identity_changes_with_content(tmp_path):
+    wav = tmp_path / 'side_a.wav'
+    wav.write_bytes(b'RIFF' + b'\x00' * 100)
+    first = file_identity(wav)
+    assert file_identity(wav) == first
+    wav.write_bytes(b'RIFF' + b'\x01' * 100)
+    assert file_identity(wav) != first
+
+
+def test_probe_cache_lookup_and_store(tmp_path):
+    wavs = []
+    for name in ('side_a.wav', 'side_b.wav'):
+        wav = tmp_path / name
+        wav.write_bytes(name.encode())
+        wavs.append(wav)
+    cache = ProbeCache(SqliteCache(tmp_path / 'c.sqlite3', 'probe'))
+
+    hits, misses, identities = cache.lookup(wavs)
+    assert hits == {} and misses == wavs
+    cache.store({wavs[0].as_posix(): {'duration': 12.5}}, identities)
+
+    hits, misses, _ = cache.lookup(wavs)
+    assert hits == {wavs[0].as_posix(): {'duration': 12.5}}
+    assert misses == [wavs[1]]
+
+    cache.invalidate([wavs[0]])
+    assert cache.lookup(wavs)[1] == wavs
@@ -0,0 +1,68 @@
+import threading
+
+from vinyl_preflight.llm import ratelimit
+from vinyl_preflight.llm.ratelimit import AdaptiveLimiter, backoff_delay, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_delay_is_capped_full_jitter():
+    assert backoff_delay(3, base=1.0, rng=lambda lo, hi: hi) == 8.0
+    assert backoff_delay(20, base=1.0, cap=60.0, rng=lambda lo, hi: hi) == 60.0
+    assert backoff_delay(2, rng=lambda lo, hi: lo) == 0.0
+
+
+def test_aimd_limit():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=4, max_limit=6, clock=clock)
+    for _ in range(20):
+        limiter.on_success(1.0)
+    assert limiter.limit == 6
+    limiter.on_failure()
+    assert limiter.limit == 3
+    # souběžné chyby stejné vlny limit nesnižují opakovaně
+    limiter.on_failure()
+    assert limiter.limit == 3
+    clock.now += ratelimit.DECREASE_COOLDOWN_SECONDS
+    limiter.on_failure()
+    assert limiter.limit == 1
+
+
+def test_slow_success_shrinks_limit():
+    limiter = AdaptiveLimiter(initial=8, latency_threshold=10.0)
+    limiter.on_success(30.0)
+    assert limiter.limit == 4
+
+
+def test_limiter_bounds_in_flight():
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+    limiter.acquire()
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        with limiter.slot():
+            acquired.set()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    assert not acquired.wait(0.1)
+    limiter.release()
+    assert acquired.wait(1.0)
+    t.join()
+    limiter.release()
+    assert limiter.in_flight == 0
@@ -0,0 +1,49 @@
+import json
+import threading
+
+from vinyl_preflight.io.runlog import RunLog
+
+
+def _events(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_runlog_concurrent_writes_are_whole_lines(tmp_path):
+    path = tmp_path / 'run.jsonl'
+    with RunLog(path) as log:
+        threads = [threading.Thread(target=lambda n=n: [log.log_step(f'krok {n}', {'i': i}) for i in range(200)])
+                   for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    events = _events(path)
+    assert sum(1 for e in events if e['event'] == 'step') == 1600
+    assert events[0]['event'] == 'run_log_opened' and events[-1]['event'] == 'run_log_closed'
+
+
+def test_runlog_shrinks_large_payloads(tmp_path):
+    prompt = 'A1 Song 3:45\n' * 1000
+    with RunLog(tmp_path / 'run.jsonl', max_field_chars=100, payload_dir=tmp_path / 'payloads') as log:
+        log.log_llm_request({'model': 'm', 'messages': [{'role': 'user', 'content': prompt}]})
+    request = next(e for e in _events(tmp_path / 'run.jsonl') if e['event'] == 'llm_request')
+    content = request['messages'][0]['content']
+    assert content['truncated'] and content['length'] == len(prompt)
+    assert (tmp_path / 'payloads' / content['file']).read_text(encoding='utf-8') == prompt
+
+
+def test_runlog_level_filter(tmp_path):
+    with RunLog(tmp_path / 'run.jsonl', level='warning') as log:
+        log.emit('noise', level='debug')
+        log.log_step('info step')
+        log.emit('problem', level='error', detail='x')
+    assert [e['event'] for e in _events(tmp_path / 'run.jsonl')] == ['problem']
+
+
+def test_runlog_snapshots_fields_at_emit(tmp_path):
+    data = {'tracks': [1]}
+    with RunLog(tmp_path / 'run.jsonl') as log:
+        log.log_step('snapshot', data)
+        data['tracks'].append(2)
+    step = next(e for e in _events(tmp_path / 'run.jsonl') if e['event'] == 'step')
+    assert step['data'] == {'tracks': [1]}
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from vinyl_preflight.llm.streaming import ResultsStreamParser, StreamError, iter_content_deltas, iter_sse_data
+
+
+def test_iter_sse_data():
+    lines = [": OPENROUTER PROCESSING", "", "data: {\"a\": 1}", "", "data: x", "data: y", "", "data: [DONE]", "",
+             "data: ignored", ""]
+    assert list(iter_sse_data(lines)) == ['{"a": 1}', "x\ny"]
+
+
+def test_iter_content_deltas():
+    events = [json.dumps({"choices": [{"delta": {"content": "ab"}}]}),
+              json.dumps({"choices": [{"delta": {}}]}),
+              json.dumps({"choices": [{"delta": {"content": "c"}}]})]
+    assert "".join(iter_content_deltas(events)) == "abc"
+    with pytest.raises(StreamError):
+        list(iter_content_deltas([json.dumps({"error": {"message": "overloaded"}})]))
+
+
+def test_results_parser_emits_complete_elements():
+    results = [{"source_identifier": 'a"}]', "status": "success", "data": [{"title": "T {x} [y]"}]},
+               {"source_identifier": "b", "status": "error", "data": []}]
+    text = "```json\n" + json.dumps({"note": "[{", "results": results, "tail": [{"z": 1}]}) + "\n```"
+    for size in (1, 3, 7, len(text)):
+        parser = ResultsStreamParser()
+        emitted = []
+        for i in range(0, len(text), size):
+            emitted.extend(parser.feed(text[i:i + size]))
+        assert emitted == results
+        assert parser.text == text
+
+    parser = ResultsStreamParser()
+    first = json.dumps(results[0])
+    assert parser.feed('{"results": [' + first[:-1]) == []
+    assert parser.feed('}, {"source') == [results[0]]
@@ -0,0 +1,45 @@
+from vinyl_preflight.core.tracklist_parser import parse_duration, parse_tracklist
+
+
+def test_parse_duration():
+    assert parse_duration('3:45') == 225
+    assert parse_duration('(1:02:03)') == 3723
+    assert parse_duration('no time') is None
+
+
+def test_position_layout_with_totals():
+    text = "\n".join([
+        "Artist - Album",
+        "A1 Opening Song 3:45",
+        "A2. Second - Remix (4:10)",
+        "A3 Total Eclipse ........ 5:05",
+        "Side A total: 13:00",
+        "B1\tLong Title\t06:12",
+        "B2 Closing 2:00",
+        "Total running time 21:12",
+    ])
+    tracks, confidence = parse_tracklist(text)
+    assert confidence == 1.0
+    assert [(t['side'], t['track_number']) for t in tracks] == [('A', 1), ('A', 2), ('A', 3), ('B', 1), ('B', 2)]
+    assert tracks[1]['title'] == 'Second - Remix'
+    assert tracks[2] == {"side": "A", "track_number": 3, "title": "Total Eclipse", "duration_seconds": 305}
+
+
+def test_side_headers_and_split_columns():
+    tracks, confidence = parse_tracklist("SIDE A\n1. First 3:00\n2. Second 4:00\nSIDE B - 4:00\n1. Third 4:00")
+    assert confidence == 1.0
+    assert [t['side'] for t in tracks] == ['A', 'A', 'B']
+
+    tracks, confidence = parse_tracklist("A1\nFirst Song\n3:00\nA2\nSecond Song\n4:00")
+    assert confidence == 1.0
+    assert [t['title'] for t in tracks] == ['First Song', 'Second Song']
+
+
+def test_low_confidence():
+    assert parse_tracklist("Mastering notes, call me at 10:30")[1] == 0.0
+    # bez strany
+    assert parse_tracklist("1. Track 3:00\n2. Other 4:00")[1] == 0.0
+    # nesedí součet strany
+    assert parse_tracklist("A1 x 3:00\nA2 y 3:00\nSide A total 9:00")[1] < 0.9
+    # časy, které parser neumí přiřadit
+    assert parse_tracklist("A1 x 3:00\nfade 0:10 / 0:20 / 0:30")[1] < 0.9